@@ -0,0 +1,202 @@
+"""Utilities shared by the benchmark scripts in this directory."""
+
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from lxml.etree import canonicalize
+from star_ray import Agent
+from star_ray.utils import _LOGGER as _STAR_RAY_LOGGER
+from star_ray.environment.ambient import _Ambient
+from star_ray_xml import XMLState, Insert
+from star_ray_pygame import SVGAmbient
+from icua.environment import MultiTaskAmbient
+from icua.utils import TaskLoader
+
+from matbii.agent import (
+    TrackingActuator,
+    SystemMonitoringActuator,
+    ResourceManagementActuator,
+)
+from matbii.avatar import HeadlessAvatar, AvatarActuator
+from matbii.utils import (
+    LOGGER,
+    TASK_PATHS,
+    TASK_ID_TRACKING,
+    TASK_ID_SYSTEM_MONITORING,
+    TASK_ID_RESOURCE_MANAGEMENT,
+)
+
+# actuators of the agents that run each task's schedule
+_TASK_AGENT_ACTUATORS = {
+    TASK_ID_TRACKING: TrackingActuator,
+    TASK_ID_SYSTEM_MONITORING: SystemMonitoringActuator,
+    TASK_ID_RESOURCE_MANAGEMENT: ResourceManagementActuator,
+}
+
+
+def silence_logging() -> None:
+    """Only log warnings (and errors), this silences the debug logs of `matbii` (and `icua`) and of `star_ray` (see `matbii.__main__`)."""
+    _STAR_RAY_LOGGER.setLevel("WARNING")
+    LOGGER.set_level("WARNING")
+
+
+def new_task_state(
+    tasks: list[str] | None = None, svg_size: tuple[float, float] = (810, 680)
+) -> XMLState:
+    """Create a new xml state that contains the default svg of each task (as it would be at the start of a `matbii` run).
+
+    Args:
+        tasks (list[str] | None, optional): tasks to add to the state. Defaults to None, meaning all tasks.
+        svg_size (tuple[float, float], optional): size of the root svg element. Defaults to (810, 680).
+
+    Returns:
+        XMLState: the state.
+    """
+    tasks = tasks if tasks is not None else list(TASK_PATHS.keys())
+    loader = TaskLoader()
+    state = SVGAmbient([], svg_size=svg_size).get_state()
+    for task in tasks:
+        loader.register_task(task, TASK_PATHS[task])
+        xml = canonicalize(loader.get_task_template(task).render({}))
+        state.insert(Insert(xpath="/svg:svg", element=xml, index=-1))
+    return state
+
+
+def new_task_ambient(
+    agents: list[Agent] | None = None,
+    tasks: list[str] | None = None,
+    svg_size: tuple[float, float] = (810, 680),
+) -> _Ambient:
+    """Create a new ambient that contains the default svg of each task (as it would be at the start of a `matbii` run). Agents can sense and act in the ambient as they would in a simulation (e.g. `agent.__sense__(ambient)`), events are not logged.
+
+    Args:
+        agents (list[Agent] | None, optional): agents to add to the ambient (a `HeadlessAvatar` is always added). Defaults to None.
+        tasks (list[str] | None, optional): tasks to enable. Defaults to None, meaning all tasks.
+        svg_size (tuple[float, float], optional): size of the root svg element. Defaults to (810, 680).
+
+    Returns:
+        _Ambient: the ambient, as it is seen by agents in a simulation.
+    """
+    tasks = tasks if tasks is not None else list(TASK_PATHS.keys())
+    with tempfile.TemporaryDirectory() as path:
+        ambient = MultiTaskAmbient(
+            avatar=HeadlessAvatar([], [AvatarActuator()]),
+            agents=agents,
+            svg_size=svg_size,
+            logging_path=Path(path, "event_log.log").as_posix(),
+        )
+        # events are not logged
+        logger = ambient._event_logger.logger
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        ambient._event_logger = None
+    for task in tasks:
+        ambient.add_task(
+            task,
+            [TASK_PATHS[task]],
+            agent_actuators=[_TASK_AGENT_ACTUATORS[task]],
+            enable=True,
+        )
+    return _Ambient.new(ambient)
+
+
+def rate(fun: Callable[[], Any], n: int = 10000, repeat: int = 3) -> float:
+    """Measure the rate (calls per second) of a function, the best of `repeat` runs of `n` calls is reported.
+
+    Args:
+        fun (Callable[[], Any]): function to call.
+        n (int, optional): number of calls per run. Defaults to 10000.
+        repeat (int, optional): number of runs. Defaults to 3.
+
+    Returns:
+        float: calls per second.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n):
+            fun()
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def write_results(path: str | Path, results: dict[str, float]) -> Path:
+    """Write benchmark results to a json file along with some information about the environment in which they were produced (commit, python version, etc.).
+
+    Args:
+        path (str | Path): path of the json file, if it is a directory the file will be named after the current commit.
+        results (dict[str, float]): benchmark results (name -> rate), a higher rate is better.
+
+    Returns:
+        Path: path of the json file.
+    """
+    path = Path(path)
+    commit = _git_commit()
+    if path.is_dir() or not path.suffix:
+        path = path / f"{commit or datetime.now().strftime('%Y%m%d%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    meta = dict(
+        commit=commit,
+        date=datetime.now().isoformat(timespec="seconds"),
+        python=platform.python_version(),
+        platform=platform.platform(),
+    )
+    with open(path, "w") as f:
+        json.dump(dict(meta=meta, results=results), f, indent=2)
+    return path
+
+
+def load_results(path: str | Path) -> dict[str, float]:
+    """Load benchmark results from a json file (see `write_results`).
+
+    Args:
+        path (str | Path): path of the json file.
+
+    Returns:
+        dict[str, float]: benchmark results (name -> rate).
+    """
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare_results(
+    results: dict[str, float], baseline: dict[str, float], tolerance: float = 0.1
+) -> dict[str, float]:
+    """Compare benchmark results to a baseline.
+
+    Args:
+        results (dict[str, float]): benchmark results (name -> rate).
+        baseline (dict[str, float]): baseline results (name -> rate).
+        tolerance (float, optional): relative slowdown that is tolerated (benchmarks are noisy). Defaults to 0.1.
+
+    Returns:
+        dict[str, float]: the benchmarks that have regressed (name -> relative rate), benchmarks that are missing from either results are ignored.
+    """
+    ratios = {
+        name: results[name] / baseline[name]
+        for name in results.keys() & baseline.keys()
+        if baseline[name] > 0
+    }
+    return {name: r for name, r in sorted(ratios.items()) if r < 1 - tolerance}
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
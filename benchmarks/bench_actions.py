@@ -0,0 +1,76 @@
+"""Benchmark for task action execution.
+
+Reports the rate (actions/s) at which each task action class is executed against the default task state. Actions that would otherwise drive the state to a limit (e.g. the target to the edge of the tracking task) alternate between opposing actions.
+
+Run with: `python benchmarks/bench_actions.py`
+"""
+
+import argparse
+from itertools import cycle
+
+from matbii.tasks.resource_management.resource_management import (
+    PUMP_IDS,
+    SetPumpAction,
+    PumpFuelAction,
+    BurnFuelAction,
+    TogglePumpFailureAction,
+)
+from matbii.tasks.system_monitoring.system_monitoring import (
+    ToggleLightAction,
+    SetSliderAction,
+)
+from matbii.tasks.tracking.tracking import TargetMoveAction
+
+from _util import new_task_state, rate, silence_logging
+
+
+def run(n: int = 10000) -> dict[str, float]:
+    """Run the benchmark.
+
+    Args:
+        n (int, optional): number of actions per run. Defaults to 10000.
+
+    Returns:
+        dict[str, float]: action class name -> actions/s.
+    """
+    state = new_task_state()
+    # turn all pumps on so that `PumpFuelAction` does some work
+    for pump in PUMP_IDS:
+        SetPumpAction.new_on(pump).__execute__(state)
+
+    actions = {
+        TargetMoveAction: [
+            TargetMoveAction(direction=(1, 1), speed=1.0),
+            TargetMoveAction(direction=(-1, -1), speed=1.0),
+        ],
+        SetSliderAction: [
+            SetSliderAction(target=1, state=1, relative=True),
+            SetSliderAction(target=1, state=-1, relative=True),
+        ],
+        ToggleLightAction: [ToggleLightAction(target=1)],
+        # small amounts so that tanks do not empty/fill during the benchmark
+        PumpFuelAction: [PumpFuelAction(target="ca", flow=0.01)],
+        BurnFuelAction: [BurnFuelAction(target="*", burn=0.01)],
+        TogglePumpFailureAction: [TogglePumpFailureAction(target="ab")],
+    }
+    results = {}
+    for action_type, actions in actions.items():
+        actions = cycle(actions)
+        results[action_type.__name__] = rate(
+            lambda actions=actions: next(actions).__execute__(state), n=n
+        )
+    return results
+
+
+def main():  # noqa
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=10000, help="actions per run.")
+    args = parser.parse_args()
+    silence_logging()
+    print(f"{'action':<28}{'actions/s':>14}{'us/action':>12}")
+    for name, r in run(args.n).items():
+        print(f"{name:<28}{r:>14.0f}{1e6 / r:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark for `matbii.utils.ElementIndex`.
+
+Reports the rate (lookups/s) of resolving the elements that task actions target by xpath (the approach used prior to `ElementIndex`, marked "(xpath)") vs by `ElementIndex`. The rate at which the task actions themselves are executed is reported by `bench_actions.py`.
+
+Run with: `python benchmarks/bench_element_index.py`
+"""
+
+import argparse
+
+from star_ray_xml import select
+
+from matbii.utils import ElementIndex
+
+from _util import new_task_state, rate, silence_logging
+
+# (id, attrs) of the elements that are targeted by the task actions
+LOOKUPS = [
+    ("tracking", ["width", "height"]),
+    ("tracking_target", ["x", "y"]),
+    ("light-1-button", ["data-state"]),
+    ("pump-ab-button", ["data-state"]),
+    ("tank-a", ["data-level", "data-capacity", "height"]),
+]
+
+
+def run(n: int = 10000) -> dict[str, float]:
+    """Run the benchmark.
+
+    Args:
+        n (int, optional): number of lookups per run. Defaults to 10000.
+
+    Returns:
+        dict[str, float]: element id -> lookups/s.
+    """
+    state = new_task_state()
+    index = ElementIndex.get_index(state)
+    results = {}
+    for element_id, attrs in LOOKUPS:
+        query = select(xpath=f"//*[@id='{element_id}']", attrs=attrs)
+        results[f"{element_id}(xpath)"] = rate(lambda q=query: state.select(q), n=n)
+        results[element_id] = rate(
+            lambda i=element_id, a=attrs: index.select(i, a), n=n
+        )
+    return results
+
+
+def main():  # noqa
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=10000, help="lookups per run.")
+    args = parser.parse_args()
+    silence_logging()
+    results = run(args.n)
+    print(f"{'lookup':<24}{'xpath/s':>14}{'index/s':>14}{'speedup':>10}")
+    for element_id, _ in LOOKUPS:
+        r_xpath, r_index = results[f"{element_id}(xpath)"], results[element_id]
+        print(
+            f"{element_id:<24}{r_xpath:>14.0f}{r_index:>14.0f}{r_index / r_xpath:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark for `GuidanceAgent.fixation_target`.
+
+Simulates eyetracking input at 1200 Hz with a guidance agent that cycles at 100 Hz (12 eye events per cycle). Reports the rate (lookups/s) of determining the fixation target by searching the eye event history (the approach used prior to recording fixations as they arrive) vs `fixation_target`, as well as the rate (events/s) at which eye events are received by the agent.
+
+Run with: `python benchmarks/bench_fixation.py`
+"""
+
+import argparse
+import random
+from time import perf_counter
+
+from icua.event import EyeMotionEvent
+
+from matbii.guidance import (
+    DefaultGuidanceAgent,
+    SystemMonitoringTaskAcceptabilitySensor,
+    ResourceManagementTaskAcceptabilitySensor,
+    TrackingTaskAcceptabilitySensor,
+)
+
+from _util import silence_logging
+
+EYETRACKING_RATE = 1200
+CYCLE_RATE = 100
+TARGETS = [
+    ["root", "system_monitoring"],
+    ["root", "resource_management"],
+    ["root", "tracking"],
+    ["root"],
+]
+
+
+def fixation_target_search(agent: DefaultGuidanceAgent) -> str | None:
+    """Determine the fixation target by searching the eye event history (the approach used prior to `GuidanceAgent.on_user_input` recording fixations)."""
+    prev_cycle_start = agent.get_cycle_start(3)
+    for event in agent._user_input_events[EyeMotionEvent]:
+        if event.timestamp < prev_cycle_start:
+            return None
+        if event.fixated:
+            targets = set(event.target) & agent.monitoring_tasks
+            return next(iter(targets), None)
+    return None
+
+
+def new_events(n: int, fixation_probability: float, seed: int = 0):  # noqa
+    rng = random.Random(seed)
+    return [
+        EyeMotionEvent(
+            timestamp=i / EYETRACKING_RATE,
+            position=(0.0, 0.0),
+            position_raw=(0, 0),
+            position_screen=None,
+            fixated=rng.random() < fixation_probability,
+            in_window=True,
+            target=TARGETS[(i // EYETRACKING_RATE) % len(TARGETS)],
+        )
+        for i in range(n)
+    ]
+
+
+def new_agent():  # noqa
+    return DefaultGuidanceAgent(
+        [
+            SystemMonitoringTaskAcceptabilitySensor(),
+            ResourceManagementTaskAcceptabilitySensor(),
+            TrackingTaskAcceptabilitySensor(),
+        ],
+        [],
+        user_input_events_history_size=EYETRACKING_RATE,
+        attention_mode="fixation",
+    )
+
+
+def run(n: int = 2000, fixation_probability: float = 0.1) -> dict[str, float]:
+    """Run the benchmark.
+
+    Args:
+        n (int, optional): number of agent cycles per run. Defaults to 2000.
+        fixation_probability (float, optional): probability that an eye event is a fixation, fewer fixations means more of the history is searched. Defaults to 0.1.
+
+    Returns:
+        dict[str, float]: name -> rate, events/s for "receive" and lookups/s otherwise.
+    """
+    per_cycle = EYETRACKING_RATE // CYCLE_RATE
+    events = new_events(n * per_cycle, fixation_probability)
+    agent = new_agent()
+    lookups = {
+        "search": fixation_target_search,
+        "fixation_target": lambda agent: agent.fixation_target,
+    }
+    targets = {name: [] for name in lookups}
+    times = {name: 0.0 for name in ["receive", *lookups]}
+    # events are received between cycles, the lookup happens during each cycle
+    for i in range(n):
+        start = perf_counter()
+        for event in events[i * per_cycle : (i + 1) * per_cycle]:
+            agent.on_user_input(event)
+        times["receive"] += perf_counter() - start
+        agent._cycle_times.appendleft((i + 1) / CYCLE_RATE)
+        for name, lookup in lookups.items():
+            start = perf_counter()
+            targets[name].append(lookup(agent))
+            times[name] += perf_counter() - start
+    assert targets["search"] == targets["fixation_target"]
+    return {
+        "receive": len(events) / times["receive"],
+        **{name: n / times[name] for name in lookups},
+    }
+
+
+def main():  # noqa
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=2000, help="agent cycles per run.")
+    parser.add_argument(
+        "-p", type=float, default=0.1, help="probability of a fixation event."
+    )
+    args = parser.parse_args()
+    silence_logging()
+    print(f"{EYETRACKING_RATE} Hz eyetracking, {CYCLE_RATE} Hz agent cycle")
+    print(f"{'benchmark':<28}{'rate/s':>14}{'us':>12}")
+    for name, r in run(args.n, args.p).items():
+        print(f"{name:<28}{r:>14.0f}{1e6 / r:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
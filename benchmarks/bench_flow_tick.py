@@ -0,0 +1,67 @@
+"""Benchmark for `FlowTickAction`.
+
+Reports the rate (ticks/s) of a resource management tick implemented as a `BurnFuelAction` for each main tank followed by a `PumpFuelAction` for each pump (as in the original schedule, marked "(sequential)"), vs a single `FlowTickAction`.
+
+Run with: `python benchmarks/bench_flow_tick.py`
+"""
+
+import argparse
+
+from matbii.tasks.resource_management.resource_management import (
+    TANK_MAIN_IDS,
+    PUMP_IDS,
+    PUMP_FLOW_ORDER,
+    SetPumpAction,
+    PumpFuelAction,
+    BurnFuelAction,
+    FlowTickAction,
+)
+
+from _util import new_task_state, rate, silence_logging
+
+
+def run(n: int = 2000) -> dict[str, float]:
+    """Run the benchmark.
+
+    Args:
+        n (int, optional): number of ticks per run. Defaults to 2000.
+
+    Returns:
+        dict[str, float]: name -> ticks/s.
+    """
+    state = new_task_state()
+    for pump in PUMP_IDS:
+        SetPumpAction.new_on(pump).__execute__(state)
+
+    # small amounts so that tanks do not empty/fill during the benchmark
+    flow, burn = 0.01, 0.01
+    sequential = [BurnFuelAction(target=tank, burn=burn) for tank in TANK_MAIN_IDS]
+    sequential += [PumpFuelAction(target=pump, flow=flow) for pump in PUMP_FLOW_ORDER]
+    fused = FlowTickAction(flow=flow, burn=burn)
+
+    def _sequential():
+        for action in sequential:
+            action.__execute__(state)
+
+    return {
+        "FlowTickAction(sequential)": rate(_sequential, n=n),
+        "FlowTickAction": rate(lambda: fused.__execute__(state), n=n),
+    }
+
+
+def main():  # noqa
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=2000, help="ticks per run.")
+    args = parser.parse_args()
+    silence_logging()
+    results = run(args.n)
+    r_sequential = results["FlowTickAction(sequential)"]
+    r_fused = results["FlowTickAction"]
+    print(f"{'tick':<24}{'ticks/s':>14}")
+    print(f"{'sequential':<24}{r_sequential:>14.0f}")
+    print(f"{'FlowTickAction':<24}{r_fused:>14.0f}")
+    print(f"speedup: {r_fused / r_sequential:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark for the `DefaultGuidanceAgent`.
+
+Reports the rate (calls/s) of guidance decisions (`decide`) and of a full guidance agent cycle (`__sense__`, `__cycle__` and `__execute__`) against the default task state, using the default guidance configuration (with mouse based attention, there is no eyetracker), with and without reactive guidance decisions. The tasks are stable (nothing changes between cycles), which is the case that reactive decisions optimise. Sensors only sense elements when they change (`subscribe=True`), otherwise the cycle is dominated by sense actions.
+
+Run with: `python benchmarks/bench_guidance.py`
+"""
+
+import argparse
+
+from matbii.config import GuidanceConfiguration
+from matbii.guidance import (
+    DefaultGuidanceAgent,
+    SystemMonitoringTaskAcceptabilitySensor,
+    ResourceManagementTaskAcceptabilitySensor,
+    TrackingTaskAcceptabilitySensor,
+)
+
+from _util import new_task_ambient, rate, silence_logging
+
+
+def run(n: int = 1000) -> dict[str, float]:
+    """Run the benchmark.
+
+    Args:
+        n (int, optional): number of cycles per run. Defaults to 1000.
+
+    Returns:
+        dict[str, float]: name -> calls/s.
+    """
+    results = {}
+    for reactive in (False, True):
+        config = GuidanceConfiguration(
+            attention_mode="mouse", arrow=dict(mode="mouse"), reactive=reactive
+        )
+        agent = DefaultGuidanceAgent(
+            [
+                SystemMonitoringTaskAcceptabilitySensor(subscribe=True),
+                ResourceManagementTaskAcceptabilitySensor(subscribe=True),
+                TrackingTaskAcceptabilitySensor(subscribe=True),
+            ],
+            [config.arrow.to_actuator(), config.box.to_actuator()],
+            break_ties=config.break_ties,
+            grace_period=config.grace_period,
+            grace_mode=config.grace_mode,
+            attention_mode=config.attention_mode,
+            counter_factual=config.counter_factual,
+            reactive=config.reactive,
+        )
+        ambient = new_task_ambient(agents=[agent])
+
+        def _cycle(agent=agent, ambient=ambient):
+            agent.__sense__(ambient)
+            agent.__cycle__()
+            agent.__execute__(ambient)
+
+        for _ in range(3):
+            _cycle()  # initial subscriptions and observations
+        suffix = "(reactive)" if reactive else ""
+        results[f"DefaultGuidanceAgent.decide{suffix}"] = rate(agent.decide, n=n)
+        results[f"DefaultGuidanceAgent{suffix}"] = rate(_cycle, n=n)
+    return results
+
+
+def main():  # noqa
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=1000, help="calls per run.")
+    args = parser.parse_args()
+    silence_logging()
+    print(f"{'agent':<40}{'calls/s':>14}{'us/call':>12}")
+    for name, r in run(args.n).items():
+        print(f"{name:<40}{r:>14.0f}{1e6 / r:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark for task acceptability sensing.
+
+Reports the rate (round-trips/s) of sensing with each `*TaskAcceptabilitySensor`. A round-trip is what happens each cycle of a guidance agent: the sense actions are created (`sense()`), executed against the default task state, the resulting observations update the sensor's beliefs and the acceptability of the task is observed. Sensors are also run in subscription mode (`subscribe=True`), the task state is not changed during the benchmark so this measures the cost of sensing when tasks are stable.
+
+Run with: `python benchmarks/bench_sensors.py`
+"""
+
+import argparse
+
+from star_ray.agent import AgentRouted
+
+from matbii.guidance import (
+    SystemMonitoringTaskAcceptabilitySensor,
+    ResourceManagementTaskAcceptabilitySensor,
+    TrackingTaskAcceptabilitySensor,
+)
+
+from _util import new_task_ambient, rate, silence_logging
+
+
+def run(n: int = 2000) -> dict[str, float]:
+    """Run the benchmark.
+
+    Args:
+        n (int, optional): number of round-trips per run. Defaults to 2000.
+
+    Returns:
+        dict[str, float]: sensor class name -> round-trips/s.
+    """
+    results = {}
+    for subscribe in (False, True):
+        sensors = [
+            SystemMonitoringTaskAcceptabilitySensor(subscribe=subscribe),
+            ResourceManagementTaskAcceptabilitySensor(subscribe=subscribe),
+            TrackingTaskAcceptabilitySensor(subscribe=subscribe),
+        ]
+        agent = AgentRouted(sensors, [])
+        ambient = new_task_ambient(agents=[agent])
+
+        def _round_trip(sensor, ambient=ambient):
+            sensor.__query__(ambient)
+            return list(sensor.iter_observations())
+
+        for sensor in sensors:
+            _round_trip(sensor)  # initial subscriptions
+            name = type(sensor).__name__ + ("(subscribe)" if subscribe else "")
+            results[name] = rate(lambda s=sensor: _round_trip(s), n=n)
+    return results
+
+
+def main():  # noqa
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=2000, help="round-trips per run.")
+    args = parser.parse_args()
+    silence_logging()
+    print(f"{'sensor':<56}{'round-trips/s':>14}{'us/trip':>12}")
+    for name, r in run(args.n).items():
+        print(f"{name:<56}{r:>14.0f}{1e6 / r:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Benchmark for task attribute updates.
+
+Reports the rate (updates/s) of the task actions whose new attribute values are computed from the current values of the element (e.g. toggling a light, moving the target). Each action is run as it was prior to using updaters, where the new values were computed by evaluating an `Expr` (marked "(expr)"), and as it is now. Both are run against their own copy of the default task state and the resulting attributes are checked to be the same.
+
+Run with: `python benchmarks/bench_updates.py`
+"""
+
+import argparse
+from itertools import cycle
+
+from star_ray_xml import Expr
+
+from matbii.utils import ElementIndex
+from matbii.tasks.resource_management.resource_management import (
+    TogglePumpAction,
+    TogglePumpFailureAction,
+)
+from matbii.tasks.system_monitoring.system_monitoring import ToggleLightAction
+from matbii.tasks.tracking.tracking import TargetMoveAction
+from matbii.utils._const import TASK_ID_TRACKING, tracking_target_id
+
+from _util import new_task_state, rate, silence_logging
+
+
+def _toggle_light_expr(state, action: ToggleLightAction):
+    ElementIndex.get_index(state).update(
+        f"light-{action.target}-button",
+        {
+            "data-state": Expr("1-{data-state}"),
+            "fill": Expr("{data-colors}[{data-state}]"),
+        },
+    )
+
+
+def _toggle_pump_expr(state, action: TogglePumpAction):
+    ElementIndex.get_index(state).update(
+        f"pump-{action.target}-button",
+        {
+            "data-state": Expr("(1-{data-state})%3"),
+            "fill": Expr("{data-colors}[{data-state}]"),
+        },
+    )
+
+
+def _toggle_pump_failure_expr(state, action: TogglePumpFailureAction):
+    ElementIndex.get_index(state).update(
+        f"pump-{action.target}-button",
+        {
+            "data-state": Expr("2 * (1 - {data-state} // 2)"),
+            "fill": Expr("{data-colors}[{data-state}]"),
+        },
+    )
+
+
+def _target_move_expr(state, action: TargetMoveAction):
+    dx = action.direction[0] * action.speed
+    dy = action.direction[1] * action.speed
+    index = ElementIndex.get_index(state)
+    properties = index.select(TASK_ID_TRACKING, ["width", "height"])
+    x1, y1 = (0.0, 0.0)
+    x2, y2 = x1 + properties["width"], y1 + properties["height"]
+    new_x = Expr("max(min({x} + {dx}, {x2} - {width}), {x1})", dx=dx, x1=x1, x2=x2)
+    new_y = Expr("max(min({y} + {dy}, {y2} - {height}), {y1})", dy=dy, y1=y1, y2=y2)
+    index.update(tracking_target_id(), dict(x=new_x, y=new_y))
+
+
+# action type -> (actions, update using `Expr`, element id, attributes that are updated)
+CASES = {
+    ToggleLightAction: (
+        [ToggleLightAction(target=1)],
+        _toggle_light_expr,
+        "light-1-button",
+        ["data-state", "fill"],
+    ),
+    TogglePumpAction: (
+        [TogglePumpAction(target="ab")],
+        _toggle_pump_expr,
+        "pump-ab-button",
+        ["data-state", "fill"],
+    ),
+    TogglePumpFailureAction: (
+        [TogglePumpFailureAction(target="ab")],
+        _toggle_pump_failure_expr,
+        "pump-ab-button",
+        ["data-state", "fill"],
+    ),
+    TargetMoveAction: (
+        [
+            TargetMoveAction(direction=(1, 1), speed=1.0),
+            TargetMoveAction(direction=(-1, 0), speed=2.0),
+        ],
+        _target_move_expr,
+        tracking_target_id(),
+        ["x", "y"],
+    ),
+}
+
+
+def run(n: int = 10000) -> dict[str, float]:
+    """Run the benchmark.
+
+    Args:
+        n (int, optional): number of updates per run. Defaults to 10000.
+
+    Returns:
+        dict[str, float]: action class name -> updates/s.
+    """
+    results = {}
+    for action_type, (actions, update_expr, element_id, attrs) in CASES.items():
+        name = action_type.__name__
+        expr_state, state = new_task_state(), new_task_state()
+        expr_actions, actions = cycle(actions), cycle(actions)
+        results[f"{name}(expr)"] = rate(
+            lambda f=update_expr, s=expr_state, a=expr_actions: f(s, next(a)), n=n
+        )
+        results[name] = rate(lambda s=state, a=actions: next(a).__execute__(s), n=n)
+        expected = ElementIndex.get_index(expr_state).select(element_id, attrs)
+        actual = ElementIndex.get_index(state).select(element_id, attrs)
+        assert expected == actual, f"{name}: {expected} != {actual}"
+    return results
+
+
+def main():  # noqa
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=10000, help="updates per run.")
+    args = parser.parse_args()
+    silence_logging()
+    print(f"{'action':<32}{'updates/s':>14}{'us/update':>12}")
+    for name, r in run(args.n).items():
+        print(f"{name:<32}{r:>14.0f}{1e6 / r:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Runs the benchmark suite and stores the results as json, optionally comparing them to the results of a previous run to catch regressions.
+
+The suite covers the hot paths of a simulation:
+- `actions`: task action execution (see `bench_actions.py`).
+- `sensors`: task acceptability sensing (see `bench_sensors.py`).
+- `guidance`: guidance decisions and agent cycles (see `bench_guidance.py`).
+- `fixation`: fixation lookup with 1200 Hz eyetracking (see `bench_fixation.py`).
+- `updates`: task attribute updates with updaters vs `Expr` (see `bench_updates.py`).
+- `element_index`: element lookup by xpath vs `ElementIndex` (see `bench_element_index.py`).
+- `flow_tick`: resource management tick with `FlowTickAction` vs sequential actions (see `bench_flow_tick.py`).
+
+All results are rates (higher is better), they are keyed by `<group>.<name>`.
+
+Run with: `python benchmarks/run_benchmarks.py [--output PATH] [--compare PATH] [--tolerance 0.1]`
+
+By default results are written to `benchmarks/results/<COMMIT>.json`. If `--compare` is given, the exit code is 1 if any benchmark is slower than the given results by more than `--tolerance`.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+
+import bench_actions
+import bench_sensors
+import bench_guidance
+import bench_fixation
+import bench_updates
+import bench_element_index
+import bench_flow_tick
+from _util import write_results, load_results, compare_results, silence_logging
+
+BENCHMARKS = {
+    "actions": bench_actions.run,
+    "sensors": bench_sensors.run,
+    "guidance": bench_guidance.run,
+    "fixation": bench_fixation.run,
+    "updates": bench_updates.run,
+    "element_index": bench_element_index.run,
+    "flow_tick": bench_flow_tick.run,
+}
+
+
+def main():  # noqa
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=(Path(__file__).parent / "results").as_posix(),
+        help="json file (or directory) to write results to.",
+    )
+    parser.add_argument(
+        "--compare", type=str, default=None, help="json file of previous results."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="relative slowdown that is tolerated when comparing results.",
+    )
+    parser.add_argument(
+        "--only",
+        type=str,
+        nargs="+",
+        choices=list(BENCHMARKS),
+        default=list(BENCHMARKS),
+        help="benchmark groups to run.",
+    )
+    args = parser.parse_args()
+    silence_logging()
+
+    baseline = load_results(args.compare) if args.compare else {}
+    results = {}
+    print(f"{'benchmark':<52}{'rate/s':>14}{'us':>12}{'change':>10}")
+    for group in args.only:
+        for name, r in BENCHMARKS[group]().items():
+            name = f"{group}.{name}"
+            results[name] = r
+            change = f"{r / baseline[name] - 1:+.1%}" if name in baseline else ""
+            print(f"{name:<52}{r:>14.0f}{1e6 / r:>12.1f}{change:>10}")
+    path = write_results(args.output, results)
+    print(f"results written to: {path.as_posix()}")
+
+    regressions = compare_results(results, baseline, tolerance=args.tolerance)
+    if regressions:
+        print(f"regressions (> {args.tolerance:.0%} slower):")
+        for name, ratio in regressions.items():
+            print(f"  {name}: {ratio - 1:+.1%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
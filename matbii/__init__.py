@@ -1,12 +1,10 @@
-"""Matbii package."""
+"""Matbii package.
 
-from . import environment
-from . import tasks
-from . import avatar
-from . import agent
-from . import guidance
-from . import utils
-from . import extras
+Subpackages are imported when they are first used (e.g. `matbii.tasks` or `from matbii import tasks`), importing the simulation stack is slow and is not needed by every entry point (e.g. `python -m matbii --help`), see `python -m matbii --profile-startup`.
+"""
+
+import importlib
+from typing import Any
 
 __all__ = (
     "environment",
@@ -17,3 +15,13 @@ __all__ = (
     "utils",
     "extras",
 )
+
+
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
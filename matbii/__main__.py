@@ -9,15 +9,12 @@ import argparse
 import importlib
 import inspect
 
-
-from star_ray.utils import _LOGGER
+# NOTE: only the standard library should be imported here, the simulation stack is imported only when it is needed (see --profile-startup)
+from matbii._startup import StartupProfiler, end_startup
 
 # avoid a pygame issue on linux. TODO this should be moved somewhere more suitable...
 os.environ["LD_PRELOAD"] = "/usr/lib/x86_64-linux-gnu/libstdc++.so.6"
 
-# silence logs from star_ray logger
-_LOGGER.setLevel("WARNING")
-
 
 def logging_level(verbosity: int) -> str:
     """Convert a verbosity level to a logging level."""
@@ -90,6 +87,11 @@ def parse_cmd_args() -> dict[str, Any]:
         default=0,
         help="Increase verbosity level (use -v, -vv, -vvv for more verbosity)",
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report the time taken to import each module and by each phase of startup (e.g. loading the configuration, loading tasks, opening the window), the report is written to stderr when startup ends.",
+    )
     # ======================================================================== #
     # =========================== Options for main =========================== #
     # ======================================================================== #
@@ -99,6 +101,11 @@ def parse_cmd_args() -> dict[str, Any]:
         required=False,
         help="Path to configuration file.",
     )
+    parser.add_argument(
+        "--session-server",
+        action="store_true",
+        help="Run back-to-back participant sessions in this process, the window and eye tracker are kept open between sessions. Each session is started by writing a json object of configuration overrides (e.g. {\"participant\": {\"id\": \"P02\"}}) as a single line to stdin, see `matbii.session_server`.",
+    )
     # ======================================================================== #
     # ========================= Options for examples ========================= #
     # ======================================================================== #
@@ -204,6 +211,13 @@ def _unknown_args_error(unknown_args: Any):
 def main():
     """Main entry point for the matbii."""
     args, config_args, unknown_args = parse_cmd_args()
+    if args["profile_startup"]:
+        StartupProfiler().install()
+
+    # silence logs from star_ray logger
+    from star_ray.utils import _LOGGER
+
+    _LOGGER.setLevel("WARNING")
 
     # premeptively set the logging level
     from matbii.utils import LOGGER
@@ -213,7 +227,10 @@ def main():
     # 1. Run a script if --script is specified
     if args.get("script", None):
         # unknown arguments are ok, they will be grabbed by the script
-        run_script(args.get("script"), **args)
+        try:
+            run_script(args.get("script"), **args)
+        finally:
+            end_startup()
         return
 
     _unknown_args_error(unknown_args)
@@ -227,7 +244,11 @@ def main():
         return
 
     # 3. Run the main simulation
-    if args.get("config", None):
+    if args.get("config", None) and args["session_server"]:
+        from matbii.session_server import SessionServer
+
+        SessionServer(args["config"], **config_args).serve()
+    elif args.get("config", None):
         from matbii.main import main
 
         main(**args)
@@ -0,0 +1,196 @@
+"""Module that defines a profiler for the startup of `matbii`, see `python -m matbii --profile-startup`.
+
+The profiler records the time taken to import each module and the time taken by each phase of startup (e.g. loading the configuration, loading tasks or opening the window, see `startup_phase`). A report is written to stderr when startup ends, see `end_startup`.
+
+This module must not import anything other than the standard library, it is imported (and the profiler is installed) before any other part of `matbii` is imported.
+"""
+
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder
+from importlib.machinery import ModuleSpec
+from typing import Any, TextIO
+
+__all__ = ("StartupProfiler", "startup_phase", "end_startup")
+
+# the profiler that is currently installed (if any)
+_PROFILER: "StartupProfiler | None" = None
+
+
+@contextmanager
+def startup_phase(name: str) -> Iterator[None]:
+    """Context manager that records the time taken by a phase of startup, this does nothing unless a `StartupProfiler` is installed.
+
+    Args:
+        name (str): name of the phase.
+
+    Yields:
+        None: nothing.
+    """
+    if _PROFILER is None:
+        yield
+    else:
+        with _PROFILER.phase(name):
+            yield
+
+
+def end_startup() -> None:
+    """End startup, if a `StartupProfiler` is installed it is uninstalled and its report is written to stderr."""
+    profiler = _PROFILER
+    if profiler is not None:
+        profiler.uninstall()
+        profiler.report(file=sys.stderr)
+
+
+class StartupProfiler:
+    """Records the time taken to import each module (while it is installed, see `install`) and the time taken by each phase of startup (see `phase`).
+
+    Import times are recorded by wrapping the loader of each module that is imported, the time of an import includes the time taken to import any modules that it imports (cumulative time), the time spent in the module itself is its self time.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        super().__init__()
+        self._start = time.perf_counter()
+        self._end = None
+        # module name -> (cumulative time, self time)
+        self.imports: dict[str, tuple[float, float]] = dict()
+        self.phases: list[tuple[str, float]] = list()
+        self._finder = _ImportTimer(self)
+        # time spent importing modules imported by each module that is currently being imported
+        self._stack: list[float] = list()
+
+    def install(self) -> "StartupProfiler":
+        """Install the profiler, all modules that are imported after this are profiled.
+
+        Returns:
+            StartupProfiler: this profiler.
+        """
+        global _PROFILER
+        if self._finder not in sys.meta_path:
+            sys.meta_path.insert(0, self._finder)
+        _PROFILER = self
+        return self
+
+    def uninstall(self) -> None:
+        """Uninstall the profiler, modules that are imported after this are not profiled."""
+        global _PROFILER
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        if _PROFILER is self:
+            _PROFILER = None
+        if self._end is None:
+            self._end = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Context manager that records the time taken by a phase of startup.
+
+        Args:
+            name (str): name of the phase.
+
+        Yields:
+            None: nothing.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def get_package_times(self) -> dict[str, float]:
+        """Get the total time taken to import modules grouped by their top-level package (e.g. `pandas`, `matplotlib`), this is the sum of the self time of each module in the package.
+
+        Returns:
+            dict[str, float]: package name -> import time (seconds), in descending order of time.
+        """
+        packages = defaultdict(float)
+        for name, (_, self_time) in self.imports.items():
+            packages[name.partition(".")[0]] += self_time
+        return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+    def report(self, file: TextIO = sys.stderr, n: int = 15) -> None:
+        """Write a report of startup times.
+
+        Args:
+            file (TextIO, optional): file to write the report to. Defaults to sys.stderr.
+            n (int, optional): the number of packages and modules to report import times for. Defaults to 15.
+        """
+        end = self._end if self._end is not None else time.perf_counter()
+        total_import = sum(self_time for _, self_time in self.imports.values())
+        lines = [
+            f"startup: {end - self._start:.3f}s, "
+            f"imports: {total_import:.3f}s ({len(self.imports)} modules)",
+            "phases:",
+            *(f"  {duration:8.3f}s  {name}" for name, duration in self.phases),
+            f"imports by package (top {n}, self time):",
+            *(
+                f"  {duration:8.3f}s  {name}"
+                for name, duration in list(self.get_package_times().items())[:n]
+            ),
+            f"imports by module (top {n}, cumulative time):",
+            *(
+                f"  {cumulative:8.3f}s  {name}"
+                for name, (cumulative, _) in sorted(
+                    self.imports.items(), key=lambda item: item[1][0], reverse=True
+                )[:n]
+            ),
+        ]
+        print("\n".join(lines), file=file)
+
+    def _exec_module(self, name: str, loader: Any, module: Any) -> None:
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            loader.exec_module(module)
+        finally:
+            cumulative = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += cumulative
+            self.imports[name] = (cumulative, cumulative - children)
+
+
+class _ImportTimer(MetaPathFinder):
+    # finds module specs using the other finders and wraps their loaders to time `exec_module`
+
+    def __init__(self, profiler: StartupProfiler):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None) -> ModuleSpec | None:  # noqa
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(self._profiler, fullname, spec.loader)
+        return spec
+
+
+class _TimedLoader:
+    # a loader that times `exec_module`, all other attributes are those of the wrapped loader (e.g. `get_resource_reader`)
+
+    def __init__(self, profiler: StartupProfiler, name: str, loader: Any):
+        self._profiler = profiler
+        self._name = name
+        self._loader = loader
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec: ModuleSpec) -> Any:  # noqa
+        create_module = getattr(self._loader, "create_module", None)
+        return None if create_module is None else create_module(spec)
+
+    def exec_module(self, module: Any) -> None:  # noqa
+        # modules should refer to their actual loader
+        module.__loader__ = self._loader
+        module.__spec__.loader = self._loader
+        self._profiler._exec_module(self._name, self._loader, module)
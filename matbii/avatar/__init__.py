@@ -1,8 +1,12 @@
 """Package defining avatar related functionality."""
 
 # avatar
-from icua.agent import Avatar, AvatarActuator
+from icua.agent import AvatarActuator
+from .avatar import Avatar
+from .layered_surface import LayeredSVGSurface, get_dirty_layers
 from .exit_actuator import ExitActuator
+from .headless_avatar import HeadlessAvatar
+from .synthetic_participant import SyntheticParticipant
 from ..tasks import (
     AvatarTrackingActuator,
     AvatarSystemMonitoringActuator,
@@ -15,7 +19,11 @@ from icua.extras.eyetracking import EyetrackerIOSensor, tobii
 __all__ = (
     "Avatar",
     "AvatarActuator",
+    "LayeredSVGSurface",
+    "get_dirty_layers",
     "ExitActuator",
+    "HeadlessAvatar",
+    "SyntheticParticipant",
     "AvatarTrackingActuator",
     "AvatarSystemMonitoringActuator",
     "AvatarResourceManagementActuator",
@@ -0,0 +1,50 @@
+"""Implementation of the avatar that displays the UI (see `icua.agent.Avatar`), it renders with a `LayeredSVGSurface` so that only the task panels that have changed are re-rasterised each frame."""
+
+from star_ray import Sensor, Actuator
+from star_ray.agent import AgentRouted, IOSensor, observe
+from star_ray_pygame import WindowConfiguration, View
+from star_ray_xml import XMLQuery, XMLSensor
+from icua.agent import Avatar as _Avatar
+
+from .layered_surface import LayeredSVGSurface, get_dirty_layers, use_layered_surface
+
+
+class Avatar(_Avatar):
+    """An `icua.agent.Avatar` that tracks which layers (task panels, guidance elements) of the UI are modified by each `XMLQuery` it observes. Only these layers are re-rasterised when the UI is rendered, the cached bitmaps of the other layers are reused (see `LayeredSVGSurface`)."""
+
+    def __init__(
+        self,
+        sensors: list[Sensor],
+        actuators: list[Actuator],
+        window_config: WindowConfiguration = None,
+        layered: bool = False,
+        view: View | None = None,
+        **kwargs,
+    ):
+        """Constructor.
+
+        Args:
+            sensors (list[Sensor]): list of initial sensors, see `icua.agent.Avatar`.
+            actuators (list[Actuator]): list of initial actuators, see `icua.agent.Avatar`.
+            window_config (WindowConfiguration, optional): UI window configuration. Defaults to None.
+            layered (bool, optional): whether to render with a `LayeredSVGSurface`, if False the entire UI is rasterised each frame. Defaults to False.
+            view (View | None, optional): an existing view (window) to use, e.g. the view of the avatar of a previous session (see `matbii.session_server.SessionServer`), `window_config` is ignored if this is given. Defaults to None, which opens a new window.
+            kwargs (dict[str,Any]): additional optional keyword arguments.
+        """
+        if view is None:
+            super().__init__(sensors, actuators, window_config=window_config, **kwargs)
+        else:
+            # as in `star_ray_pygame.avatar.Avatar` but without opening a new window
+            sensors = [*(sensors if sensors else []), XMLSensor(), IOSensor(view)]
+            self._view = view
+            self._state = None
+            actuators = actuators if actuators else []
+            AgentRouted.__init__(self, sensors, actuators, **kwargs)
+        self._surface = use_layered_surface(self._view) if layered else None
+
+    @observe
+    def _on_xml_change(self, observation: XMLQuery):
+        """Called whenever an `XMLQuery` event is received via the `XMLSensor` attached to this agent, it will invalidate the layers that are modified by the query and update the state of the view."""
+        if isinstance(self._surface, LayeredSVGSurface):
+            self._surface.invalidate(get_dirty_layers(observation, self._state))
+        observation.__execute__(self._state)
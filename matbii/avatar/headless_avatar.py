@@ -0,0 +1,35 @@
+"""Implementation of an avatar that does not display a UI, it is used when running `matbii` in headless mode (see `matbii.environment.HeadlessMultiTaskEnvironment`)."""
+
+from star_ray import Sensor, Actuator
+from star_ray.agent import AgentRouted
+from icua.event import RenderEvent
+
+
+class HeadlessAvatar(AgentRouted):
+    """An avatar that does not display a UI and so does not receive any user input. It takes the place of `Avatar` in headless mode, task related actuators are added to it as usual when a task is enabled.
+
+    A `RenderEvent` is attempted each cycle (as if a frame was rendered) so that event logs have the same structure as those produced with a UI, this is required by post-analysis (see e.g. `matbii.extras.analysis.get_task_events`).
+    """
+
+    def __init__(
+        self,
+        sensors: list[Sensor] | None = None,
+        actuators: list[Actuator] | None = None,
+        **kwargs,
+    ):
+        """Constructor.
+
+        Args:
+            sensors (list[Sensor], optional): list of initial sensors. Defaults to None.
+            actuators (list[Actuator], optional): list of initial actuators, this should include an actuator that is capable of attempting `RenderEvent`s (see e.g. `AvatarActuator`). Defaults to None.
+            kwargs (dict[str,Any]): additional optional keyword arguments.
+        """
+        super().__init__(sensors if sensors else [], actuators if actuators else [], **kwargs)
+
+    def __cycle__(self):  # noqa: D105
+        super().__cycle__()
+        self.render()
+
+    def render(self) -> None:
+        """Triggers a `RenderEvent`, nothing is rendered."""
+        self.attempt(RenderEvent())
@@ -0,0 +1,265 @@
+"""Module defining `LayeredSVGSurface`, a render surface that only re-rasterises the parts of the svg that have changed since the last frame.
+
+Most simulation cycles change only a few attributes (e.g. the position of the tracking target, the level of a tank or the colour of a light), but `CairoSVGSurface` serialises and rasterises the entire svg tree on every frame. `LayeredSVGSurface` treats each top-level element of the root svg (e.g. each task panel, guidance box or guidance arrow) as a layer. Each layer is rasterised on its own and cached as a bitmap, a frame is composited from these bitmaps and only the layers that have been invalidated (see `LayeredSVGSurface.invalidate`) are rasterised again.
+
+Layers that are dirtied by an `XMLQuery` are resolved with `get_dirty_layers` before the query is executed. Task actions report the task that they modify (`TASK_ID`), other queries are resolved from their `xpath`. If the dirty layers of a query cannot be resolved all layers are invalidated.
+
+Most of the geometry of a task is static (e.g. the outlines of the tanks or the grid of the tracking task). Task templates mark these parts with `data-static="true"` (typically on a `<g>` element that is a child of the task's root element). When a layer contains static parts they are rasterised separately and cached by their svg source (which depends only on the task configuration) and the surface size, so that when the task changes only its dynamic parts are rasterised again.
+"""
+
+import re
+import sys
+from collections.abc import Iterable
+from copy import deepcopy
+from itertools import groupby
+
+import cairosvg
+import numpy as np
+import pygame
+from lxml import etree as ET
+from star_ray_pygame import View
+from star_ray_pygame.cairosurface import CairoSVGSurface
+from star_ray_xml import XMLState, XMLQuery, Insert, XPathElementsNotFound
+from icua.event import DrawArrowAction, DrawBoxAction
+
+from ..utils._element_index import ElementIndex
+
+__all__ = ("LayeredSVGSurface", "get_dirty_layers", "use_layered_surface")
+
+# matches xpaths of the form: //*[@id='<ID>'] which can be resolved with the `ElementIndex`
+_ID_XPATH = re.compile(r"^//\*\[@id='([^']+)'\]$")
+# attribute that marks the static parts of a task, e.g. `<g data-static="true">`, see `LayeredSVGSurface`
+STATIC_ATTRIBUTE = "data-static"
+# the maximum number of static bitmaps that are cached
+STATIC_CACHE_SIZE = 32
+# elements that define content for use elsewhere but are not rendered themselves
+_DEFINITION_TAGS = ("defs", "symbol", "style")
+# pixel format of cairo's (premultiplied) ARGB32 format, cairo uses native byte order
+_CAIRO_FORMAT = "BGRA" if sys.byteorder == "little" else "ARGB"
+
+
+def get_dirty_layers(query: XMLQuery, state: XMLState) -> set[ET._Element] | None:
+    """Get the layers (top-level elements of the root svg) that will be modified by executing `query` on `state`. This must be called before the query is executed. Layers that are inserted by the query are not included, they are new layers and will be rasterised regardless.
+
+    Args:
+        query (XMLQuery): the query.
+        state (XMLState): the state that the query will be executed on.
+
+    Returns:
+        set[ET._Element] | None: the dirty layers, or None if they could not be resolved (all layers should be considered dirty).
+    """
+    if not query.is_write:
+        return set()
+    root = state.get_root()._base
+    index = ElementIndex.get_index(state)
+    # task actions report the task (panel) that they modify
+    task_id = getattr(query, "TASK_ID", None)
+    if task_id is not None:
+        return _get_layers(root, _get_by_id(index, task_id))
+    # guidance elements are drawn (inserted or updated) by id
+    if isinstance(query, DrawArrowAction):
+        return _get_layers(root, _get_by_id(index, query.data["id"]))
+    if isinstance(query, DrawBoxAction) and "id" in query.box_data:
+        return _get_layers(root, _get_by_id(index, query.box_data["id"]))
+    xpath = getattr(query, "xpath", None)
+    if xpath is None:
+        return None  # unknown query, it may modify anything
+    match = _ID_XPATH.match(xpath)
+    if match:
+        elements = _get_by_id(index, match.group(1))
+    else:
+        elements = [element._base for element in state.xpath(xpath)]
+    if any(element is root for element in elements):
+        if not isinstance(query, Insert):
+            return None  # the root has changed
+        # inserted elements become new layers
+        elements = [element for element in elements if element is not root]
+    return _get_layers(root, elements)
+
+
+def use_layered_surface(view: View) -> "LayeredSVGSurface":
+    """Replace the render surface of the given `View` with a `LayeredSVGSurface` of the same size.
+
+    Args:
+        view (View): the view.
+
+    Returns:
+        LayeredSVGSurface: the new surface, layers should be invalidated via this surface.
+    """
+    surface = view._surface
+    if not isinstance(surface, LayeredSVGSurface):
+        surface = LayeredSVGSurface(surface.surface_size, _debug=surface._debug)
+        view._surface = surface
+    return surface
+
+
+def _is_static(element: ET._Element) -> bool:
+    return element.get(STATIC_ATTRIBUTE, "false").lower() == "true"
+
+
+def _is_definition(element: ET._Element) -> bool:
+    return ET.QName(element).localname in _DEFINITION_TAGS
+
+
+def _get_by_id(index: ElementIndex, element_id: str) -> list[ET._Element]:
+    try:
+        return [index.get(element_id)._base]
+    except XPathElementsNotFound:
+        return []  # the element will be inserted (or the query will fail)
+
+
+def _get_layers(root: ET._Element, elements: Iterable[ET._Element]) -> set[ET._Element]:
+    layers = set()
+    for element in elements:
+        parent = element.getparent()
+        while parent is not None and parent is not root:
+            element, parent = parent, parent.getparent()
+        if parent is root:
+            layers.add(element)
+    return layers
+
+
+class LayeredSVGSurface(CairoSVGSurface):
+    """A `CairoSVGSurface` that rasterises each top-level element of the root svg (a layer) separately and caches the resulting bitmaps. A frame is composited from the cached bitmaps, only layers that are new or that have been invalidated since the last frame are rasterised. Layers are composited in document order, the result is the same as rasterising the entire svg.
+
+    Layers must be invalidated when they are modified (see `invalidate` and `get_dirty_layers`), layers that are inserted or removed are handled automatically. All layers are invalidated if the attributes of the root svg change. Static children of a layer (see `STATIC_ATTRIBUTE`) are cached separately and are reused when the rest of the layer is rasterised again.
+    """
+
+    def __init__(self, surface_size: tuple[int, int], _debug: bool = False):
+        """Constructor.
+
+        Args:
+            surface_size (tuple[int,int]) : size of the render surface.
+            _debug (bool, optional): whether to enable debug mode, this will render debug information to the UI. Defaults to False.
+        """
+        super().__init__(surface_size, _debug=_debug)
+        # layer (top-level element) -> cached bitmap, in document order
+        self._layers: dict[ET._Element, pygame.Surface] = dict()
+        # attributes of the root svg when the cached bitmaps were rasterised
+        self._svg_attrib: dict[str, str] = dict()
+        # (svg source, surface size) -> bitmap of a static part of a layer
+        self._static: dict[tuple[bytes, tuple[int, int]], pygame.Surface] = dict()
+
+    def invalidate(self, layers: Iterable[ET._Element] | None = None) -> None:
+        """Invalidate the cached bitmaps of the given layers, they will be rasterised on the next render.
+
+        Args:
+            layers (Iterable[ET._Element] | None, optional): the layers to invalidate (top-level elements of the root svg). Defaults to None, which invalidates all layers.
+        """
+        if layers is None:
+            self._layers.clear()
+        else:
+            for layer in layers:
+                self._layers.pop(layer, None)
+
+    def update(self, svg_tree: ET.ElementBase):
+        """Update internal svg data. Unlike `CairoSVGSurface.update` the svg tree is not serialised, layers are serialised when they are rasterised.
+
+        Args:
+            svg_tree (ET.ElementBase): root of the svg tree
+        """
+        assert svg_tree.tag.endswith("svg")
+        self._svg_tree = svg_tree
+        self._svg_size = (int(svg_tree.get("width")), int(svg_tree.get("height")))
+        self._svg_position = (int(svg_tree.get("x", 0)), int(svg_tree.get("y", 0)))
+        self._svg_source = None  # serialised on demand, see `render_to_array`
+        attrib = dict(svg_tree.attrib)
+        if self._svg_attrib != attrib:
+            self._svg_attrib = attrib
+            self.invalidate()
+
+    def render(self, window: pygame.Surface, background_color="#ffffff"):
+        """Render the svg to the pygame surface `window`, only layers that have changed since the last render are rasterised.
+
+        Args:
+            window (pygame.Surface): pygame surface
+            background_color (str, optional): background color. Defaults to white.
+        """
+        self._window_size = window.get_size()
+        self._update_scaling_factor()
+        self._surface.fill(background_color)
+        layers = dict()
+        for element in self._svg_tree:
+            if not isinstance(element.tag, str):
+                continue  # comments or processing instructions
+            layer = self._layers.get(element, None)
+            if layer is None:
+                layer = self._rasterise_layer(element)
+            layers[element] = layer
+            self._surface.blit(layer, (0, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
+        # layers that are no longer part of the svg are dropped
+        self._layers = layers
+        window.fill(background_color)
+        window.blit(self._surface, self.surface_position)
+        pygame.display.flip()
+
+    def render_to_array(self, size: tuple[int, int]) -> np.ndarray:  # noqa: D102
+        if self._svg_source is None:
+            self._svg_source = ET.tostring(
+                self._svg_tree, method="c14n2", with_comments=False
+            )
+        return super().render_to_array(size)
+
+    def _rasterise_layer(self, element: ET._Element) -> pygame.Surface:
+        children = [child for child in element if isinstance(child.tag, str)]
+        if not any(_is_static(child) for child in children):
+            return self._rasterise(self._to_svg(element))
+        # the static and dynamic parts of the layer are rasterised separately (in order)
+        definitions = [child for child in children if _is_definition(child)]
+        layer = pygame.Surface(self.surface_size, pygame.SRCALPHA)
+        for static, run in groupby(
+            (child for child in children if not _is_definition(child)), key=_is_static
+        ):
+            source = self._to_svg(element, definitions + list(run))
+            part = self._get_static(source) if static else self._rasterise(source)
+            layer.blit(part, (0, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
+        return layer
+
+    def _get_static(self, source: bytes) -> pygame.Surface:
+        key = (source, self.surface_size)
+        part = self._static.get(key, None)
+        if part is None:
+            if len(self._static) >= STATIC_CACHE_SIZE:
+                self._static.pop(next(iter(self._static)))
+            part = self._static[key] = self._rasterise(source)
+        return part
+
+    def _to_svg(
+        self, element: ET._Element, children: list[ET._Element] | None = None
+    ) -> bytes:
+        # the element is rendered in a copy of the root svg so that it is scaled and positioned exactly as it would be in the full svg
+        svg = self._svg_tree
+        root = ET.Element(svg.tag, svg.attrib, nsmap=svg.nsmap)
+        if children is None:
+            root.append(deepcopy(element))
+        else:
+            # only the given children of the element are rendered
+            parent = ET.SubElement(root, element.tag, element.attrib)
+            parent.extend(deepcopy(child) for child in children)
+        return ET.tostring(root, method="c14n2", with_comments=False)
+
+    def _rasterise(self, source: bytes) -> pygame.Surface:
+        tree = cairosvg.parser.Tree(bytestring=source)
+        size = self.surface_size
+        surface = cairosvg.surface.PNGSurface(
+            tree,
+            None,
+            dpi=96,
+            background_color=None,
+            output_width=size[0],
+            output_height=size[1],
+        ).cairo
+        size = (surface.get_width(), surface.get_height())
+        # a copy of the data is made, the cairo surface may be freed
+        return pygame.image.frombytes(bytes(surface.get_data()), size, _CAIRO_FORMAT)
+
+    def _update_scaling_factor(self) -> None:
+        # see `CairoSVGSurface._svg_to_npim`, the svg is scaled to fit the surface (maintaining its aspect ratio) and is centered
+        svg_size, sur_size = self.svg_size, self.surface_size
+        self._scaling_factor = min(
+            sur_size[0] / svg_size[0], sur_size[1] / svg_size[1]
+        )
+        self._surface_offset = (
+            (sur_size[0] - (svg_size[0] * self._scaling_factor)) / 2,
+            (sur_size[1] - (svg_size[1] * self._scaling_factor)) / 2,
+        )
@@ -0,0 +1,399 @@
+"""Implementation of a synthetic (scripted) participant, see `SyntheticParticipant` documentation for details."""
+
+import heapq
+import math
+import random
+import time
+from typing import Any
+
+import pygame
+from star_ray import Sensor, Actuator
+from star_ray.agent import decide
+from star_ray.event import Observation, ErrorObservation
+from star_ray_xml import Select
+from icua.event import (
+    Event,
+    KeyEvent,
+    MouseButtonEvent,
+    MouseMotionEvent,
+    EyeMotionEvent,
+)
+
+from .headless_avatar import HeadlessAvatar
+from ..guidance import (
+    TaskAcceptabilitySensor,
+    SystemMonitoringTaskAcceptabilitySensor,
+    ResourceManagementTaskAcceptabilitySensor,
+    TrackingTaskAcceptabilitySensor,
+)
+from ..utils._const import (
+    TASKS,
+    TASK_ID_TRACKING,
+    TASK_ID_SYSTEM_MONITORING,
+    TASK_ID_RESOURCE_MANAGEMENT,
+    DEFAULT_KEY_BINDING,
+    tank_id,
+    tank_level_id,
+    tracking_box_id,
+    tracking_target_id,
+)
+
+__all__ = ("SyntheticParticipant",)
+
+# sub-tasks that the participant will respond to, these are the sub-tasks of the guidance sensors
+_SUBTASKS = {
+    TASK_ID_SYSTEM_MONITORING: (
+        *[f"{TASK_ID_SYSTEM_MONITORING}.light-{i}" for i in (1, 2)],
+        *[f"{TASK_ID_SYSTEM_MONITORING}.slider-{i}" for i in (1, 2, 3, 4)],
+    ),
+    TASK_ID_RESOURCE_MANAGEMENT: tuple(
+        f"{TASK_ID_RESOURCE_MANAGEMENT}.tank-{t}" for t in ("a", "b")
+    ),
+    TASK_ID_TRACKING: (TASK_ID_TRACKING,),
+}
+# the buttons in the system monitoring task that may be clicked
+_SYSTEM_MONITORING_BUTTONS = (
+    *[f"light-{i}-button" for i in (1, 2)],
+    *[f"slider-{i}-button" for i in (1, 2, 3, 4)],
+)
+# pumps that transfer fuel into each of the main tanks
+_INPUT_PUMPS = {"a": ("ba", "ca", "ea"), "b": ("ab", "db", "fb")}
+_PUMPS = ("ab", "ba", "ca", "ea", "db", "fb", "ec", "fd")
+# pygame key codes of the keys that are used to control the tracking task
+_KEY_CODES = {
+    "right": pygame.K_RIGHT,
+    "left": pygame.K_LEFT,
+    "down": pygame.K_DOWN,
+    "up": pygame.K_UP,
+}
+# time (s) after which the participant checks whether the held keys move the tracking target towards the box
+_TRACKING_CHECK_TIME = 0.5
+
+
+class SyntheticParticipant(HeadlessAvatar):
+    """A `HeadlessAvatar` that simulates a participant, it generates the same user input events (`MouseButtonEvent`, `KeyEvent`, `MouseMotionEvent` and `EyeMotionEvent`) as a real participant would via the UI. These events are handled by the avatar's actuators in the usual way, task actions that result from them are therefore attributed to the user in post-analysis.
+
+    The participant attends to one task at a time, attention switches after a dwell time (exponentially distributed) and will favour tasks that are in an unacceptable state. Unacceptable (sub-)tasks are only noticed when attended, a response to them is made after a reaction time (log-normally distributed). Responses are:
+
+    - system monitoring: click the relevant `light-N-button` or `slider-N-button`.
+    - resource management: click a `pump-XY-button` that fills (or stops filling) a tank that is too low (or too high).
+    - tracking: hold the arrow keys (see `DEFAULT_KEY_BINDING`) that move the target towards the central box until it is inside the box.
+
+    With probability `error_rate`, a click will miss and instead target another button of the same task. The mouse follows attention (a `MouseMotionEvent` is generated on each switch). If `eyetracking_rate` is positive, `EyeMotionEvent`s are generated at the given rate (in simulation time) with the gaze position on the attended task, this can be used to test guidance that depends on eyetracking.
+
+    Task geometry is coarse: all events generated for a task are positioned at the center of the task (with some noise).
+
+    This agent should be used in a headless simulation (see `matbii.environment.HeadlessMultiTaskEnvironment`), where time is simulated.
+    """
+
+    def __init__(
+        self,
+        sensors: list[Sensor] | None = None,
+        actuators: list[Actuator] | None = None,
+        reaction_time: tuple[float, float] = (0.8, 0.3),
+        attention_dwell_time: float = 2.0,
+        error_rate: float = 0.05,
+        eyetracking_rate: float = 0.0,
+        seed: int | None = None,
+        **kwargs: dict[str, Any],
+    ):
+        """Constructor.
+
+        Args:
+            sensors (list[Sensor], optional): list of initial sensors, sensors that are required to track the tasks will be added. Defaults to None.
+            actuators (list[Actuator], optional): list of initial actuators, this should include an `AvatarActuator`. Defaults to None.
+            reaction_time (tuple[float, float], optional): mean and standard deviation (in seconds) of the time taken to respond to an unacceptable (sub-)task once it has been noticed. Defaults to (0.8, 0.3).
+            attention_dwell_time (float, optional): mean time (in seconds) that attention will remain on a task. Defaults to 2.0.
+            error_rate (float, optional): probability that a click will target the wrong button. Defaults to 0.05.
+            eyetracking_rate (float, optional): rate (in Hz) at which `EyeMotionEvent`s are generated, 0 will disable eyetracking. Defaults to 0.0.
+            seed (int | None, optional): random seed. Defaults to None.
+            kwargs (dict[str,Any]): additional optional keyword arguments.
+
+        Raises:
+            ValueError: if any of the arguments are out of range.
+        """
+        mean, std = reaction_time
+        if mean <= 0 or std < 0:
+            raise ValueError(f"Invalid argument: `reaction_time` {reaction_time}")
+        if attention_dwell_time <= 0:
+            raise ValueError(
+                f"Invalid argument: `attention_dwell_time` {attention_dwell_time} must be positive."
+            )
+        if not 0 <= error_rate <= 1:
+            raise ValueError(
+                f"Invalid argument: `error_rate` {error_rate} must be in [0, 1]."
+            )
+        if eyetracking_rate < 0:
+            raise ValueError(
+                f"Invalid argument: `eyetracking_rate` {eyetracking_rate} must be non-negative."
+            )
+        self._acceptability_sensors: dict[str, TaskAcceptabilitySensor] = {
+            TASK_ID_SYSTEM_MONITORING: SystemMonitoringTaskAcceptabilitySensor(),
+            TASK_ID_RESOURCE_MANAGEMENT: ResourceManagementTaskAcceptabilitySensor(),
+            TASK_ID_TRACKING: TrackingTaskAcceptabilitySensor(),
+        }
+        self._task_sensor = _TaskSensor()
+        sensors = list(sensors) if sensors else []
+        sensors.extend(self._acceptability_sensors.values())
+        sensors.append(self._task_sensor)
+        super().__init__(sensors, actuators, **kwargs)
+        # parameters of the log-normal reaction time distribution
+        sigma2 = math.log(1 + (std / mean) ** 2)
+        self._reaction_time = (math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+        self._attention_dwell_time = attention_dwell_time
+        self._error_rate = error_rate
+        self._eyetracking_rate = eyetracking_rate
+        self._random = random.Random(seed)
+
+        self._prev_time = None
+        self._attention: str | None = None  # task that is currently attended
+        self._attention_until = 0.0
+        self._saccade = False  # whether attention has just switched
+        self._eye_samples = 0.0  # fractional number of eye samples that are due
+        self._responses: list[tuple[float, int, str]] = []  # (time, n, subtask)
+        self._pending: set[str] = set()  # subtasks that will be responded to
+        self._n = 0
+        # tracking task state
+        self._keys_pressed: set[str] = set()
+        self._tracking_direction = 1  # flipped if the target moves the wrong way
+        self._tracking_distance = None  # distance when keys were (last) pressed
+        self._tracking_check_time = 0.0
+
+    @decide
+    def participate(self) -> list[Event]:
+        """Decide which user input events to generate this cycle.
+
+        Returns:
+            list[Event]: user input events.
+        """
+        t = time.time()
+        dt = 0.0 if self._prev_time is None else t - self._prev_time
+        self._prev_time = t
+        failures = {
+            task: self._get_failures(task)
+            for task, sensor in self._acceptability_sensors.items()
+            if sensor.is_active() and task in self._task_sensor.bounds
+        }
+        events = []
+        events.extend(self._update_attention(t, failures))
+        if self._attention is not None:
+            # failures are noticed when the task is attended
+            for subtask in failures.get(self._attention, ()):
+                if subtask not in self._pending:
+                    self._pending.add(subtask)
+                    self._n += 1
+                    due = t + self._random.lognormvariate(*self._reaction_time)
+                    heapq.heappush(self._responses, (due, self._n, subtask))
+        while self._responses and self._responses[0][0] <= t:
+            _, _, subtask = heapq.heappop(self._responses)
+            self._pending.discard(subtask)
+            task = subtask.split(".")[0]
+            if subtask in failures.get(task, ()):
+                events.extend(self._respond(t, task, subtask))
+        events.extend(self._update_tracking(t, failures))
+        events.extend(self._get_eye_events(dt))
+        return events
+
+    def _get_failures(self, task: str) -> list[str]:
+        sensor = self._acceptability_sensors[task]
+        failures = []
+        for subtask in _SUBTASKS[task]:
+            try:
+                if not sensor.is_acceptable(task=subtask):
+                    failures.append(subtask)
+            except KeyError:
+                pass  # the task has not yet been sensed
+        return failures
+
+    def _update_attention(
+        self, t: float, failures: dict[str, list[str]]
+    ) -> list[Event]:
+        if self._attention in failures:
+            # attention remains on a task until responses have been made
+            busy = self._keys_pressed or any(
+                subtask.startswith(self._attention) for subtask in self._pending
+            )
+            if busy or t < self._attention_until:
+                return []
+        if len(failures) == 0:
+            self._attention = None
+            return []
+        # prefer tasks that are currently unacceptable
+        candidates = [task for task, f in failures.items() if f] or list(failures)
+        if len(candidates) > 1 and self._attention in candidates:
+            candidates.remove(self._attention)
+        events = self._release_keys() if self._attention == TASK_ID_TRACKING else []
+        self._attention = self._random.choice(sorted(candidates))
+        self._attention_until = t + self._random.expovariate(
+            1 / self._attention_dwell_time
+        )
+        self._saccade = True
+        if self._eyetracking_rate > 0:
+            self._eye_samples = max(self._eye_samples, 1.0)  # gaze follows immediately
+        position = self._get_position(self._attention)
+        events.append(
+            MouseMotionEvent(
+                position=position,
+                position_raw=position,
+                relative=(0.0, 0.0),
+                relative_raw=(0.0, 0.0),
+                target=["root", self._attention],
+            )
+        )
+        return events
+
+    def _respond(self, t: float, task: str, subtask: str) -> list[Event]:
+        if task == TASK_ID_TRACKING:
+            return [] if self._keys_pressed else self._press_keys(t)
+        elif task == TASK_ID_SYSTEM_MONITORING:
+            button = f"{subtask.split('.')[1]}-button"
+            if self._random.random() < self._error_rate:
+                button = self._random.choice(
+                    [b for b in _SYSTEM_MONITORING_BUTTONS if b != button]
+                )
+            return self._click(task, button)
+        elif task == TASK_ID_RESOURCE_MANAGEMENT:
+            tank = subtask.split("-")[-1]
+            pump = self._choose_pump(tank)
+            if pump is None:
+                return []  # there is nothing that can be done
+            if self._random.random() < self._error_rate:
+                pump = self._random.choice([p for p in _PUMPS if p != pump])
+            return self._click(task, f"pump-{pump}-button")
+        return []
+
+    def _choose_pump(self, tank: str) -> str | None:
+        sensor = self._acceptability_sensors[TASK_ID_RESOURCE_MANAGEMENT]
+        level = sensor.beliefs[tank_id(tank)]["data-level"]
+        capacity = sensor.beliefs[tank_id(tank)]["data-capacity"]
+        acceptable = sensor.beliefs[tank_level_id(tank)]["data-level"] * capacity
+        # too low -> switch on a pump that fills the tank, too high -> switch one off
+        state = 0 if level < acceptable else 1
+        pumps = self._task_sensor.pumps
+        pumps = [p for p in _INPUT_PUMPS[tank] if pumps.get(p, None) == state]
+        return self._random.choice(pumps) if pumps else None
+
+    def _click(self, task: str, button: str) -> list[Event]:
+        position = self._get_position(task)
+        target = ["root", task, button]
+        return [
+            MouseButtonEvent(
+                button=MouseButtonEvent.BUTTON_LEFT,
+                status=status,
+                position=position,
+                position_raw=position,
+                target=target,
+            )
+            for status in (MouseButtonEvent.DOWN, MouseButtonEvent.UP)
+        ]
+
+    def _get_tracking_offset(self) -> tuple[float, float] | None:
+        beliefs = self._acceptability_sensors[TASK_ID_TRACKING].beliefs
+        target, box = beliefs[tracking_target_id()], beliefs[tracking_box_id()]
+        if "xy" not in target or "tl" not in box:
+            return None
+        cx = (box["tl"][0] + box["br"][0]) / 2
+        cy = (box["tl"][1] + box["br"][1]) / 2
+        return target["xy"][0] - cx, target["xy"][1] - cy
+
+    def _press_keys(self, t: float) -> list[Event]:
+        offset = self._get_tracking_offset()
+        if offset is None:
+            return []
+        keys = set()
+        # the keys that move the target towards the box (if _tracking_direction is correct)
+        for d, (neg, pos) in zip(offset, (("left", "right"), ("up", "down"))):
+            if d != 0:
+                keys.add(neg if d * self._tracking_direction > 0 else pos)
+        events = self._release_keys(list(self._keys_pressed - keys))
+        for key in sorted(keys - self._keys_pressed):
+            self._keys_pressed.add(key)
+            events.append(_key_event(key, KeyEvent.DOWN))
+        # check that the target is moving towards the box after some time
+        self._tracking_distance = math.hypot(*offset)
+        self._tracking_check_time = t + _TRACKING_CHECK_TIME
+        return events
+
+    def _release_keys(self, keys: list[str] | None = None) -> list[Event]:
+        keys = sorted(self._keys_pressed) if keys is None else keys
+        self._keys_pressed.difference_update(keys)
+        return [_key_event(key, KeyEvent.UP) for key in keys]
+
+    def _update_tracking(self, t: float, failures: dict[str, list[str]]) -> list[Event]:
+        if not self._keys_pressed:
+            return []
+        if not failures.get(TASK_ID_TRACKING, None):
+            return self._release_keys()  # the target is in the box (or the task is inactive)
+        if t < self._tracking_check_time:
+            return []
+        offset = self._get_tracking_offset()
+        if offset is not None and math.hypot(*offset) > self._tracking_distance:
+            # the target is moving away from the box, the participant learns the controls
+            self._tracking_direction = -self._tracking_direction
+        return self._press_keys(t)
+
+    def _get_eye_events(self, dt: float) -> list[Event]:
+        if self._eyetracking_rate <= 0 or self._attention is None:
+            return []
+        self._eye_samples += self._eyetracking_rate * dt
+        n = int(self._eye_samples)
+        self._eye_samples -= n
+        events = []
+        for _ in range(n):
+            position = self._get_position(self._attention)
+            events.append(
+                EyeMotionEvent(
+                    position=position,
+                    position_raw=position,
+                    position_screen=None,
+                    fixated=not self._saccade,
+                    in_window=True,
+                    target=["root", self._attention],
+                )
+            )
+            self._saccade = False
+        return events
+
+    def _get_position(self, task: str) -> tuple[float, float]:
+        x, y, width, height = self._task_sensor.bounds[task]
+        return (
+            x + width / 2 + self._random.gauss(0, width / 20),
+            y + height / 2 + self._random.gauss(0, height / 20),
+        )
+
+
+def _key_event(key: str, status: int) -> KeyEvent:
+    assert key in DEFAULT_KEY_BINDING
+    return KeyEvent(key=key, keycode=_KEY_CODES[key], status=status)
+
+
+class _TaskSensor(Sensor):
+    # senses the bounds of each task and the state of each pump (in the resource management task)
+
+    def __init__(self, *args: list[Any], **kwargs: dict[str, Any]):
+        super().__init__(*args, **kwargs)
+        self.bounds: dict[str, tuple[float, float, float, float]] = dict()
+        self.pumps: dict[str, int] = dict()
+
+    def __sense__(self) -> list[Event]:  # noqa
+        tasks = " or ".join(f"@id='{task}'" for task in TASKS)
+        pumps = " or ".join(f"@id='pump-{pump}-button'" for pump in _PUMPS)
+        return [
+            Select(xpath=f"//*[{tasks}]", attrs=["id", "x", "y", "width", "height"]),
+            Select(xpath=f"//*[{pumps}]", attrs=["id", "data-state"]),
+        ]
+
+    def __transduce__(self, observations: list[Observation]) -> list[Observation]:  # noqa
+        bounds, pumps = dict(), dict()
+        for observation in observations:
+            if isinstance(observation, ErrorObservation):
+                continue  # some tasks may not be active
+            for data in observation.values:
+                if "data-state" in data:
+                    pumps[data["id"].split("-")[1]] = data["data-state"]
+                else:
+                    bounds[data["id"]] = tuple(
+                        float(data[k]) for k in ("x", "y", "width", "height")
+                    )
+        self.bounds, self.pumps = bounds, pumps
+        return []
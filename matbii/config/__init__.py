@@ -8,17 +8,22 @@ from pydantic import (
     Field,
     field_validator,
     # NonNegativeInt,
+    NonNegativeFloat,
     PositiveInt,
     PositiveFloat,
     model_validator,
 )
-from typing import Any, ClassVar, Literal
+from typing import Any, ClassVar, Literal, TYPE_CHECKING
 from pathlib import Path
 from icua.agent.actuator_guidance import ArrowGuidanceActuator, BoxGuidanceActuator
+from star_ray import Actuator
 from star_ray.ui import WindowConfiguration
 from icua.extras.eyetracking import EyetrackerBase, EyetrackerIOSensor
 from ..utils import LOGGER
 
+if TYPE_CHECKING:
+    from ..avatar import SyntheticParticipant
+
 
 class GuidanceArrowConfiguration(BaseModel, validate_assignment=True):
     """Configuration relating to the arrow guidance."""
@@ -45,7 +50,7 @@ class GuidanceArrowConfiguration(BaseModel, validate_assignment=True):
     )
 
     def validate_from_context(self, context: "Configuration"):  # noqa
-        if not context.eyetracking.enable and self.mode == "gaze":
+        if not _is_gaze_available(context) and self.mode == "gaze":
             raise ValueError(
                 '`guidance.arrow.mode`: "gaze" is not supported when eyetracking is disabled.'
             )
@@ -118,6 +123,14 @@ class GuidanceConfiguration(BaseModel, validate_assignment=True):
         default=3.0,
         description="The grace period to use (seconds) - how long to wait before guidance is shown to the user, see also `grace_mode`.",
     )
+    reactive: bool = Field(
+        default=False,
+        description="Whether guidance decisions should only be made when they may have changed (a task becomes (un)acceptable, the user's attention changes or a grace period elapses) rather than every cycle. This reduces the cost of guidance when tasks are stable.",
+    )
+    subscribe: bool = Field(
+        default=False,
+        description="Whether guidance sensors should subscribe to changes in the task elements they depend on and only sense these elements when they change, rather than sensing every cycle. This reduces the cost of guidance when tasks are stable.",
+    )
     arrow: GuidanceArrowConfiguration = Field(
         default_factory=GuidanceArrowConfiguration,
         description="Configuration for displaying arrow guidance.",
@@ -169,7 +182,7 @@ class GuidanceConfiguration(BaseModel, validate_assignment=True):
             self.arrow.validate_from_context(context)
             if (
                 self.attention_mode in ["gaze", "fixation"]
-                and not context.eyetracking.enable
+                and not _is_gaze_available(context)
             ):
                 raise ValueError(
                     f'`guidance.attention_mode`: "{self.attention_mode}" is not supported when eyetracking is disabled.'
@@ -202,6 +215,10 @@ class ExperimentConfiguration(BaseModel, validate_assignment=True):
         default={},
         description="Any additional meta data you wish to associate with this experiment.",
     )
+    task_cache: str | None = Field(
+        default=None,
+        description="The path to the directory in which loaded tasks (rendered svg and parsed schedules) are cached (e.g. `~/.cache/matbii/tasks`), tasks are loaded from the cache the next time the simulation is run unless their configuration files (or the installed versions of `matbii`, `icua`, `star_ray` or `pyfuncschedule`) have changed. Defaults to null, which disables the cache.",
+    )
 
     @field_validator("id", mode="before")
     @classmethod
@@ -242,6 +259,68 @@ class ExperimentConfiguration(BaseModel, validate_assignment=True):
         pass
 
 
+class SyntheticParticipantConfiguration(BaseModel, validate_assignment=True):
+    """Configuration relating to the synthetic participant, see `matbii.avatar.SyntheticParticipant` for details."""
+
+    enable: bool = Field(
+        default=False,
+        description="Whether to use a synthetic participant instead of a real one, this requires `ui.headless` to be True.",
+    )
+    reaction_time: tuple[PositiveFloat, NonNegativeFloat] = Field(
+        default=(0.8, 0.3),
+        description="The mean and standard deviation (in seconds) of the (log-normally distributed) time taken to respond to a task failure once it has been noticed.",
+    )
+    attention_dwell_time: PositiveFloat = Field(
+        default=2.0,
+        description="The mean time (in seconds) that attention remains on a task before switching, tasks that are in failure are favoured when switching.",
+    )
+    error_rate: float = Field(
+        default=0.05,
+        ge=0.0,
+        le=1.0,
+        description="The probability that a click misses its intended button (and instead clicks another button in the same task).",
+    )
+    eyetracking_rate: NonNegativeFloat = Field(
+        default=0.0,
+        description="The rate (in Hz) at which eyetracking events are generated, 0 disables eyetracking. If positive, guidance options that require eyetracking may be used.",
+    )
+    seed: int | None = Field(
+        default=None,
+        description="The random seed of the synthetic participant.",
+    )
+
+    def validate_from_context(self, context: "Configuration"):  # noqa
+        if self.enable and not context.ui.headless:
+            raise ValueError(
+                "`participant.synthetic.enable` is only supported when `ui.headless` is True."
+            )
+
+    def new_synthetic_participant(
+        self, actuators: list[Actuator]
+    ) -> "SyntheticParticipant | None":
+        """Factory method for the synthetic participant.
+
+        Args:
+            actuators (list[Actuator]): initial actuators of the synthetic participant (see `SyntheticParticipant`).
+
+        Returns:
+            SyntheticParticipant | None: the synthetic participant or None if it is not enabled.
+        """
+        if not self.enable:
+            return None
+        from ..avatar import SyntheticParticipant
+
+        return SyntheticParticipant(
+            [],
+            actuators,
+            reaction_time=self.reaction_time,
+            attention_dwell_time=self.attention_dwell_time,
+            error_rate=self.error_rate,
+            eyetracking_rate=self.eyetracking_rate,
+            seed=self.seed,
+        )
+
+
 class ParticipantConfiguration(BaseModel, validate_assignment=True):
     """Configuration relating to the participant (or user)."""
 
@@ -253,9 +332,13 @@ class ParticipantConfiguration(BaseModel, validate_assignment=True):
         default={},
         description="Any additional meta data you wish to associate with the participant.",
     )
+    synthetic: SyntheticParticipantConfiguration = Field(
+        default_factory=SyntheticParticipantConfiguration,
+        description="Configuration for a synthetic participant, this is useful for testing and benchmarking in headless mode (see `ui.headless`).",
+    )
 
     def validate_from_context(self, context: "Configuration"):  # noqa
-        pass
+        self.synthetic.validate_from_context(context)
 
 
 class EyetrackingConfiguration(BaseModel, validate_assignment=True):
@@ -304,14 +387,20 @@ class EyetrackingConfiguration(BaseModel, validate_assignment=True):
             )
         return value
 
-    def new_eyetracking_sensor(self) -> EyetrackerIOSensor | None:
+    def new_eyetracking_sensor(
+        self, eyetracker: EyetrackerBase | None = None
+    ) -> EyetrackerIOSensor | None:
         """Factory method for an eyetracking sensor.
 
+        Args:
+            eyetracker (EyetrackerBase | None, optional): an existing eyetracker to use (e.g. one that is already connected). Defaults to None, which will create a new eyetracker (see `new_eyetracker`).
+
         Returns:
             EyetrackerIOSensor | None: the sensor, created based on this eyetracking configuration.
         """
         if self.enable:
-            eyetracker = self.new_eyetracker()
+            if eyetracker is None:
+                eyetracker = self.new_eyetracker()
             return EyetrackerIOSensor(
                 eyetracker, self.velocity_threshold, self.moving_average_n
             )
@@ -349,6 +438,10 @@ class LoggingConfiguration(BaseModel, validate_assignment=True):
         default="./logs/",
         description="The path to the directory where log files will be written.",
     )
+    binary: bool = Field(
+        default=False,
+        description="Whether to also write events to a compact binary (length-prefixed msgpack) event log file alongside the text event log file, see `matbii.extras.analysis.BinaryEventLogParser` for reading these files. This requires `msgpack` (`pip install matbii[binary]`).",
+    )
 
     @field_validator("level", mode="before")
     @classmethod
@@ -372,6 +465,18 @@ class UIConfiguration(BaseModel, validate_assignment=True):
         default=680,
         description="The height of the canvas used to render the tasks.",
     )
+    headless: bool = Field(
+        default=False,
+        description="Whether to run the simulation without a UI (and without user input). In headless mode the simulation runs on a virtual clock (faster than real-time) and terminates after `experiment.duration` (virtual) seconds, the event log has the same format as usual. This is useful for testing experiment configurations and for generating data for analysis pipelines, e.g. with a simulated participant.",
+    )
+    headless_step: PositiveFloat = Field(
+        default=0.01,
+        description="The (virtual) time in seconds between simulation cycles when running in headless mode.",
+    )
+    layered_rendering: bool = Field(
+        default=False,
+        description="Whether each task panel (and guidance element) is rasterised separately and cached, only those that have changed since the last frame are rasterised again. This reduces the time taken to render a frame, by default the entire UI is rasterised each frame.",
+    )
     # size: tuple[PositiveInt, PositiveInt] = Field(
     #     default=(810, 680),
     #     description="The width and height of the canvas used to render the tasks. This should fully encapsulate all task elements. If a task appears to be off screen, try increasing this value.",
@@ -398,6 +503,17 @@ class UIConfiguration(BaseModel, validate_assignment=True):
             del data["offset"]
         return data
 
+    def validate_from_context(self, context: "Configuration"):  # noqa
+        if self.headless:
+            if context.experiment.duration <= 0:
+                raise ValueError(
+                    "`experiment.duration` must be positive when `ui.headless` is True, otherwise the simulation will never terminate."
+                )
+            if context.eyetracking.enable:
+                raise ValueError(
+                    "`eyetracking.enable` must be False when `ui.headless` is True."
+                )
+
 
 def _default_window_configuration_factory():
     window_config = WindowConfiguration()
@@ -502,3 +618,13 @@ class Configuration(BaseModel, validate_assignment=True):
     def validate_from_context(self):  # noqa
         self.guidance.validate_from_context(self)
         self.eyetracking.validate_from_context(self)
+        self.participant.validate_from_context(self)
+        self.ui.validate_from_context(self)
+
+
+def _is_gaze_available(context: Configuration) -> bool:
+    # gaze data is provided by an eyetracker or by a synthetic participant
+    synthetic = context.participant.synthetic
+    return context.eyetracking.enable or (
+        synthetic.enable and synthetic.eyetracking_rate > 0
+    )
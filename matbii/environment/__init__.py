@@ -1,5 +1,6 @@
 """Package defining environment related functionality."""
 
 from icua.environment import MultiTaskEnvironment, MultiTaskAmbient
+from .headless_environment import HeadlessMultiTaskEnvironment
 
-__all__ = ("MultiTaskEnvironment", "MultiTaskAmbient")
+__all__ = ("MultiTaskEnvironment", "MultiTaskAmbient", "HeadlessMultiTaskEnvironment")
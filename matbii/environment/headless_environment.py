@@ -0,0 +1,111 @@
+"""Module defining `HeadlessMultiTaskEnvironment`, a `MultiTaskEnvironment` that runs on a virtual clock without a UI."""
+
+import asyncio
+from typing import Any
+
+from pydantic import BaseModel
+from star_ray import Agent
+from icua.environment import MultiTaskEnvironment
+
+from ..utils import LOGGER
+from ..utils._clock import VirtualClock
+
+__all__ = ("HeadlessMultiTaskEnvironment",)
+
+
+class HeadlessMultiTaskEnvironment(MultiTaskEnvironment):
+    """A `MultiTaskEnvironment` that runs faster than real-time. Each simulation cycle advances a `VirtualClock` by a fixed `step` rather than waiting, schedules, task actuators and guidance agents all run on this virtual time. The event log has the same format as a normal run, all timestamps are virtual.
+
+    The avatar is typically a `matbii.avatar.HeadlessAvatar` as there is no UI. The simulation ends after `terminate_after` (virtual) seconds.
+
+    IMPORTANT: the clock should be installed before any agents are created (see `VirtualClock.install`), agents (e.g. those that follow a schedule) may record the time upon creation.
+    """
+
+    def __init__(
+        self,
+        avatar: Agent,
+        agents: list[Agent] = None,
+        clock: VirtualClock | None = None,
+        step: float = 0.01,
+        terminate_after: float = -1,
+        **kwargs: dict[str, Any],
+    ):
+        """Constructor.
+
+        Args:
+            avatar (Agent): the users avatar, typically a `matbii.avatar.HeadlessAvatar`.
+            agents (list[Agent], optional): list of initial agents. Defaults to None.
+            clock (VirtualClock | None, optional): the virtual clock. Defaults to None, which will create (and install) a new clock.
+            step (float, optional): (virtual) time between simulation cycles in seconds. Defaults to 0.01.
+            terminate_after (float, optional): (virtual) time after which to terminate the simulation, this must be positive. Defaults to -1.
+            kwargs (dict[str, Any]): additional optional keyword arguments, see `MultiTaskEnvironment` for options.
+
+        Raises:
+            ValueError: if `terminate_after` or `step` is not positive.
+        """
+        if terminate_after <= 0:
+            raise ValueError(
+                f"A headless simulation must terminate, `terminate_after` must be positive: {terminate_after}"
+            )
+        if step <= 0:
+            raise ValueError(f"`step` must be positive: {step}")
+        if clock is None:
+            clock = VirtualClock()
+            clock.install()
+        self._clock = clock
+        super().__init__(
+            avatar,
+            agents=agents,
+            wait=step,
+            terminate_after=terminate_after,
+            **kwargs,
+        )
+
+    @property
+    def clock(self) -> VirtualClock:
+        """Getter for the virtual clock of this environment.
+
+        Returns:
+            VirtualClock: the clock.
+        """
+        return self._clock
+
+    def run(self):
+        """Entry point of the simulation, this call is blocking. The simulation will run as fast as possible until `terminate_after` (virtual) seconds have passed, the clock is uninstalled when the simulation ends."""
+
+        # event timestamps are set by the real clock (it is bound when `star_ray.Event` is defined), they are corrected when the event is logged. This is done here (rather than in the constructor) so that other loggers may be attached first (see e.g. `BinaryEventLogger.attach`)
+        self.ambient._event_logger = _VirtualTimeEventLogger(
+            self.ambient._event_logger, self._clock
+        )
+
+        async def _run():
+            event_loop = asyncio.get_event_loop()
+            await self.__initialise__(event_loop)
+            running = True
+            while running:
+                running = await self.step()
+                self._clock.advance(self._wait)
+                if running and self._clock.elapsed >= self._terminate_after:
+                    LOGGER.debug(
+                        f"Closing simulation: time limit ({self._terminate_after}s) reached"
+                    )
+                    await self.ambient.__terminate__()
+                    running = False
+
+        try:
+            asyncio.run(_run())
+        finally:
+            self._clock.uninstall()
+
+
+class _VirtualTimeEventLogger:
+    # sets the timestamp of events to the virtual time before they are logged (by the given logger)
+
+    def __init__(self, logger: Any | None, clock: VirtualClock):
+        self.logger = logger
+        self.clock = clock
+
+    def log(self, event: BaseModel):
+        event.timestamp = self.clock.time()
+        if self.logger is not None:
+            self.logger.log(event)
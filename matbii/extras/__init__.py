@@ -1,6 +1,15 @@
-"""Extra functionality for matbii such as analysis utilities."""
+"""Extra functionality for matbii such as analysis utilities.
 
-from . import analysis
-from . import scripts
+Subpackages are imported when they are first used, `scripts` imports plotting libraries (e.g. `matplotlib`) that are only needed when running a script (see `python -m matbii --script`).
+"""
+
+import importlib
+from typing import Any
 
 __all__ = ["analysis", "scripts"]
+
+
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
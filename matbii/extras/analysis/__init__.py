@@ -1,9 +1,25 @@
 """Module that contains useful post analysis functions."""
 
 from .get_task import (
+    get_task_events,
     get_system_monitoring_task_events,
     get_resource_management_task_events,
     get_tracking_task_events,
+    TASK_EVENT_TYPES,
+)
+from .event_log import (
+    BinaryEventLogParser,
+    TextEventLogParser,
+    get_event_log_parser,
+    iter_event_log,
+    convert_event_log,
+)
+from .event_log_cache import parse_event_log
+from .intervals import (
+    isin_intervals,
+    merge_intervals,
+    intersect_intervals,
+    overlap_duration,
 )
 
 from icua.extras.analysis import (
@@ -19,15 +35,21 @@ from icua.extras.analysis import (
     get_start_and_end_time,
     get_svg_as_image,
     get_frame_timestamps,
-    merge_intervals,
-    isin_intervals,
 )
 
 __all__ = [
     "EventLogParser",
+    "BinaryEventLogParser",
+    "TextEventLogParser",
+    "get_event_log_parser",
+    "iter_event_log",
+    "convert_event_log",
+    "parse_event_log",
+    "get_task_events",
     "get_system_monitoring_task_events",
     "get_resource_management_task_events",
     "get_tracking_task_events",
+    "TASK_EVENT_TYPES",
     "get_mouse_button_events",
     "get_mouse_motion_events",
     "get_keyboard_events",
@@ -41,4 +63,6 @@ __all__ = [
     "get_svg_as_image",
     "merge_intervals",
     "isin_intervals",
+    "intersect_intervals",
+    "overlap_duration",
 ]
@@ -0,0 +1,400 @@
+"""Module that defines functionality for reading and writing binary event log files, see `matbii.utils.BinaryEventLogger` for details of the format.
+
+A `BinaryEventLogParser` can be used in place of an `EventLogParser` with any of the `get_*` functions in `matbii.extras.analysis`, e.g.
+
+```python
+parser = BinaryEventLogParser()
+parser.discover_event_classes("matbii")
+events = list(parser.parse("event_log.msgpack"))
+df = get_tracking_task_events(parser, events)
+```
+
+Existing text event log files can be converted to the binary format with `convert_event_log`.
+
+A `BinaryEventLogParser` can also decode records straight into dataframes (see `BinaryEventLogParser.parse_dataframes`), this skips validating each event and is much faster for frequent events (e.g. eyetracking), e.g.
+
+```python
+dfs = parser.parse_dataframes(
+    "event_log.msgpack",
+    EyeMotionEvent,
+    include=["timestamp", "position", "fixated", "target"],
+    include_frame=True,
+)
+eyetracking_df = dfs[EyeMotionEvent]
+```
+
+Both `BinaryEventLogParser` and `TextEventLogParser` read event log files one record at a time, events are yielded lazily and can be filtered by type before they are validated (see `TextEventLogParser.parse`). This keeps memory bounded for large event log files (e.g. with high frequency eyetracking), as long as the events are also consumed lazily:
+
+```python
+parser = get_event_log_parser("event_log.log")
+df = get_tracking_task_events(
+    parser, parser.parse("event_log.log", types=TASK_EVENT_TYPES)
+)
+```
+"""
+
+import json
+from collections.abc import Callable, Iterator
+from contextlib import closing
+from pathlib import Path
+from types import UnionType
+from typing import Any, Union, get_args, get_origin
+import pandas as pd
+from pydantic import ValidationError
+
+from star_ray import Event
+from icua.event import RenderEvent, XPathQuery
+from icua.extras.analysis import EventLogParser
+
+from ...utils import (
+    LOGGER,
+    BinaryEventLogger,
+    iter_binary_event_log,
+    iter_text_event_log,
+)
+from ...utils._event_log import BINARY_LOG_SUFFIX, _iter_text_event_log
+
+__all__ = (
+    "BinaryEventLogParser",
+    "TextEventLogParser",
+    "get_event_log_parser",
+    "iter_event_log",
+    "convert_event_log",
+)
+
+# types that can be used to filter events, as with `isinstance`
+EventTypes = type | UnionType | tuple[type, ...]
+
+
+class _StreamingEventLogParser(EventLogParser):
+    # base class for parsers that read event log files one record at a time
+
+    def get_class_names(self, types: EventTypes | None) -> set[str] | None:
+        """Get the names of the (discovered) event classes that are subclasses of `types`.
+
+        Args:
+            types (EventTypes | None): event types, as with `isinstance`.
+
+        Returns:
+            set[str] | None: class names, or None if `types` is None.
+        """
+        if types is None:
+            return None
+        return {
+            name for name, cls in self._event_cls_map.items() if issubclass(cls, types)
+        }
+
+    def _get_event_class(self, class_name: str) -> type[Event]:
+        cls = self._event_cls_map.get(class_name, None)
+        if cls is None:
+            raise ValueError(f"Missing class: {class_name}")
+        return cls
+
+    def _get_start_time(self, records: Iterator[tuple[float, str, Any]]) -> float:
+        # timestamp of the first record, `records` should not be filtered
+        with closing(records):
+            first = next(records, None)
+        return first[0] if first else 0
+
+
+class TextEventLogParser(_StreamingEventLogParser):
+    """Parser for text event logs (as written by `icua.utils.EventLogger`). Unlike `EventLogParser` the event log file is read one line at a time, and lines can be filtered by event type before they are decoded, see `TextEventLogParser.parse`."""
+
+    def parse(
+        self,
+        file_path: str | Path,
+        relative_start: bool = True,
+        types: EventTypes | None = None,
+    ) -> Iterator[tuple[float, Event]]:
+        """Parse a text event log file. The expected format per line is: {TIMESTAMP} {EVENT}.
+
+        Args:
+            file_path (str | Path): path to the event log file
+            relative_start (bool): where to normalise timestamps to be relative to the first log entry.
+            types (EventTypes | None, optional): types of the events to parse (as with `isinstance`), lines for other event classes are skipped without being decoded. Event classes that have not been discovered are also skipped. Defaults to None, which will parse all events.
+
+        Yields:
+            tuple[float, star_ray.Event]: (timestamp, event)
+        """
+        class_names = self.get_class_names(types)
+        start_time = 0
+        if relative_start:
+            start_time = self._get_start_time(_iter_text_event_log(file_path))
+        for timestamp, class_name, data in _iter_text_event_log(file_path, class_names):
+            cls = self._get_event_class(class_name)
+            try:
+                event = cls.model_validate_json(data)
+            except ValidationError:
+                LOGGER.warning(
+                    f"Failed to validate: {class_name}(id={json.loads(data).get('id', None)}, ...)"
+                )
+                continue
+            event.timestamp -= start_time
+            yield (timestamp - start_time, event)
+
+
+class BinaryEventLogParser(_StreamingEventLogParser):
+    """Parser for binary event logs, see `matbii.utils.BinaryEventLogger`."""
+
+    def get_event_log_file(self, directory: str | Path) -> str:
+        """Locates the binary event log file within a directory.
+
+        Args:
+            directory (str | Path): path of the directory to search.
+
+        Returns:
+            str: the absolute path of the binary event log file
+        """
+        path = Path(directory).expanduser().resolve()
+        if not path.exists():
+            raise FileNotFoundError(f"Directory {path.as_posix()} not found")
+        log_files = [
+            f
+            for f in path.iterdir()
+            if f.name.startswith("event_log") and f.suffix == BINARY_LOG_SUFFIX
+        ]
+        if len(log_files) == 0:
+            raise FileNotFoundError(f"Binary log file in {path.as_posix()} not found")
+        if len(log_files) > 1:
+            raise ValueError(f"Multiple binary log files found in {path.as_posix()}")
+        return log_files[0].as_posix()
+
+    def parse(
+        self,
+        file_path: str | Path,
+        relative_start: bool = True,
+        types: EventTypes | None = None,
+    ) -> Iterator[tuple[float, Event]]:
+        """Parse a binary event log file.
+
+        Args:
+            file_path (str | Path): path to the binary event log file
+            relative_start (bool): where to normalise timestamps to be relative to the first log entry.
+            types (EventTypes | None, optional): types of the events to parse (as with `isinstance`), records for other event classes are skipped without being decoded. Event classes that have not been discovered are also skipped. Defaults to None, which will parse all events.
+
+        Yields:
+            tuple[float, star_ray.Event]: (timestamp, event)
+        """
+        class_names = self.get_class_names(types)
+        start_time = 0
+        if relative_start:
+            start_time = self._get_start_time(iter_binary_event_log(file_path))
+        for timestamp, class_name, data in iter_binary_event_log(
+            file_path, class_names
+        ):
+            cls = self._get_event_class(class_name)
+            try:
+                event = cls.model_validate(data)
+            except ValidationError:
+                LOGGER.warning(
+                    f"Failed to validate: {class_name}(id={data.get('id', None)}, ...)"
+                )
+                continue
+            event.timestamp -= start_time
+            yield (timestamp - start_time, event)
+
+    def parse_dataframes(
+        self,
+        file_path: str | Path,
+        types: EventTypes,
+        exclude: tuple[str] | list[str] | None = None,
+        include: tuple[str] | list[str] | None = None,
+        include_frame: bool = False,
+        relative_start: bool = True,
+    ) -> dict[type[Event], pd.DataFrame]:
+        """Parse the events of the given types from a binary event log file straight into dataframes, one for each event class. The result is the same as `as_dataframes` of the parsed events (see `EventLogParser.as_dataframes`), but the columns are built directly from the records, events are not validated or instantiated. Tuple fields (e.g. `position`) are converted from lists, other values are as they were logged. Records that would fail validation (and be skipped by `parse`) are included, e.g. eyetracking samples without a position.
+
+        Args:
+            file_path (str | Path): path to the binary event log file.
+            types (EventTypes): types of the events to include (as with `isinstance`), records for other event classes are skipped without being decoded.
+            exclude (tuple[str] | list[str] | None, optional): fields to exclude. Defaults to None.
+            include (tuple[str] | list[str] | None, optional): fields to include. Defaults to None.
+            include_frame (bool, optional): whether to include the frame number of each event, `RenderEvent`s are parsed to count frames. Defaults to False.
+            relative_start (bool, optional): whether to normalise timestamps to be relative to the first log entry. Defaults to True.
+
+        Raises:
+            ValueError: if `include_frame` is True but there are no `RenderEvent`s in the event log file.
+
+        Returns:
+            dict[type[Event], pd.DataFrame]: a dataframe for each event class: event_class -> dataframe
+        """
+        if include_frame:
+            types = (types, RenderEvent)
+        class_names = self.get_class_names(types)
+        start_time = 0
+        if relative_start:
+            start_time = self._get_start_time(iter_binary_event_log(file_path))
+        # class name -> (event class, sort by logging timestamp, is render event)
+        classes: dict[str, tuple[type[Event], bool, bool]] = {}
+        records = []
+        for timestamp, class_name, data in iter_binary_event_log(
+            file_path, class_names
+        ):
+            if class_name not in classes:
+                cls = self._get_event_class(class_name)
+                classes[class_name] = (
+                    cls,
+                    issubclass(cls, XPathQuery),
+                    issubclass(cls, RenderEvent),
+                )
+            cls, is_query, is_render = classes[class_name]
+            t = timestamp - start_time
+            # events are ordered as in `EventLogParser.sort_by_timestamp`
+            key = t if is_query else data["timestamp"] - start_time
+            records.append((key, t, cls, is_render, data))
+        records.sort(key=lambda record: record[0])
+
+        log_timestamps = (include is None or "timestamp_log" in include) and (
+            exclude is None or "timestamp_log" not in exclude
+        )
+        columns: dict[type[Event], list[_Column]] = {}
+        timestamps_log: dict[type[Event], list[float]] = {}
+        frames: dict[type[Event], list[int]] = {}
+        frame = 0
+        for _, t, cls, is_render, data in records:
+            if is_render:
+                frame += 1
+                continue
+            if cls not in columns:
+                columns[cls] = _get_columns(cls, include, exclude, start_time)
+                timestamps_log[cls], frames[cls] = [], []
+            for column in columns[cls]:
+                column.append(data)
+            timestamps_log[cls].append(t)
+            frames[cls].append(frame)
+        if include_frame and frame == 0:
+            raise ValueError(
+                f"No `RenderEvent`s were found in the event log file but `include_frame = True`: {Path(file_path).as_posix()}"
+            )
+        dataframes = {}
+        for cls, cls_columns in columns.items():
+            data = {column.name: column.values for column in cls_columns}
+            if log_timestamps:
+                data["timestamp_log"] = timestamps_log[cls]
+            if include_frame:
+                data["frame"] = frames[cls]
+            dataframes[cls] = pd.DataFrame(data)
+        return dataframes
+
+
+class _Column:
+    # values of a dataframe column that are taken from the data of event records
+
+    def __init__(
+        self,
+        name: str,
+        default: Any = None,
+        convert: Callable[[Any], Any] | None = None,
+    ):
+        self.name = name
+        self.default = default
+        self.convert = convert
+        self.values = []
+
+    def append(self, data: dict[str, Any]) -> None:
+        value = data.get(self.name, self.default)
+        if self.convert is not None and value is not None:
+            value = self.convert(value)
+        self.values.append(value)
+
+
+def _get_columns(
+    cls: type[Event],
+    include: tuple[str] | list[str] | None,
+    exclude: tuple[str] | list[str] | None,
+    start_time: float,
+) -> list[_Column]:
+    # columns for the fields of an event class, as they would be given by `model_dump`
+    columns = []
+    for name, field in cls.model_fields.items():
+        if include is not None and name not in include:
+            continue
+        if exclude is not None and name in exclude:
+            continue
+        default = None
+        if not field.is_required():
+            default = field.get_default(call_default_factory=True)
+        convert = None
+        if name == "timestamp":
+            convert = lambda value: value - start_time  # noqa: E731
+        elif _is_tuple(field.annotation):
+            convert = tuple
+        columns.append(_Column(name, default, convert))
+    return columns
+
+
+def _is_tuple(annotation: Any) -> bool:
+    # whether the annotation is a tuple type, or a union of tuple types (and None)
+    if annotation is tuple or get_origin(annotation) is tuple:
+        return True
+    if get_origin(annotation) not in (UnionType, Union):
+        return False
+    args = [arg for arg in get_args(annotation) if arg is not type(None)]
+    return all(_is_tuple(arg) for arg in args)
+
+
+def get_event_log_parser(
+    path: str | Path, module: str | None = "matbii"
+) -> EventLogParser:
+    """Get a parser for an event log file (text or binary), the parser is chosen based on the file suffix.
+
+    Args:
+        path (str | Path): path of the event log file.
+        module (str | None, optional): module to discover event classes from (see `EventLogParser.discover_event_classes`). Defaults to "matbii", if None then no event classes are discovered.
+
+    Returns:
+        EventLogParser: the parser, either a `BinaryEventLogParser` or a `TextEventLogParser`.
+    """
+    if Path(path).suffix == BINARY_LOG_SUFFIX:
+        parser = BinaryEventLogParser()
+    else:
+        parser = TextEventLogParser()
+    if module is not None:
+        parser.discover_event_classes(module)
+    return parser
+
+
+def iter_event_log(
+    parser: EventLogParser,
+    file_path: str | Path,
+    types: EventTypes | None = None,
+    relative_start: bool = True,
+) -> Iterator[tuple[float, Event]]:
+    """Lazily parse the events of the given types from an event log file. If the parser supports it (`TextEventLogParser` or `BinaryEventLogParser`) events of other types are skipped before they are decoded, otherwise (e.g. `EventLogParser`) they are filtered after they are parsed.
+
+    Args:
+        parser (EventLogParser): parser used to parse the event log file.
+        file_path (str | Path): path of the event log file.
+        types (EventTypes | None, optional): types of the events to parse (as with `isinstance`). Defaults to None, which will parse all events.
+        relative_start (bool, optional): whether to normalise timestamps to be relative to the first log entry. Defaults to True.
+
+    Returns:
+        Iterator[tuple[float, Event]]: (timestamp, event)
+    """
+    if isinstance(parser, _StreamingEventLogParser):
+        return parser.parse(file_path, relative_start=relative_start, types=types)
+    events = parser.parse(file_path, relative_start=relative_start)
+    if types is None:
+        return events
+    return (event for event in events if isinstance(event[1], types))
+
+
+def convert_event_log(path: str | Path, output: str | Path | None = None) -> Path:
+    """Convert a text event log file to a binary event log file. Events are not validated during conversion.
+
+    Args:
+        path (str | Path): path of the text event log file.
+        output (str | Path | None, optional): path of the binary event log file. Defaults to None, which will use `path` with the suffix `.msgpack`.
+
+    Returns:
+        Path: path of the binary event log file.
+    """
+    path = Path(path)
+    output = Path(output) if output else path.with_suffix(BINARY_LOG_SUFFIX)
+    logger = BinaryEventLogger(output)
+    try:
+        for record in iter_text_event_log(path):
+            logger.write(*record)
+    finally:
+        logger.close()
+    return output
@@ -0,0 +1,121 @@
+"""Module that defines a cache for parsed event log files, see `parse_event_log`.
+
+Parsing a large event log file (validating each event) is slow, but the result only depends on the content of the file and on the parser. The parsed events are cached in a file next to the event log file (`<EVENT_LOG>.cache`), the cache is keyed by a hash of the event log file content and by the parser version, if either changes the cache is rebuilt.
+
+The cache file contains two pickled objects: the cache key and the parsed events. Cache files should only be loaded if they were created locally, as with any pickle file.
+"""
+
+import hashlib
+import pickle
+from importlib.metadata import version, PackageNotFoundError
+from pathlib import Path
+from typing import Any
+
+from star_ray import Event
+from icua.extras.analysis import EventLogParser
+
+from ...utils import LOGGER
+from .event_log import get_event_log_parser
+
+__all__ = ("parse_event_log", "get_event_log_cache_file", "EVENT_LOG_CACHE_SUFFIX")
+
+EVENT_LOG_CACHE_SUFFIX = ".cache"
+# increment this if the format of the cache or the parsed events changes
+EVENT_LOG_CACHE_VERSION = 1
+
+
+def parse_event_log(
+    path: str | Path,
+    relative_start: bool = True,
+    cache: bool = True,
+    invalidate_cache: bool = False,
+) -> tuple[EventLogParser, list[tuple[float, Event]]]:
+    """Parse an event log file (text or binary), making use of a cache of the parsed events if one is available. The parser is chosen based on the file suffix (see `get_event_log_parser`). All events are loaded into memory, for large event log files consider parsing only the events that are needed with `TextEventLogParser.parse(..., types=...)` instead.
+
+    Args:
+        path (str | Path): path of the event log file.
+        relative_start (bool, optional): whether to normalise timestamps to be relative to the first log entry. Defaults to True.
+        cache (bool, optional): whether to load events from (and save events to) the cache. Defaults to True.
+        invalidate_cache (bool, optional): whether to remove any existing cache of the event log file before parsing, the file will always be parsed. Defaults to False.
+
+    Returns:
+        tuple[EventLogParser, list[tuple[float, Event]]]: the parser and the parsed events (timestamp, event).
+    """
+    path = Path(path)
+    # event classes are discovered even if the events are cached, callers may use the parser
+    parser = get_event_log_parser(path)
+    cache_file = get_event_log_cache_file(path)
+    if invalidate_cache:
+        cache_file.unlink(missing_ok=True)
+    if cache:
+        key = _cache_key(path, parser, relative_start)
+        events = _load_cache(cache_file, key)
+        if events is not None:
+            LOGGER.debug(f"Loaded parsed events from cache: {cache_file.as_posix()}")
+            return parser, events
+    events = list(parser.parse(path, relative_start=relative_start))
+    if cache:
+        _save_cache(cache_file, key, events)
+    return parser, events
+
+
+def get_event_log_cache_file(path: str | Path) -> Path:
+    """Get the path of the cache file for the given event log file.
+
+    Args:
+        path (str | Path): path of the event log file.
+
+    Returns:
+        Path: path of the cache file.
+    """
+    path = Path(path)
+    return path.with_name(path.name + EVENT_LOG_CACHE_SUFFIX)
+
+
+def _cache_key(
+    path: Path, parser: EventLogParser, relative_start: bool
+) -> tuple[Any, ...]:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(1 << 20):
+            digest.update(chunk)
+    return (
+        EVENT_LOG_CACHE_VERSION,
+        _package_version("matbii"),
+        _package_version("icua"),
+        type(parser).__name__,
+        relative_start,
+        digest.hexdigest(),
+    )
+
+
+def _package_version(package: str) -> str | None:
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return None
+
+
+def _load_cache(cache_file: Path, key: tuple[Any, ...]) -> list | None:
+    if not cache_file.exists():
+        return None
+    try:
+        with open(cache_file, "rb") as file:
+            if pickle.load(file) != key:
+                return None  # the cache is out of date
+            return pickle.load(file)
+    except Exception as e:
+        # the cache is corrupt or was written by an incompatible version
+        LOGGER.warning(f"Failed to load cache: {cache_file.as_posix()}: {e}")
+        return None
+
+
+def _save_cache(cache_file: Path, key: tuple[Any, ...], events: list) -> None:
+    try:
+        with open(cache_file, "wb") as file:
+            pickle.dump(key, file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(events, file, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        # caching is optional, a failure should not prevent parsing (e.g. if the directory is read-only)
+        cache_file.unlink(missing_ok=True)
+        LOGGER.warning(f"Failed to write cache: {cache_file.as_posix()}: {e}")
@@ -1,9 +1,13 @@
 """Functions for extracting task events from an event log file."""
 
+import abc
 import warnings
+from collections.abc import Iterable
 import pandas as pd
 import numpy as np
 from functools import partial
+from pathlib import Path
+from typing import Any
 from star_ray.agent.component.component import Component
 from star_ray_xml import XMLState, Insert, Update, Replace, Delete
 from star_ray_pygame import SVGAmbient
@@ -17,6 +21,8 @@ from icua.event import (
 )
 from icua.extras.analysis import EventLogParser
 
+from .event_log import iter_event_log
+
 # these sensors are going to be used to get the relevant state information via their sense actions
 from ...guidance import (
     SystemMonitoringTaskAcceptabilitySensor,
@@ -24,10 +30,20 @@ from ...guidance import (
     # ResourceManagementTaskAcceptabilitySensor, # the sense actions are defined here...
 )
 
+from ...utils import SelectById
+
 # used to create resource management sense actions
 from ...utils._const import (
+    tank_id,
     tank_ids,
     pump_ids,
+    light_id,
+    slider_id,
+    tracking_target_id,
+)
+from ...tasks.resource_management.resource_management import (
+    TANK_IDS,
+    TANK_MAIN_IDS,
 )
 
 # system monitoring events
@@ -41,6 +57,7 @@ from ...tasks import (
     PumpFuelAction,
     TogglePumpAction,
     TogglePumpFailureAction,
+    FlowTickAction,
 )
 
 
@@ -89,9 +106,33 @@ from ...tasks import (
 #     return df
 
 
+def get_task_events(
+    parser: EventLogParser,
+    events: Iterable[tuple[float, Event]] | str | Path,
+    norm: float | int = np.inf,
+) -> dict[str, pd.DataFrame]:
+    """Extracts useful data for all tasks from the event log. This is equivalent to calling `get_system_monitoring_task_events`, `get_tracking_task_events` and `get_resource_management_task_events` but the events are replayed only once, it should be preferred when data for more than one task is required.
+
+    Args:
+        parser (EventLogParser): parser used to parse the event log file.
+        events (Iterable[tuple[float, Event]] | str | Path): events that were parsed from the event log file, or the path of the event log file in which case only the events that are needed are parsed.
+        norm (float | int, optional): the norm to use for the tracking distance metric, either "inf" for the max norm or an integer for the p-norm.
+
+    Returns:
+        dict[str, pd.DataFrame]: task name -> dataframe, task names are: "system_monitoring", "tracking" and "resource_management", see the corresponding `get_*_task_events` function for the columns of each dataframe.
+    """
+    tasks = {
+        "system_monitoring": _SystemMonitoringTaskDataFrame(),
+        "tracking": _TrackingTaskDataFrame(norm=norm),
+        "resource_management": _ResourceManagementTaskDataFrame(),
+    }
+    _replay(parser, events, list(tasks.values()))
+    return {name: task.get_dataframe() for name, task in tasks.items()}
+
+
 def get_resource_management_task_events(
     parser: EventLogParser,
-    events: list[tuple[float, Event]],
+    events: Iterable[tuple[float, Event]] | str | Path,
     norm: float | int = np.inf,
 ) -> pd.DataFrame:
     """Extracts useful data for the resource management task from the event log.
@@ -109,77 +150,21 @@ def get_resource_management_task_events(
 
     Args:
         parser (EventLogParser): parser used to parse the event log file.
-        events (list[tuple[float, Event]]): list of events that were parsed from the event log file.
+        events (Iterable[tuple[float, Event]] | str | Path): events that were parsed from the event log file, or the path of the event log file in which case only the events that are needed are parsed.
         norm (float | int, optional): the norm to use for the distance metric, either "inf" for the max norm or an integer for the p-norm.
 
     Returns:
         pd.DataFrame: dataframe with columns: ["timestamp", "frame", "user", *"tanks-{i}", *"pumps-{ij}"]
     """
-    fevents = parser.filter_events(
-        events,
-        (
-            Insert,
-            Delete,
-            Update,
-            Replace,
-            SetPumpAction,
-            BurnFuelAction,
-            PumpFuelAction,
-            TogglePumpAction,
-            TogglePumpFailureAction,
-            KeyEvent,
-            MouseButtonEvent,
-            RenderEvent,
-        ),
-    )
-
-    # # sort the events by their log timestamp
-    fevents = parser.sort_by_timestamp(fevents)
-
-    def _sense(state: XMLState):
-        # sense_actions = ResourceManagementTaskAcceptabilitySensor().sense()
-        # sense actions for tank states
-        sense_actions = [
-            Select(xpath=f"//*[@id='{id}']", attrs=["id", "data-level"])
-            for id in tank_ids()
-        ]
-        result = sense(state, sense_actions)
-        if result is None:
-            result = dict()
-        result_tanks = {k: v["data-level"] for k, v in result.items()}
-
-        # actions for pump states
-        sense_actions = [
-            Select(xpath=f"//*[@id='{id}-button']", attrs=["id", "data-state"])
-            for id in pump_ids()
-        ]
-        result = sense(state, sense_actions)
-        # print(result)
-        if result is None:
-            result = dict()
-        result_pumps = {k.rsplit("-", 1)[0]: v["data-state"] for k, v in result.items()}
-        if len(result_pumps) == 0:
-            return None
-        return {**result_tanks, **result_pumps}
-
-    df = _get_task_dataframe(fevents, _sense)
-    if df is None:
-        columns = [
-            "timestamp",
-            "frame",
-            "user",
-            *tank_ids(),
-            *pump_ids(),
-        ]
-        return pd.DataFrame(columns=columns)
-
+    task = _ResourceManagementTaskDataFrame()
+    _replay(parser, events, [task])
     # TODO combine rows if the timestamp matches
-    return df
+    return task.get_dataframe()
 
 
 def get_tracking_task_events(
     parser: EventLogParser,
-    events: list[tuple[float, Event]],
+    events: Iterable[tuple[float, Event]] | str | Path,
     norm: float | int = np.inf,
 ) -> pd.DataFrame:
     """Extracts useful data for the tracking task from the event log.
@@ -194,76 +179,20 @@ def get_tracking_task_events(
 
     Args:
         parser (EventLogParser): parser used to parse the event log file.
-        events (list[tuple[float, Event]]): list of events that were parsed from the event log file.
+        events (Iterable[tuple[float, Event]] | str | Path): events that were parsed from the event log file, or the path of the event log file in which case only the events that are needed are parsed.
         norm (float | int, optional): the norm to use for the distance metric, either "inf" for the max norm or an integer for the p-norm.
 
     Returns:
         pd.DataFrame: dataframe with columns: ["timestamp", "frame", "user", "x", "y", "distance"]
     """
-    fn_norm = partial(np.linalg.norm, ord=norm)
-    # collect all the relevant events for this task
-    fevents = parser.filter_events(
-        events,
-        (
-            Insert,
-            Delete,
-            Update,
-            Replace,
-            TargetMoveAction,
-            KeyEvent,
-            MouseButtonEvent,
-            RenderEvent,
-        ),
-    )
-
-    # # sort the events by their log timestamp
-    fevents = parser.sort_by_timestamp(fevents)
-
-    def _sense(state: XMLState):
-        sense_actions = TrackingTaskAcceptabilitySensor().sense()
-        result = sense(state, sense_actions)
-        if result is None:
-            return None
-        # TODO compute distance to the center of the task
-        bw, bh = (
-            result[TrackingTaskAcceptabilitySensor._BOX_ID]["width"],
-            result[TrackingTaskAcceptabilitySensor._BOX_ID]["height"],
-        )
-        bx, by = (
-            result[TrackingTaskAcceptabilitySensor._BOX_ID]["x"] + bw / 2,
-            result[TrackingTaskAcceptabilitySensor._BOX_ID]["y"] + bh / 2,
-        )
-        tw, th = (
-            result[TrackingTaskAcceptabilitySensor._TARGET_ID]["width"],
-            result[TrackingTaskAcceptabilitySensor._TARGET_ID]["height"],
-        )
-        tx, ty = (
-            result[TrackingTaskAcceptabilitySensor._TARGET_ID]["x"] + tw / 2,
-            result[TrackingTaskAcceptabilitySensor._TARGET_ID]["y"] + th / 2,
-        )
-        return dict(
-            x=tx,
-            y=ty,
-            distance=fn_norm((tx - bx, ty - by)),
-        )
-
-    df = _get_task_dataframe(fevents, _sense)
-    if df is None:
-        columns = [
-            "timestamp",
-            "frame",
-            "user",
-            "x",
-            "y",
-            "distance",
-        ]
-        return pd.DataFrame(columns=columns)
-    return df
+    task = _TrackingTaskDataFrame(norm=norm)
+    _replay(parser, events, [task])
+    return task.get_dataframe()
 
 
 def get_system_monitoring_task_events(
     parser: EventLogParser,
-    events: list[tuple[float, Event]],
+    events: Iterable[tuple[float, Event]] | str | Path,
 ) -> pd.DataFrame:
     """Extracts useful data for the system monitoring task from the event log.
 
@@ -282,132 +211,290 @@ def get_system_monitoring_task_events(
 
     Args:
         parser (EventLogParser): parser used to parse the event log file.
-        events (list[tuple[float, Event]]): list of events that were parsed from the event log file.
+        events (Iterable[tuple[float, Event]] | str | Path): events that were parsed from the event log file, or the path of the event log file in which case only the events that are needed are parsed.
 
     Returns:
         pd.DataFrame: dataframe with columns: ["timestamp", "frame", "user", "light-1", "light-2", "slider-1", "slider-2", "slider-3", "slider-4"]
     """
-    # these are raw events that may be triggered internally by matbii
-    # insert events insert the tasks into the xml state at the start of the simulation
-    fevents = parser.filter_events(
-        events,
-        (
-            Insert,
-            Delete,
-            Replace,
-            Update,
-            SetLightAction,
-            ToggleLightAction,
-            SetSliderAction,
-            KeyEvent,
-            MouseButtonEvent,
-            RenderEvent,
-        ),
-    )
-    # sort the events by their timestamp
-    fevents = parser.sort_by_timestamp(fevents)
+    task = _SystemMonitoringTaskDataFrame()
+    _replay(parser, events, [task])
+    return task.get_dataframe()
 
-    def _rename_column(k: str):
-        return "-".join(k.split("-")[:2])
 
-    def _sense(state: XMLState):
-        # sense actions to get relevant data from the state
-        sense_actions = SystemMonitoringTaskAcceptabilitySensor().sense()
-        result = sense(state, sense_actions)
-        if result is None:
-            return None
-        return {
-            _rename_column(k): v["data-state"]
-            for k, v in result.items()
-            if "data-state" in v
-        }
+# ids of the elements that each task event type may modify, see `_written_ids`
+_WRITTEN_IDS = {
+    TargetMoveAction: lambda event: {tracking_target_id()},
+    SetLightAction: lambda event: {light_id(event.target)},
+    ToggleLightAction: lambda event: {light_id(event.target)},
+    SetSliderAction: lambda event: {slider_id(event.target)},
+    SetPumpAction: lambda event: {f"pump-{event.target}-button"},
+    TogglePumpAction: lambda event: {f"pump-{event.target}-button"},
+    TogglePumpFailureAction: lambda event: {f"pump-{event.target}-button"},
+    PumpFuelAction: lambda event: _tank_ids(event.target),
+    BurnFuelAction: lambda event: _tank_ids(
+        TANK_MAIN_IDS if event.target == "*" else event.target
+    ),
+    FlowTickAction: lambda event: _tank_ids(TANK_IDS),
+}
+
+
+def _tank_ids(tanks: list[str]) -> set[str]:
+    return {id for tank in tanks for id in (tank_id(tank), f"{tank_id(tank)}-fuel")}
+
+
+def _written_ids(event: Event) -> set[str] | None:
+    """Get the ids of the elements that the given event may modify, or None if this is not known (the event may modify any element, e.g. `Update` or `Insert`)."""
+    written_ids = _WRITTEN_IDS.get(type(event), None)
+    return written_ids(event) if written_ids else None
 
-    df = _get_task_dataframe(fevents, _sense)
-    if df is None:
-        columns = [
-            "timestamp",
-            "frame",
-            "user",
-            "light-1",
-            "light-2",
-            "slider-1",
-            "slider-2",
-            "slider-3",
-            "slider-4",
-        ]
-        return pd.DataFrame(columns=columns)
-    return df
-
-
-def _get_task_dataframe(
-    fevents, fn_sense, user_input_event_type: type = UserInputEvent
-):
-    """Used internally to build a dataframe for a task."""
+
+def _replay(
+    parser: EventLogParser,
+    events: Iterable[tuple[float, Event]] | str | Path,
+    tasks: list["_TaskDataFrame"],
+    user_input_event_type: type = UserInputEvent,
+) -> None:
+    """Used internally to build the dataframes of the given tasks. The relevant events are applied in order to a single xml state, each task is updated after each of the events that it is interested in (see `_TaskDataFrame.EVENT_TYPES`).
+
+    Args:
+        parser (EventLogParser): parser used to parse the event log file.
+        events (Iterable[tuple[float, Event]] | str | Path): events that were parsed from the event log file, only the relevant events are kept (they must be sorted before they are replayed). If this is the path of the event log file then other events are skipped by the parser (see `iter_event_log`).
+        tasks (list[_TaskDataFrame]): tasks to update.
+        user_input_event_type (type, optional): base type of user input events, these are used to infer the id of the user's avatar. Defaults to UserInputEvent.
+    """
     # use the default state, the actual size etc. of the svg is not important for our purposes.
     # we only want to track the task events (which do not depend on the svg or window config.)
     xml_state = SVGAmbient([]).get_state()
+    event_types = tuple({t for task in tasks for t in task.EVENT_TYPES})
+    if isinstance(events, str | Path):
+        # the filter is pushed down to the parser, other events are never validated
+        events = iter_event_log(parser, events, types=event_types)
+    fevents = parser.filter_events(events, event_types)
     # sort the events by their log timestamp
-    fevents = EventLogParser.sort_by_timestamp(fevents)
-
-    def _get_task_events(fevents: list[tuple[float, Event]], avatar_ids: set[int]):
-        """Execute the events in order and yield the current task state."""
-        frame = 0
-        for i, (t, event) in enumerate(fevents):
-            if isinstance(event, RenderEvent):
-                frame += 1
-                continue
-            if isinstance(event, user_input_event_type):
-                _, avatar_id = Component.unpack_source(event)
-                avatar_ids.add(avatar_id)
-                continue
-            event.__execute__(xml_state)  # apply the event to the state
-            result = fn_sense(xml_state)
-            if result is None:
-                # ignore this if the the task is not yet set up, its only a probably if you see it spammed lots!
-                warnings.warn(
-                    f"Error sensing data for event {i} of type {type(event)}."
-                )
-                continue
-            if event.source is None:
-                warnings.warn(
-                    f"Event {i} of type {type(event)} has no source, your log file is out of date."
-                )
-                result["agent"] = 0
-            else:
-                _, result["agent"] = Component.unpack_source(event)
-            result["timestamp"] = t
-            result["frame"] = frame
-            yield result
-
-    avatar_ids = set()
-
-    df = pd.DataFrame(_get_task_events(fevents, avatar_ids))
-    if len(avatar_ids) > 1:
-        raise ValueError(
-            "Multiple avatar ids inferred, this should not happen, has there been a change to the event logging system?"
+    fevents = parser.sort_by_timestamp(fevents)
+    tasks_by_type = dict()  # event type -> tasks that are interested in it
+    for i, (t, event) in enumerate(fevents):
+        event_tasks = tasks_by_type.get(type(event), None)
+        if event_tasks is None:
+            event_tasks = [task for task in tasks if isinstance(event, task.EVENT_TYPES)]
+            tasks_by_type[type(event)] = event_tasks
+        if isinstance(event, RenderEvent):
+            for task in event_tasks:
+                task.frame += 1
+            continue
+        if isinstance(event, user_input_event_type):
+            _, avatar_id = Component.unpack_source(event)
+            for task in event_tasks:
+                task.avatar_ids.add(avatar_id)
+            continue
+        event.__execute__(xml_state)  # apply the event to the state
+        for task in event_tasks:
+            task.update(xml_state, i, t, event)
+
+
+class _TaskDataFrame(abc.ABC):
+    """Used internally to build the dataframe of a task while events are being replayed (see `_replay`).
+
+    Sense actions are used to get data from the state after each event, this data (`id -> attributes`) is then given to `_TaskDataFrame.transform` to produce a row of the dataframe. Sense actions (`SelectById`) are restricted to the elements that may have been modified by the event (see `_written_ids`), data for other elements is carried forward from the previous event.
+    """
+
+    # events that this task is interested in
+    EVENT_TYPES: tuple[type, ...] = (
+        Insert,
+        Delete,
+        Update,
+        Replace,
+        KeyEvent,
+        MouseButtonEvent,
+        RenderEvent,
+    )
+    # columns of the dataframe (if no rows were produced)
+    COLUMNS: list[str] = ["timestamp", "frame", "user"]
+
+    def __init__(self, sense_actions: list[SelectById | Select]):
+        """Constructor.
+
+        Args:
+            sense_actions (list[SelectById | Select]): actions used to get data from the state.
+        """
+        self.sense_actions = sense_actions
+        self.frame = 0
+        self.avatar_ids = set()
+        self.rows = []
+        self._data, self._result = None, None  # sensed data and the resulting row
+
+    @abc.abstractmethod
+    def transform(self, data: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        """Transform sensed data into a row of the dataframe.
+
+        Args:
+            data (dict[str, dict[str, Any]]): sensed data (`id -> attributes`).
+
+        Returns:
+            dict[str, Any]: the row.
+        """
+        pass
+
+    def update(self, state: XMLState, i: int, t: float, event: Event) -> None:
+        """Update this task, the given event has already been applied to the state.
+
+        Args:
+            state (XMLState): state to sense.
+            i (int): index of the event.
+            t (float): timestamp of the event.
+            event (Event): the event.
+        """
+        written_ids = _written_ids(event)
+        if self._data is None or written_ids is None:
+            self._data = sense(state, self.sense_actions)
+            self._result = (
+                self.transform(self._data) if self._data is not None else None
+            )
+        else:
+            # only sense the elements that may have been written, other selects are always executed
+            actions = [
+                action.restrict(written_ids)
+                if isinstance(action, SelectById)
+                else action
+                for action in self.sense_actions
+            ]
+            actions = list(filter(None, actions))
+            if actions:
+                changed = sense(state, actions)
+                if changed is not None:
+                    self._data.update(changed)
+                    self._result = self.transform(self._data)
+                else:
+                    self._data, self._result = None, None
+        if self._result is None:
+            # ignore this if the the task is not yet set up, its only a probably if you see it spammed lots!
+            warnings.warn(f"Error sensing data for event {i} of type {type(event)}.")
+            return
+        row = dict(self._result)
+        if event.source is None:
+            warnings.warn(
+                f"Event {i} of type {type(event)} has no source, your log file is out of date."
+            )
+            row["agent"] = 0
+        else:
+            _, row["agent"] = Component.unpack_source(event)
+        row["timestamp"] = t
+        row["frame"] = self.frame
+        self.rows.append(row)
+
+    def get_dataframe(self) -> pd.DataFrame:
+        """Get the dataframe of this task.
+
+        Raises:
+            ValueError: if multiple avatar ids were inferred from user input events.
+
+        Returns:
+            pd.DataFrame: the dataframe.
+        """
+        if len(self.avatar_ids) > 1:
+            raise ValueError(
+                "Multiple avatar ids inferred, this should not happen, has there been a change to the event logging system?"
+            )
+        df = pd.DataFrame(self.rows)
+        if len(df) == 0:
+            return pd.DataFrame(columns=self.COLUMNS)
+        df["user"] = df["agent"] == next(iter(self.avatar_ids), float("nan"))
+        df.drop(columns=["agent"], inplace=True)
+        # organise columns
+        start_columns = ["timestamp", "frame", "user"]
+        state_columns = sorted(list(set(df.columns) - set(start_columns)))
+        return df[start_columns + state_columns]
+
+
+class _ResourceManagementTaskDataFrame(_TaskDataFrame):
+    EVENT_TYPES = _TaskDataFrame.EVENT_TYPES + (
+        SetPumpAction,
+        BurnFuelAction,
+        PumpFuelAction,
+        TogglePumpAction,
+        TogglePumpFailureAction,
+        FlowTickAction,
+    )
+    COLUMNS = _TaskDataFrame.COLUMNS + [*tank_ids(), *pump_ids()]
+
+    def __init__(self):  # noqa
+        # sense_actions = ResourceManagementTaskAcceptabilitySensor().sense()
+        # sense actions for tank states and pump states
+        super().__init__(
+            [
+                SelectById.new(tank_ids(), ["id", "data-level"]),
+                SelectById.new(
+                    [f"{id}-button" for id in pump_ids()], ["id", "data-state"]
+                ),
+            ]
         )
-    if len(df) == 0:
-        return None
 
-    df["user"] = df["agent"] == next(iter(avatar_ids), float("nan"))
-    df.drop(columns=["agent"], inplace=True)
-    # organise columns
-    start_columns = ["timestamp", "frame", "user"]
-    state_columns = sorted(list(set(df.columns) - set(start_columns)))
-    return df[start_columns + state_columns]
+    def transform(self, data: dict[str, dict[str, Any]]) -> dict[str, Any]:  # noqa
+        tanks = {id: data[id]["data-level"] for id in tank_ids()}
+        pumps = {id: data[f"{id}-button"]["data-state"] for id in pump_ids()}
+        return {**tanks, **pumps}
 
 
-def sense(state: XMLState, sense_actions: list[Select]):
-    """Sense data from the state using the provided sense actions."""
+class _TrackingTaskDataFrame(_TaskDataFrame):
+    EVENT_TYPES = _TaskDataFrame.EVENT_TYPES + (TargetMoveAction,)
+    COLUMNS = _TaskDataFrame.COLUMNS + ["x", "y", "distance"]
 
-    def _sense(state: XMLState, sense_actions: list[Select]):
-        for action in sense_actions:
-            yield action.__execute__(state)
+    def __init__(self, norm: float | int = np.inf):  # noqa
+        super().__init__(TrackingTaskAcceptabilitySensor().sense())
+        self._fn_norm = partial(np.linalg.norm, ord=norm)
 
+    def transform(self, data: dict[str, dict[str, Any]]) -> dict[str, Any]:  # noqa
+        # TODO compute distance to the center of the task
+        box = data[TrackingTaskAcceptabilitySensor._BOX_ID]
+        target = data[TrackingTaskAcceptabilitySensor._TARGET_ID]
+        bx, by = box["x"] + box["width"] / 2, box["y"] + box["height"] / 2
+        tx, ty = target["x"] + target["width"] / 2, target["y"] + target["height"] / 2
+        return dict(x=tx, y=ty, distance=self._fn_norm((tx - bx, ty - by)))
+
+
+class _SystemMonitoringTaskDataFrame(_TaskDataFrame):
+    EVENT_TYPES = _TaskDataFrame.EVENT_TYPES + (
+        SetLightAction,
+        ToggleLightAction,
+        SetSliderAction,
+    )
+    COLUMNS = _TaskDataFrame.COLUMNS + [
+        "light-1",
+        "light-2",
+        "slider-1",
+        "slider-2",
+        "slider-3",
+        "slider-4",
+    ]
+
+    def __init__(self):  # noqa
+        # sense actions to get relevant data from the state
+        super().__init__(SystemMonitoringTaskAcceptabilitySensor().sense())
+
+    def transform(self, data: dict[str, dict[str, Any]]) -> dict[str, Any]:  # noqa
+        return {
+            "-".join(k.split("-")[:2]): v["data-state"]
+            for k, v in data.items()
+            if "data-state" in v
+        }
+
+
+# types of the events that are used to build the task dataframes, these can be given to `TextEventLogParser.parse` (or `BinaryEventLogParser.parse`) to skip other events in the event log file
+TASK_EVENT_TYPES: tuple[type, ...] = tuple(
+    dict.fromkeys(
+        _SystemMonitoringTaskDataFrame.EVENT_TYPES
+        + _TrackingTaskDataFrame.EVENT_TYPES
+        + _ResourceManagementTaskDataFrame.EVENT_TYPES
+    )
+)
+
+
+def sense(state: XMLState, sense_actions: list[SelectById | Select]):
+    """Sense data (`id -> attributes`) from the state using the provided sense actions."""
     data = dict()
     try:
-        for obs in _sense(state, sense_actions):
-            for value in obs:
+        for action in sense_actions:
+            for value in action.__execute__(state):
                 id = value.pop("id")
                 data[id] = value
     except Exception:
@@ -0,0 +1,104 @@
+"""Functions for working with time intervals, e.g. those given by `get_acceptable_intervals`, `get_guidance_intervals` or `get_attention_intervals`.
+
+Intervals are arrays of shape (n, 2) where each row is an interval (start, end), intervals are start inclusive and end exclusive. The intervals given to these functions do not need to be sorted and may overlap, they are normalised (sorted and merged, see `merge_intervals`) before use. All functions make use of sorted sweeps (`np.searchsorted`), the cost is O((n + m) log m) rather than O(n m) for n timestamps (or intervals) and m intervals.
+"""
+
+import numpy as np
+
+__all__ = (
+    "isin_intervals",
+    "merge_intervals",
+    "intersect_intervals",
+    "overlap_duration",
+)
+
+
+def isin_intervals(timestamps: np.ndarray, intervals: np.ndarray) -> np.ndarray:
+    """Computes a boolean array which indicates whether each timestamp is within an interval in `intervals`, start inclusive, end exclusive.
+
+    Args:
+        timestamps (np.ndarray): a 1D array of timestamps.
+        intervals (np.ndarray): a 2D array of intervals, where each row is an interval (start, end).
+
+    Returns:
+        np.ndarray: a 1D boolean array which is True for each timestamp that is within an interval.
+    """
+    timestamps = np.asarray(timestamps)
+    intervals = merge_intervals(intervals)
+    # index of the last interval that starts at or before each timestamp
+    i = np.searchsorted(intervals[:, 0], timestamps, side="right") - 1
+    ends = intervals[np.maximum(i, 0), 1] if len(intervals) else np.zeros_like(i)
+    return (i >= 0) & (timestamps < ends)
+
+
+def merge_intervals(intervals: np.ndarray, *extra: np.ndarray) -> np.ndarray:
+    """Merge overlapping (or touching) intervals, the result is the union of the intervals as sorted disjoint intervals.
+
+    Args:
+        intervals (np.ndarray): intervals to merge.
+        extra (tuple[np.ndarray], optional): additional array(s) of intervals to merge. The result will be a single array containing merged intervals from `intervals` and `extra`.
+
+    Returns:
+        np.ndarray: merged intervals of shape (k, 2).
+    """
+    intervals = np.concatenate([_as_intervals(x) for x in (intervals, *extra)])
+    if len(intervals) == 0:
+        return intervals
+    intervals = intervals[np.argsort(intervals[:, 0], kind="stable")]
+    starts = intervals[:, 0]
+    # the end of the merged interval that each interval is part of, so far
+    ends = np.maximum.accumulate(intervals[:, 1])
+    # an interval begins a new merged interval if it starts after all previous intervals end
+    first = np.ones(len(intervals), dtype=bool)
+    first[1:] = starts[1:] > ends[:-1]
+    last = np.roll(first, -1)
+    return np.stack([starts[first], ends[last]], axis=1)
+
+
+def intersect_intervals(intervals: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Compute the intersection of two sets of intervals, e.g. the times at which a task was unacceptable and guidance was being shown.
+
+    Args:
+        intervals (np.ndarray): intervals of shape (n, 2).
+        other (np.ndarray): intervals of shape (m, 2).
+
+    Returns:
+        np.ndarray: sorted disjoint intervals of shape (k, 2) that are contained in both `intervals` and `other`, k <= n + m.
+    """
+    a, b = merge_intervals(intervals), merge_intervals(other)
+    # the intervals in `b` that overlap with each interval in `a` are b[lo:hi]
+    lo = np.searchsorted(b[:, 1], a[:, 0], side="right")
+    hi = np.searchsorted(b[:, 0], a[:, 1], side="left")
+    counts = np.maximum(hi - lo, 0)
+    ia = np.repeat(np.arange(len(a)), counts)
+    ib = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    ib += np.repeat(lo, counts)
+    result = np.stack(
+        [np.maximum(a[ia, 0], b[ib, 0]), np.minimum(a[ia, 1], b[ib, 1])], axis=1
+    )
+    return result[result[:, 0] < result[:, 1]]
+
+
+def overlap_duration(intervals: np.ndarray, other: np.ndarray) -> float:
+    """Compute the total duration of the overlap between two sets of intervals (the duration of `intersect_intervals`).
+
+    Args:
+        intervals (np.ndarray): intervals of shape (n, 2).
+        other (np.ndarray): intervals of shape (m, 2).
+
+    Returns:
+        float: total duration of the overlap.
+    """
+    overlap = intersect_intervals(intervals, other)
+    return float((overlap[:, 1] - overlap[:, 0]).sum())
+
+
+def _as_intervals(intervals: np.ndarray) -> np.ndarray:
+    intervals = np.asarray(intervals, dtype=float)
+    if intervals.size == 0:
+        return intervals.reshape(0, 2)
+    if intervals.ndim != 2 or intervals.shape[1] != 2:
+        raise ValueError(
+            f"Intervals must have shape (n, 2), received shape: {intervals.shape}"
+        )
+    return intervals
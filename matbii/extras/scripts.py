@@ -1,8 +1,11 @@
 """This module contains various scripts (functions) that can be used with the argument --script. Typically they will produce some output file (e.g. a csv or plot) for some data of interest from a log file. The avaliable functions are intended to be called from the command line and not to to be used directly. The make use of the `matbii.extras.analysis` module to produce files and plots."""
 
 import argparse
+import importlib.util
+import os
 import numpy as np
 import pandas as pd
+from collections.abc import Iterable
 from typing import Any, Literal
 import matplotlib.pyplot as plt
 from pathlib import Path
@@ -29,7 +32,25 @@ def summary(**kwargs: dict[str, Any]) -> None:
         required=False,
         help="The path to the output directory, if left unspecified files will be written to <--path>/summary.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not use (or create) a cache of the parsed event log file, events are instead parsed lazily as they are needed which keeps memory use low for large event log files.",
+    )
+    parser.add_argument(
+        "--invalidate-cache",
+        action="store_true",
+        help="Remove any existing cache of the parsed event log file, the event log file will be parsed again.",
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=list(_SUMMARY_FORMATS),
+        default="csv",
+        help="The file format of the summary data files, `parquet` and `feather` files are written with explicit column types and require `pyarrow`.",
+    )
     args, _ = parser.parse_known_intermixed_args()  # ignore unknown args
+    _check_format(args.format)
     path = Path(args.path)
     log_file, config_file = _validate_logging_path(path)
     config = _load_config(config_file, context=kwargs)
@@ -39,7 +60,163 @@ def summary(**kwargs: dict[str, Any]) -> None:
     else:
         output_dir = path / "summary"
     output_dir.mkdir(parents=True, exist_ok=True)
-    _summary(log_file, config, output_dir)
+    _summary(
+        log_file,
+        config,
+        output_dir,
+        cache=not args.no_cache,
+        invalidate_cache=args.invalidate_cache,
+        format=args.format,
+    )
+
+
+def batch_summary(**kwargs: dict[str, Any]) -> None:
+    """Produce a summary for every trial (logging directory) found under the given root directory, trials are summarised in parallel. An aggregated table (one row per trial) is written to `summary.csv` in the output directory."""
+    parser = argparse.ArgumentParser(
+        description="Produce a summary for every trial found under the given root directory."
+    )
+    parser.add_argument(
+        "--path",
+        type=str,
+        required=True,
+        help="The path to the root directory, typically the logging directory of an experiment (containing `<experiment.id>/<participant.id>` directories).",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        required=False,
+        help="The path to the output directory, summary files for each trial will be written to <--output>/<TRIAL_PATH>, where <TRIAL_PATH> is relative to <--path>. If left unspecified files will be written to <TRIAL_PATH>/summary and the aggregated table to <--path>/summary.csv.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        required=False,
+        default=None,
+        help="The number of worker processes to use, defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Summarise all trials, by default trials that have an up-to-date summary are skipped.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not use (or create) a cache of the parsed event log file, events are instead parsed lazily as they are needed which keeps memory use low for large event log files.",
+    )
+    parser.add_argument(
+        "--invalidate-cache",
+        action="store_true",
+        help="Remove any existing cache of the parsed event log file, the event log file will be parsed again.",
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=list(_SUMMARY_FORMATS),
+        default="csv",
+        help="The file format of the summary data files of each trial, `parquet` and `feather` files are written with explicit column types and require `pyarrow`. The aggregated table is always written as csv.",
+    )
+    args, _ = parser.parse_known_intermixed_args()  # ignore unknown args
+    _check_format(args.format)
+    path = Path(args.path)
+    if not path.is_dir():
+        raise FileNotFoundError(
+            f"Directory does not exist or is not a directory: {path.as_posix()}"
+        )
+    output = Path(args.output) if args.output else None
+    workers = args.workers if args.workers else os.cpu_count()
+    options = dict(
+        cache=not args.no_cache,
+        invalidate_cache=args.invalidate_cache,
+        format=args.format,
+    )
+
+    trials = []  # (log file, config file, output directory)
+    for log_file, config_file in _discover_trials(path):
+        trial_path = log_file.parent
+        if output is not None:
+            output_dir = output / trial_path.relative_to(path)
+        else:
+            output_dir = trial_path / "summary"
+        trials.append((log_file, config_file, output_dir))
+    LOGGER.info(f"Found {len(trials)} trial(s) in {path.as_posix()}")
+
+    pending = [
+        t
+        for t in trials
+        if args.force or not _is_summary_up_to_date(*t, format=args.format)
+    ]
+    LOGGER.info(
+        f"Summarising {len(pending)} trial(s), {len(trials) - len(pending)} are up to date."
+    )
+    failed = set()
+    if workers > 1 and len(pending) > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_batch_summary_trial, *trial, kwargs, **options): trial
+                for trial in pending
+            }
+            for future in as_completed(futures):
+                log_file = futures[future][0]
+                try:
+                    future.result()
+                    LOGGER.info(f"Summarised trial: {log_file.parent.as_posix()}")
+                except Exception as e:
+                    failed.add(log_file)
+                    LOGGER.error(f"Failed to summarise trial: {log_file.as_posix()}: {e}")
+    else:
+        for trial in pending:
+            try:
+                _batch_summary_trial(*trial, kwargs, **options)
+                LOGGER.info(f"Summarised trial: {trial[0].parent.as_posix()}")
+            except Exception as e:
+                failed.add(trial[0])
+                LOGGER.error(f"Failed to summarise trial: {trial[0].as_posix()}: {e}")
+
+    rows = []
+    for log_file, config_file, output_dir in trials:
+        if log_file in failed:
+            continue
+        try:
+            config = _load_config(config_file, context=kwargs)
+            rows.append(_summary_statistics(config, output_dir, format=args.format))
+        except (FileNotFoundError, ValueError) as e:
+            LOGGER.warning(f"Trial missing from aggregated summary: {output_dir}: {e}")
+    output = output if output is not None else path
+    output.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(rows, columns=_SUMMARY_STATISTICS_COLUMNS).to_csv(
+        output / "summary.csv", index=False
+    )
+    LOGGER.info(f"Aggregated summary written to {(output / 'summary.csv').as_posix()}")
+
+
+def convert_event_log(**kwargs: dict[str, Any]) -> None:
+    """Convert a text event log file to a (compact) binary event log file."""
+    from .analysis import convert_event_log
+
+    parser = argparse.ArgumentParser(
+        description="Convert a text event log file to a binary event log file."
+    )
+    parser.add_argument(
+        "--path",
+        type=str,
+        required=True,
+        help="The path to the event log file, or to the logging directory that contains it.",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        required=False,
+        help="The path of the binary event log file, if left unspecified it will be written next to the event log file with the suffix `.msgpack`.",
+    )
+    args, _ = parser.parse_known_intermixed_args()  # ignore unknown args
+    path = Path(args.path)
+    if path.is_dir():
+        path, _ = _validate_logging_path(path, binary=False)
+    output = convert_event_log(path, args.output)
+    LOGGER.info(f"Binary event log written to {output.as_posix()}")
 
 
 # ============================================= #
@@ -51,7 +228,7 @@ def _load_config(path: Path, context: dict[str, Any] | None = None) -> Configura
     return Configuration.from_file(path, context=context)
 
 
-def _validate_logging_path(path: str | Path) -> Path:
+def _validate_logging_path(path: str | Path, binary: bool = True) -> Path:
     # check files exist
     path = Path(path)
     if not path.is_dir():
@@ -69,6 +246,12 @@ def _validate_logging_path(path: str | Path) -> Path:
             f"Multiple configuration files found in logging directory: {path.as_posix()}"
         )
 
+    # prefer the binary event log file if there is one (and `msgpack` is installed), it is faster to parse
+    binary = binary and importlib.util.find_spec("msgpack") is not None
+    log_files = list(path.glob("*.msgpack")) if binary else []
+    if len(log_files) == 1:
+        return log_files[0], config_files[0]
+
     # get "*.log" files from directory
     log_files = list(path.glob("*.log"))
     if len(log_files) == 0:
@@ -83,20 +266,205 @@ def _validate_logging_path(path: str | Path) -> Path:
     return log_files[0], config_files[0]
 
 
+def _discover_trials(path: Path) -> list[tuple[Path, Path]]:
+    # find all logging directories (those containing a log file and a configuration file) under `path`
+    trials = []
+    for trial_path in sorted([path, *(p for p in path.rglob("*") if p.is_dir())]):
+        if not any(trial_path.glob("*.json")):
+            continue
+        if not any(trial_path.glob("*.log")) and not any(trial_path.glob("*.msgpack")):
+            continue
+        try:
+            trials.append(_validate_logging_path(trial_path))
+        except (FileNotFoundError, ValueError) as e:
+            LOGGER.warning(f"Skipping directory: {trial_path.as_posix()}: {e}")
+    return trials
+
+
+def _is_summary_up_to_date(
+    log_file: Path, config_file: Path, output_dir: Path, format: str = "csv"
+) -> bool:
+    # the summary plot is written once all of the data files have been written, if it is missing the summary is incomplete
+    if not (output_dir / "summary.png").exists():
+        return False
+    # the summary may have been written in a different format
+    suffix = _SUMMARY_FORMATS[format]
+    if not all((output_dir / f"{name}{suffix}").exists() for name in _SUMMARY_TABLES):
+        return False
+    modified = max(log_file.stat().st_mtime, config_file.stat().st_mtime)
+    return all(p.stat().st_mtime >= modified for p in output_dir.iterdir())
+
+
+def _batch_summary_trial(
+    log_file: Path,
+    config_file: Path,
+    output_dir: Path,
+    context: dict[str, Any],
+    **kwargs: dict[str, Any],
+) -> None:
+    # run in a worker process, see `batch_summary`
+    config = _load_config(config_file, context=context)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        _summary(log_file, config, output_dir, show=False, **kwargs)
+    except Exception:
+        # the summary is incomplete, make sure it is not considered up to date (see `_is_summary_up_to_date`)
+        (output_dir / "summary.png").unlink(missing_ok=True)
+        raise
+    finally:
+        plt.close("all")
+
+
+_SUMMARY_TASKS = ["system_monitoring", "tracking", "resource_management"]
+_SUMMARY_STATISTICS_COLUMNS = [
+    "experiment",
+    "participant",
+    "path",
+    "duration",
+    *(
+        f"{task}_{statistic}"
+        for task in _SUMMARY_TASKS
+        for statistic in ["unacceptable", "guidance", "user_events"]
+    ),
+]
+
+
+def _summary_statistics(
+    config: Configuration, output_dir: Path, format: str = "csv"
+) -> dict[str, Any]:
+    # statistics for a single trial (a row of the aggregated table), computed from the summary files of the trial
+    def read(name: str) -> pd.DataFrame:
+        return _read_table(output_dir, name, format=format)
+
+    frame_timestamps = read("frame_timestamps")["timestamp"]
+    unacceptable_intervals = read("unacceptable_intervals")
+    guidance_intervals = read("guidance_intervals")
+    row = dict(
+        experiment=config.experiment.id,
+        participant=config.participant.id,
+        path=output_dir.as_posix(),
+        duration=frame_timestamps.max() - frame_timestamps.min(),
+    )
+    for task in _SUMMARY_TASKS:
+        # total time (seconds) that the task was in an unacceptable state
+        intervals = unacceptable_intervals[unacceptable_intervals["task"] == task]
+        row[f"{task}_unacceptable"] = (intervals["t2"] - intervals["t1"]).sum()
+        # number of times guidance was shown for the task
+        row[f"{task}_guidance"] = (guidance_intervals["task"] == task).sum()
+        # number of task state changes that were due to the user
+        row[f"{task}_user_events"] = read(task)["user"].sum()
+    return row
+
+
+# summary data file format -> file suffix, see `_write_table`
+_SUMMARY_FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+# summary data files that are written for every trial, see `_summary`
+_SUMMARY_TABLES = [
+    "mouse_button",
+    "mouse_motion",
+    "keyboard",
+    "eyetracking",
+    *_SUMMARY_TASKS,
+    "frame_timestamps",
+    "acceptable_intervals",
+    "unacceptable_intervals",
+    "guidance_intervals",
+]
+# explicit column types used when writing summary data in a binary format
+_SUMMARY_DTYPES = {
+    "task": "category",
+    "timestamp": "float64",
+    "t1": "float64",
+    "t2": "float64",
+}
+
+
+def _check_format(format: str) -> None:
+    # fail before any work is done if the dependencies of the format are missing
+    if format not in _SUMMARY_FORMATS:
+        raise ValueError(
+            f"Invalid summary format: {format}, must be one of {list(_SUMMARY_FORMATS)}"
+        )
+    if format != "csv":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                f"Summary format `{format}` requires `pyarrow`, install it with: `pip install matbii[parquet]` or use `--format csv`."
+            ) from e
+
+
+def _write_table(
+    df: pd.DataFrame,
+    output_dir: Path,
+    name: str,
+    format: str = "csv",
+    index: bool = False,
+) -> Path:
+    # write a summary data file `<output_dir>/<name>.<format>`
+    path = output_dir / f"{name}{_SUMMARY_FORMATS[format]}"
+    if format == "csv":
+        df.to_csv(path, index=index)
+        return path
+    dtypes = {k: v for k, v in _SUMMARY_DTYPES.items() if k in df.columns}
+    df = df.astype(dtypes)
+    if format == "parquet":
+        df.to_parquet(path, index=index)
+    else:  # feather does not store the index, it is written as a column instead
+        df.reset_index(drop=not index).to_feather(path)
+    return path
+
+
+def _read_table(
+    output_dir: Path, name: str, format: str | None = None
+) -> pd.DataFrame:
+    # read a summary data file `<output_dir>/<name>.<format>`, the given format is preferred, otherwise it is read in whichever format it was written
+    formats = sorted(_SUMMARY_FORMATS, key=lambda f: f != format)
+    for format in formats:
+        path = output_dir / f"{name}{_SUMMARY_FORMATS[format]}"
+        if path.exists():
+            if format == "csv":
+                return pd.read_csv(path)
+            elif format == "parquet":
+                return pd.read_parquet(path)
+            else:
+                return pd.read_feather(path)
+    raise FileNotFoundError(
+        f"Summary file not found: {(output_dir / name).as_posix()}.{{{','.join(_SUMMARY_FORMATS)}}}"
+    )
+
+
 def _summary(
     log_file: Path,
     config: Configuration,
     output_dir: Path | None = None,
+    show: bool = True,
+    cache: bool = True,
+    invalidate_cache: bool = False,
+    format: Literal["csv", "parquet", "feather"] = "csv",
     **kwargs: dict[str, Any],
 ):
+    from icua.event import (
+        Event,
+        RenderEvent,
+        MouseButtonEvent,
+        MouseMotionEvent,
+        EyeMotionEvent,
+        KeyEvent,
+        TaskAcceptable,
+        TaskUnacceptable,
+        ShowGuidance,
+        HideGuidance,
+    )
+    from star_ray_xml import Insert
     from .analysis import (
-        EventLogParser,
+        TASK_EVENT_TYPES,
+        parse_event_log,
+        get_event_log_parser,
         get_mouse_button_events,
         get_mouse_motion_events,
         get_keyboard_events,
-        get_system_monitoring_task_events,
-        get_tracking_task_events,
-        get_resource_management_task_events,
+        get_task_events,
         get_eyetracking_events,
         get_acceptable_intervals,
         get_unacceptable_intervals,
@@ -107,54 +475,83 @@ def _summary(
         get_svg_as_image,
     )
 
-    parser = EventLogParser()
-    parser.discover_event_classes("matbii")
-    events = list(
-        parser.parse(log_file, relative_start=kwargs.get("relative_start", True))
-    )
+    relative_start = kwargs.get("relative_start", True)
+    if cache:
+        # parsed events are cached next to the log file, later runs will load them from the cache
+        parser, all_events = parse_event_log(
+            log_file,
+            relative_start=relative_start,
+            cache=cache,
+            invalidate_cache=invalidate_cache,
+        )
+
+        def events(*types: type) -> Iterable[tuple[float, Event]]:
+            return (event for event in all_events if isinstance(event[1], types))
+    else:
+        # events are streamed from the log file, each pass only validates (and keeps) the events that are needed
+        parser = get_event_log_parser(log_file)
+
+        def events(*types: type) -> Iterable[tuple[float, Event]]:
+            return parser.parse(log_file, relative_start=relative_start, types=types)
+
     LOGGER.debug(f"Writing output to {output_dir.as_posix()}")
-    get_mouse_button_events(parser, events).to_csv(
-        output_dir / "mouse_button.csv", index=False
-    )
-    mouse_motion_df = get_mouse_motion_events(parser, events)
-    mouse_motion_df.to_csv(output_dir / "mouse_motion.csv", index=False)
-    keyboard_df = get_keyboard_events(parser, events)
-    keyboard_df.to_csv(output_dir / "keyboard.csv", index=False)
-    eyetracking_df = get_eyetracking_events(parser, events)
-    eyetracking_df.to_csv(output_dir / "eyetracking.csv", index=False)
-    get_system_monitoring_task_events(parser, events).to_csv(
-        output_dir / "system_monitoring.csv", index=False
+
+    def write(df: pd.DataFrame, name: str, index: bool = False):
+        _write_table(df, output_dir, name, format=format, index=index)
+
+    # the less frequent events are kept for the outputs that need them
+    flag_events = list(
+        events(
+            RenderEvent,
+            MouseButtonEvent,
+            KeyEvent,
+            TaskAcceptable,
+            TaskUnacceptable,
+            ShowGuidance,
+            HideGuidance,
+            Insert,
+        )
     )
-    get_tracking_task_events(parser, events).to_csv(
-        output_dir / "tracking.csv", index=False
+    write(get_mouse_button_events(parser, flag_events), "mouse_button")
+    mouse_motion_df = get_mouse_motion_events(
+        parser, events(MouseMotionEvent, RenderEvent)
     )
-
-    get_resource_management_task_events(parser, events).to_csv(
-        output_dir / "resource_management.csv"
+    write(mouse_motion_df, "mouse_motion")
+    write(get_keyboard_events(parser, flag_events), "keyboard")
+    eyetracking_df = get_eyetracking_events(parser, events(EyeMotionEvent, RenderEvent))
+    write(eyetracking_df, "eyetracking")
+    # the task events are extracted together, this replays the event log only once
+    task_dfs = get_task_events(parser, events(*TASK_EVENT_TYPES))
+    write(task_dfs["system_monitoring"], "system_monitoring")
+    write(task_dfs["tracking"], "tracking")
+    write(task_dfs["resource_management"], "resource_management", index=True)
+    frame_timestamps = pd.DataFrame(
+        get_frame_timestamps(flag_events), columns=["timestamp"]
     )
-    frame_timestamps = pd.DataFrame(get_frame_timestamps(events), columns=["timestamp"])
-    frame_timestamps.to_csv(output_dir / "frame_timestamps.csv", index=False)
+    write(frame_timestamps, "frame_timestamps")
 
     # get intervals
-    _intervals_as_df(dict(get_acceptable_intervals(events))).to_csv(
-        output_dir / "acceptable_intervals.csv", index=False
-    )
-    _intervals_as_df(dict(get_unacceptable_intervals(events))).to_csv(
-        output_dir / "unacceptable_intervals.csv", index=False
+    acceptable_intervals = _intervals_as_df(
+        dict(get_acceptable_intervals(flag_events))
     )
-    _intervals_as_df(dict(get_guidance_intervals(events))).to_csv(
-        output_dir / "guidance_intervals.csv", index=False
+    write(acceptable_intervals, "acceptable_intervals")
+    unacceptable_intervals = _intervals_as_df(
+        dict(get_unacceptable_intervals(flag_events))
     )
+    write(unacceptable_intervals, "unacceptable_intervals")
+    guidance_intervals = _intervals_as_df(dict(get_guidance_intervals(flag_events)))
+    write(guidance_intervals, "guidance_intervals")
 
     # get attention intervals - mouse, gaze, fixation
-    _intervals_as_df(dict(get_attention_intervals(mouse_motion_df))).to_csv(
-        output_dir / "attention_intervals_mouse.csv", index=False
+    attention_intervals = {}
+    attention_intervals["mouse"] = _intervals_as_df(
+        dict(get_attention_intervals(mouse_motion_df))
     )
 
     # TODO: get attention intervals - input (mouse + keyboard)
 
-    _intervals_as_df(dict(get_attention_intervals(eyetracking_df))).to_csv(
-        output_dir / "attention_intervals_gaze.csv", index=False
+    attention_intervals["gaze"] = _intervals_as_df(
+        dict(get_attention_intervals(eyetracking_df))
     )
 
     # fixation intervals
@@ -164,24 +561,35 @@ def _summary(
         columns = list(eyetracking_df.columns)
         columns.remove("fixated")
         fixation_df = pd.DataFrame(columns=columns)
-    _intervals_as_df(dict(get_attention_intervals(fixation_df))).to_csv(
-        output_dir / "attention_intervals_fixation.csv", index=False
+    attention_intervals["fixation"] = _intervals_as_df(
+        dict(get_attention_intervals(fixation_df))
     )
+    for mode, df in attention_intervals.items():
+        write(df, f"attention_intervals_{mode}")
 
     # record start and end times
-    start_time, end_time = get_start_and_end_time(events)
+    start_time, end_time = get_start_and_end_time(flag_events)
 
-    # make plots
-    # output_dir = output_dir / "plots"
-    # output_dir.mkdir(parents=True, exist_ok=True)
+    # make plots, the dataframes are used directly rather than being read back from the output files
     attention_mode = config.guidance.attention_mode
-    fig = _summary_plot(output_dir, attention_mode=attention_mode)
+    if attention_mode not in attention_intervals:
+        raise ValueError(
+            f"Attention intervals for mode {attention_mode} not found, available: {list(attention_intervals)}."
+        )
+    fig = _summary_plot(
+        acceptable_intervals,
+        unacceptable_intervals,
+        guidance_intervals,
+        attention_intervals[attention_mode],
+        task_dfs,
+        attention_mode=attention_mode,
+    )
     fig.savefig(output_dir / "summary.png", bbox_inches="tight")
 
     # plot eyetracking if we have any
 
     if not mouse_motion_df.empty:
-        img = get_svg_as_image((config.ui.width, config.ui.height), events)
+        img = get_svg_as_image((config.ui.width, config.ui.height), flag_events)
         fig, ax = plt.subplots(figsize=(4, 4))
         fig.suptitle("Mouse motion")
         ax.imshow(img)
@@ -195,7 +603,7 @@ def _summary(
         fig.savefig(output_dir / "mouse_motion.png", bbox_inches="tight")
 
     if not eyetracking_df.empty:
-        img = get_svg_as_image((config.ui.width, config.ui.height), events)
+        img = get_svg_as_image((config.ui.width, config.ui.height), flag_events)
         fig, ax = plt.subplots(figsize=(4, 4))
         fig.suptitle("Eyetracking")
         ax.imshow(img)
@@ -215,11 +623,16 @@ def _summary(
         )
         fig.savefig(output_dir / "eyetracking.png", bbox_inches="tight")
 
-    plt.show()
+    if show:
+        plt.show()
 
 
 def _summary_plot(
-    path: Path,
+    acceptable_intervals: pd.DataFrame,
+    unacceptable_intervals: pd.DataFrame,
+    guidance_intervals: pd.DataFrame,
+    attention_intervals: pd.DataFrame,
+    task_dfs: dict[str, pd.DataFrame],
     attention_mode: Literal["mouse", "fixation", "gaze"] = "mouse",
     guidance_colour: str = "red",
     attention_colour: str = "green",
@@ -236,21 +649,6 @@ def _summary_plot(
         tracking=dict(ylim=(1 / 3, 2 / 3), colour=tracking_colour),
         resource_management=dict(ylim=(2 / 3, 1), colour=resource_management_colour),
     )
-    acceptable_intervals = pd.read_csv(path / "acceptable_intervals.csv")
-    unacceptable_intervals = pd.read_csv(path / "unacceptable_intervals.csv")
-    guidance_intervals = pd.read_csv(path / "guidance_intervals.csv")
-    try:
-        attention_intervals = pd.read_csv(
-            path / f"attention_intervals_{attention_mode}.csv"
-        )
-    except FileNotFoundError:
-        avaliable = [
-            p.name.split(".")[0].split("_")[-1]
-            for p in path.glob(path / "attention_intervals_*.csv")
-        ]
-        raise ValueError(
-            f"Attention intervals for mode {attention_mode} not found, available: {avaliable}."
-        )
     first = True
     for task, data in task_data.items():
         plot_intervals(
@@ -290,7 +688,7 @@ def _summary_plot(
             ymax=data["ylim"][1] - 0.05,
         )
 
-        df = pd.read_csv(path / f"{task}.csv")
+        df = task_dfs[task]
         # plot the timestamps for the task changed its state due to the task specific agent.
         plot_timestamps(
             df["timestamp"][~df["user"]],
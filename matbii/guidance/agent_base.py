@@ -15,7 +15,7 @@ from icua.agent import GuidanceAgent as _GuidanceAgent
 from icua.extras.logging import LogActuator
 from icua.utils import LOGGER  # , dict_diff
 
-from star_ray.agent import Actuator, Sensor
+from star_ray.agent import Actuator, Sensor, Component
 
 
 class GuidanceAgent(_GuidanceAgent):
@@ -46,6 +46,8 @@ class GuidanceAgent(_GuidanceAgent):
         # this actuator will be used when counter-factual guidance is enabled, any other actuators will be ignored
         _counter_factual_guidance_actuator = CounterFactualGuidanceActuator()
         actuators.append(_counter_factual_guidance_actuator)
+        # cache of the tasks that are monitored by the sensors (see `_get_monitoring_tasks`)
+        self._monitoring_tasks: frozenset[str] | None = None
         super().__init__(
             sensors, actuators, user_input_events, user_input_events_history_size
         )
@@ -54,6 +56,10 @@ class GuidanceAgent(_GuidanceAgent):
 
         # various useful properties used to determine whether guidance should be shown
         self._cycle_times = deque(maxlen=max(cycle_times_history_size, 10))
+        # (timestamp, task) of the most recent fixation, task is None if the fixation was not on a monitored task
+        self._latest_fixation: tuple[float, str | None] = (float("-inf"), None)
+        # task -> timestamp of the most recent fixation on the task
+        self._latest_fixation_per_task: dict[str, float] = dict()
 
     def get_cycle_start(self, index: int = 0) -> float:
         """Get the time since the previous cycle started.
@@ -196,6 +202,54 @@ class GuidanceAgent(_GuidanceAgent):
         self.beliefs[task]["failure_start"] = self.get_cycle_start()
         return super().on_unacceptable(task)
 
+    def on_user_input(self, observation: Any):  # noqa
+        super().on_user_input(observation)
+        # fixations are recorded as they arrive so that `fixation_target` need not search the (potentially long) event history
+        if isinstance(observation, EyeMotionEvent) and observation.fixated:
+            task = self._get_target_task(observation)
+            self._latest_fixation = (observation.timestamp, task)
+            if task is not None:
+                self._latest_fixation_per_task[task] = observation.timestamp
+
+    def time_since_fixation(self, task: str | None = None) -> float:
+        """Get the time since the user last fixated on the task (or any task if `task` is None).
+
+        Args:
+            task (str | None): the task. If None, use any task.
+
+        Returns:
+            float: the time since the user last fixated on the task (or any task if `task` is None), this will be `inf` if there has been no such fixation.
+        """
+        if task is None:
+            fixation_time = max(
+                self._latest_fixation_per_task.values(), default=float("-inf")
+            )
+        else:
+            fixation_time = self._latest_fixation_per_task.get(task, float("-inf"))
+        return self.get_cycle_start() - fixation_time
+
+    def _get_target_task(
+        self, event: MouseMotionEvent | EyeMotionEvent
+    ) -> str | None:
+        if not event.target:
+            return None
+        monitoring_tasks = self._get_monitoring_tasks()
+        return next((t for t in event.target if t in monitoring_tasks), None)
+
+    def _get_monitoring_tasks(self) -> frozenset[str]:
+        # cached, this is used for every user input event (see `add_component` and `remove_component`)
+        if self._monitoring_tasks is None:
+            self._monitoring_tasks = frozenset(super().monitoring_tasks)
+        return self._monitoring_tasks
+
+    def add_component(self, component: Component) -> Component:  # noqa
+        self._monitoring_tasks = None
+        return super().add_component(component)
+
+    def remove_component(self, component: Component) -> Component:  # noqa
+        self._monitoring_tasks = None
+        return super().remove_component(component)
+
     # ================================================================================================ #
     # =============================== Below are some useful properties =============================== #
     # ================================================================================================ #
@@ -213,30 +267,17 @@ class GuidanceAgent(_GuidanceAgent):
 
     @property
     def fixation_target(self) -> str | None:
-        """Get the task that the user is currently fixating on. Eyetracking events arrive quickly, this will check events that have been generated since the last cycle of this agent.
+        """Get the task that the user is currently fixating on. Eyetracking events arrive quickly, rather than searching them, the latest fixation is recorded as events arrive (see `on_user_input`) and is used if it was generated in the last few cycles of this agent.
 
         Returns:
             str | None: the task that the user is currently fixating on, or None if the user is not currently fixating on any task.
         """
-        # gather events since the previous cycle
-        latest_fixation: EyeMotionEvent | None = None
-        # use events from the last 3 cycles, rather than the last cycle... this makes things a bit more robust with timings, 
+        # use fixations from the last 3 cycles, rather than the last cycle... this makes things a bit more robust with timings,
         # especially if the fixation filter is not great (TODO we could choose different values or make this configurable...?)
-        prev_cycle_start = self.get_cycle_start(3)
-        _total = 0
-        for event in self._user_input_events[EyeMotionEvent]:
-            if event.timestamp >= prev_cycle_start:
-                _total += 1
-                if event.fixated:
-                    latest_fixation = event
-                    break  # found latest fixation
-            else:
-                break  # dont check older events
-        #print(_total)
-        if latest_fixation is None:
-            return None
-        targets = set(latest_fixation.target) & self.monitoring_tasks
-        return next(iter(targets), None)
+        timestamp, task = self._latest_fixation
+        if timestamp >= self.get_cycle_start(3):
+            return task
+        return None
 
     @property
     def mouse_target(self) -> str | None:
@@ -246,8 +287,7 @@ class GuidanceAgent(_GuidanceAgent):
         )
         if event is None:
             return None
-        targets = set(event.target) & self.monitoring_tasks
-        return next(iter(targets), None)
+        return self._get_target_task(event)
 
     @property
     def gaze_target(self) -> str | None:
@@ -257,5 +297,4 @@ class GuidanceAgent(_GuidanceAgent):
         )
         if event is None:
             return None
-        targets = set(event.target) & self.monitoring_tasks
-        return next(iter(targets), None)
+        return self._get_target_task(event)
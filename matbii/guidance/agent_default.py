@@ -1,5 +1,7 @@
 """Module contains a default implementation for a guidance agent, see `DefaultGuidanceAgent` documentation for details."""
 
+import heapq
+import math
 import random
 from typing import Any, Literal
 from collections.abc import Iterable
@@ -27,6 +29,8 @@ class DefaultGuidanceAgent(GuidanceAgent):
         2. the task is unacceptable.
         3. the user is not already attending on the task.
         4. the grace period has elapsed.
+
+    By default these conditions are checked every cycle. In reactive mode (see `reactive` in the constructor) they are only checked when something they depend on may have changed, i.e. a task becomes (un)acceptable or (in)active, the user's attention changes, guidance is shown or hidden, or a grace period elapses. Grace period deadlines are kept in a heap so that checking them is cheap when tasks are stable.
     """
 
     # used to break ties when multiple tasks could be highlighted. See `break_tie` method.
@@ -52,6 +56,7 @@ class DefaultGuidanceAgent(GuidanceAgent):
         attention_mode: Literal["fixation", "gaze", "mouse"] = "fixation",
         grace_period: float = 3.0,
         counter_factual: bool = False,
+        reactive: bool = False,
         **kwargs: dict[str, Any],
     ):
         """Constructor.
@@ -64,6 +69,7 @@ class DefaultGuidanceAgent(GuidanceAgent):
             attention_mode (Literal["fixation", "gaze", "mouse"], optional): method of determining where the user is attending. "fixation" will use the most recent gaze fixation, "gaze" will use the gaze position (including saccades), "mouse" will use the current mouse position. Defaults to "fixation".
             grace_period (float, optional): the time to wait (seconds) before guidance may be shown for a task after the last time guidance was shown on the task. Defaults to 3.0 seconds.
             counter_factual (bool, optional): whether guidance should be shown to the user, or whether it should just be logged.  This allows counter-factual experiments to be run, we can track when guidance would have been shown, and compare the when it was actually shown (in a different run). Defaults to False.
+            reactive (bool, optional): whether to only make guidance decisions when they may have changed (see class documentation), rather than every cycle. Defaults to False.
             kwargs (dict[str,Any]): Additional optional keyword arguments.
         """
         super().__init__(
@@ -99,6 +105,11 @@ class DefaultGuidanceAgent(GuidanceAgent):
         # used to track the tasks that the user is currently attending to
         self._attending_tasks = set()
 
+        # used in reactive mode, whether guidance decisions need to be made and when grace periods will elapse
+        self._reactive = reactive
+        self._reevaluate = True
+        self._deadlines: list[float] = []
+
     def on_attending(self, attending_tasks: set[str]) -> None:
         """Called when the user's attention changes.
 
@@ -110,6 +121,7 @@ class DefaultGuidanceAgent(GuidanceAgent):
             self._log_info(task, "attending", True)
         if len(attending_tasks) == 0:
             self._log_info("none", "attending", True)
+        self._reevaluate = True
 
     def decide(self):  # noqa
         # update when the user was last attending to a task
@@ -118,6 +130,20 @@ class DefaultGuidanceAgent(GuidanceAgent):
             self._attending_tasks = attending_tasks
             self.on_attending(attending_tasks)
 
+        if self._reactive and not self._should_reevaluate():
+            return  # nothing has changed since guidance decisions were last made
+        self._reevaluate = False
+        self._decide()
+
+    def _should_reevaluate(self) -> bool:
+        """Whether guidance decisions should be made this cycle (in reactive mode), this is the case if something that guidance decisions depend on has changed or if a grace period has elapsed."""
+        now = self.get_cycle_start()
+        while self._deadlines and self._deadlines[0] <= now:
+            heapq.heappop(self._deadlines)
+            self._reevaluate = True
+        return self._reevaluate
+
+    def _decide(self):
         # make guidance decisions
         if self.guidance_on_tasks:
             # guidance is active, should it be?
@@ -143,7 +169,12 @@ class DefaultGuidanceAgent(GuidanceAgent):
             # remove those tasks that the user is currently attending
             unacceptable -= self._attending_tasks
             # check the grace period
+            waiting = unacceptable
             unacceptable = self.grace_period_over(unacceptable)
+            if self._reactive:
+                # decisions need to be made again when the grace period elapses for the waiting tasks
+                for t in waiting - unacceptable:
+                    self._push_deadline(self.grace_period_deadline(t))
 
             task = self.break_tie(unacceptable)
             if task:
@@ -152,6 +183,37 @@ class DefaultGuidanceAgent(GuidanceAgent):
 
             # no task meets the criteria, the user is doing well!
 
+    def grace_period_deadline(self, task: str) -> float:
+        """Get the time at which the grace period for the (unacceptable) task will elapse.
+
+        Args:
+            task (str): the task.
+
+        Returns:
+            float: the time at which the grace period will elapse (this may be in the past), `-inf` if the event that the grace period is measured from has never happened (e.g. guidance has never been shown), there is then no deadline to wait for.
+        """
+        if self._grace_mode == "guidance_task":
+            elapsed = self.time_since_guidance_start(task)
+        elif self._grace_mode == "guidance_any":
+            elapsed = self.time_since_guidance_start(None)
+        elif self._grace_mode == "attention":
+            elapsed = self.time_since_last_attended(task)
+        elif self._grace_mode == "failure":
+            elapsed = self.time_since_failure_start(task)
+        else:
+            raise ValueError(
+                f"Unknown grace mode: {self._grace_mode}, must be one of {DefaultGuidanceAgent.GRACE_ON}"
+            )
+        if elapsed != elapsed:
+            return -math.inf  # NaN, e.g. guidance has never been shown
+        return self.get_cycle_start() + self._grace_period - elapsed
+
+    def _push_deadline(self, deadline: float):
+        # the grace period check is strict (>) so the deadline must be strictly passed
+        deadline = math.nextafter(deadline, math.inf)
+        if math.isfinite(deadline) and deadline not in self._deadlines:
+            heapq.heappush(self._deadlines, deadline)
+
     def grace_period_over(self, tasks: set[str]) -> set[str]:
         """Get the set of (unacceptable) tasks that have had their grace period elapse.
 
@@ -279,12 +341,30 @@ class DefaultGuidanceAgent(GuidanceAgent):
 
     def on_acceptable(self, task: str):  # noqa
         self._log_info(task, "acceptable", True)
+        self._reevaluate = True
         return super().on_acceptable(task)
 
     def on_unacceptable(self, task: str):  # noqa
         self._log_info(task, "acceptable", False)
+        self._reevaluate = True
         return super().on_unacceptable(task)
 
+    def on_active(self, task: str):  # noqa
+        self._reevaluate = True
+        return super().on_active(task)
+
+    def on_inactive(self, task: str):  # noqa
+        self._reevaluate = True
+        return super().on_inactive(task)
+
+    def show_guidance(self, task: str):  # noqa
+        self._reevaluate = True
+        return super().show_guidance(task)
+
+    def hide_guidance(self, task: str):  # noqa
+        self._reevaluate = True
+        return super().hide_guidance(task)
+
     def _log_info(self, task, z, ok):
         """Log info related to a task to the console."""
         info = "task %20s %20s %s" % (z, task, ["✘", "✔"][int(ok)])
@@ -1,26 +1,85 @@
 """Module contains the base class for task acceptability sensors `TaskAcceptabilitySensor`, it is an extension of the base class that is part of `icua` which includes functionality for determining if a task is active based on whether the task element is present in the environment state."""
 
 from typing import Any
+from collections.abc import Callable, Iterable
 from star_ray.event import Event, Observation, ActiveObservation, ErrorObservation
-from star_ray_xml import XPathElementsNotFound, Select
+from star_ray.pubsub import Subscribe
+from star_ray_xml import XPathElementsNotFound
 from icua.agent import TaskAcceptabilitySensor as _TaskAcceptabilitySensor
 
+from ..utils._element_index import STRUCTURAL_QUERY_TYPES, SelectById
+
 
 class TaskAcceptabilitySensor(_TaskAcceptabilitySensor):
-    """This `Sensor` can be used by an agent to track the acceptability of a task."""
+    """This `Sensor` can be used by an agent to track the acceptability of a task.
+
+    By default, all sense actions (see `sense`) are taken every cycle, as is a check for whether the task is active. If `subscribe` is True, the sensor will instead subscribe to the actions that may change the elements it senses (see `watch`) and will only sense elements after they have been changed. Whether the task is active is then only checked when the structure of the state changes (`Insert`, `Delete` or `Replace`).
 
-    def __init__(self, task_name: str, *args: list[Any], **kwargs: dict[str, Any]):
+    In either mode the sensor is notified of structural changes, subclasses may use this (see `on_structure_changed`) to invalidate beliefs about elements that are otherwise static and so are not sensed every cycle.
+    """
+
+    def __init__(
+        self,
+        task_name: str,
+        *args: list[Any],
+        subscribe: bool = False,
+        **kwargs: dict[str, Any],
+    ):
         """Constructor.
 
         Args:
             task_name (str): task to track.
             args (list[Any]): Additional optional arguments.
+            subscribe (bool, optional): whether to only sense elements when they change (rather than every cycle), see `watch`. Defaults to False.
             kwargs (dict[str,Any]): Additional optionals keyword arguments.
         """
         super().__init__(task_name, *args, **kwargs)
         self._is_active = True  # unless it cannot be found...
         # the id of the action that is used to check whether the task is active
         self._is_active_action_id = None
+        # used in subscription mode
+        self._subscribe = subscribe
+        self._watch: dict[type[Event], Callable[[Event], Iterable[str]] | None] = {}
+        # ids of the elements that have changed since they were last sensed, None if all elements should be sensed
+        self._changed: set[str] | None = None
+        self._check_is_active = True
+        self._subscribe_action_id = None
+
+    def watch(self) -> dict[type[Event], Callable[[Event], Iterable[str]] | None]:
+        """Get the types of action that may change the elements that are sensed by this sensor (see `sense`), this is used in subscription mode. Each action type is mapped to a function that gives the `id`s of the elements that a given action will change, or to None if the action may change any of the elements. In subscription mode `sense` must return `SelectById` actions, these will be restricted to the elements that have changed.
+
+        Returns:
+            dict[type[Event], Callable[[Event], Iterable[str]] | None]: action types to subscribe to.
+        """
+        return {}
+
+    def __subscribe__(self) -> list[Subscribe]:  # noqa
+        # structural changes are always subscribed to, they are rare and may replace elements whose (static) attributes have been cached
+        self._watch = self.watch() if self._subscribe else {}
+        subscribe = Subscribe(topic=[*self._watch.keys(), *STRUCTURAL_QUERY_TYPES])
+        self._subscribe_action_id = subscribe.id
+        return [subscribe]
+
+    def __notify__(self, message: Event) -> None:  # noqa
+        if isinstance(message, STRUCTURAL_QUERY_TYPES):
+            # the task may have been added or removed, elements may have been replaced
+            self._check_is_active = True
+            self._changed = None
+            self.on_structure_changed()
+            return
+        if self._changed is None:
+            return  # all elements will be sensed anyway
+        for t in type(message).mro():
+            if t in self._watch:
+                get_changed = self._watch[t]
+                if get_changed is None:
+                    self._changed = None
+                else:
+                    self._changed.update(get_changed(message))
+                return
+
+    def on_structure_changed(self) -> None:
+        """Called when the structure of the state has changed (`Insert`, `Delete` or `Replace`) or when the task has become active, elements of the task may have been replaced. By default this does nothing."""
 
     def is_active(self, task: str = None, **kwargs: dict[str, Any]) -> bool:  # noqa
         return self._is_active  # this is not done by subclass
@@ -29,6 +88,14 @@ class TaskAcceptabilitySensor(_TaskAcceptabilitySensor):
         # fetch the observation that is the result of the is_active action and update _is_active
         # this must happen before beliefs are updated since some updates may depend on whether the task is active
         self._update_is_active(observations)
+        if self._subscribe_action_id is not None:
+            # the result of the subscription action (see `__subscribe__`) contains no data
+            observations = [
+                o
+                for o in observations
+                if isinstance(o, ErrorObservation)
+                or o.action_id != self._subscribe_action_id
+            ]
         return super().__transduce__(observations)
 
     def on_error_observation(self, observation: ErrorObservation):  # noqa
@@ -64,10 +131,14 @@ class TaskAcceptabilitySensor(_TaskAcceptabilitySensor):
         else:
             if not isinstance(is_active_observation, ErrorObservation):
                 self._is_active = True  # the task is inactive and may now be active
+                self._changed = None  # sense all elements of the newly active task
+                self.on_structure_changed()
             else:
                 self._is_active = False  # the task is inactive and remains inactive
 
     def __sense__(self) -> list[Event]:  # noqa
+        if self._subscribe:
+            return self._sense_changes()
         if self._is_active:
             actions = self.sense()
             if not isinstance(actions, list | tuple):
@@ -77,7 +148,24 @@ class TaskAcceptabilitySensor(_TaskAcceptabilitySensor):
         else:
             actions = []
         # always check if the task is active
-        is_active = Select(xpath=f"//*[@id='{self.task_name}']", attrs=["id"])
+        is_active = SelectById.new([self.task_name], ["id"])
         self._is_active_action_id = is_active.id
         actions.insert(0, is_active)
         return actions
+
+    def _sense_changes(self) -> list[Event]:
+        """Sense actions in subscription mode, only elements that have changed are sensed and the task is only checked for activity if the structure of the state has changed."""
+        actions = []
+        if self._is_active:
+            if self._changed is None:
+                actions = self.sense()
+            elif self._changed:
+                actions = [action.restrict(self._changed) for action in self.sense()]
+                actions = list(filter(None, actions))
+            self._changed = set()
+        if self._check_is_active:
+            self._check_is_active = False
+            is_active = SelectById.new([self.task_name], ["id"])
+            self._is_active_action_id = is_active.id
+            actions.insert(0, is_active)
+        return actions
@@ -2,8 +2,9 @@
 
 from typing import Any
 from functools import partial
-from star_ray_xml import select, Select
 from .sensor_guidance import TaskAcceptabilitySensor
+from ..tasks.resource_management import PumpFuelAction, BurnFuelAction, FlowTickAction
+from ..utils._element_index import SelectById
 from ..utils._const import TASK_ID_RESOURCE_MANAGEMENT, tank_id, tank_level_id
 
 
@@ -69,7 +70,11 @@ class ResourceManagementTaskAcceptabilitySensor(TaskAcceptabilitySensor):
             and fuel_level <= acceptable_level + acceptable_range2
         )
 
-    def sense(self, tank_ids: tuple[str, ...] = ("a", "b")) -> list[Select]:
+    def watch(self) -> dict[type, Any]:  # noqa
+        # any of these may change the fuel level of the main tanks
+        return {PumpFuelAction: None, BurnFuelAction: None, FlowTickAction: None}
+
+    def sense(self, tank_ids: tuple[str, ...] = ("a", "b")) -> list[SelectById]:
         """Generates the sense actions that are required for checking whether the resource management task is in an acceptable state.
 
         The actions will request the following data:
@@ -80,19 +85,11 @@ class ResourceManagementTaskAcceptabilitySensor(TaskAcceptabilitySensor):
             tank_ids (tuple[str, str], optional): the ids of the tanks to check, defaults to ("a", "b").
 
         Returns:
-            list[Select]: list of sense actions to take.
+            list[SelectById]: list of sense actions to take.
         """
         # interested in the fuel levels of the main tanks in the Resource Management Task
-        tanks = [tank_id(i) for i in tank_ids]
-        tank_levels = [tank_level_id(i) for i in tank_ids]
-        tank_selects = [
-            select(
-                xpath=f"//*[@id='{id}']", attrs=["id", "data-capacity", "data-level"]
-            )
-            for id in tanks
-        ]
-        tank_level_selects = [
-            select(xpath=f"//*[@id='{id}']", attrs=["id", "data-level", "data-range"])
-            for id in tank_levels
-        ]
-        return [*tank_selects, *tank_level_selects]
+        tanks = {tank_id(i): ["id", "data-capacity", "data-level"] for i in tank_ids}
+        tank_levels = {
+            tank_level_id(i): ["id", "data-level", "data-range"] for i in tank_ids
+        }
+        return [SelectById(elements={**tanks, **tank_levels})]
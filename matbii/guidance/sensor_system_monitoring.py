@@ -2,10 +2,10 @@
 
 from typing import Any
 from functools import partial
-from star_ray_xml import Select
 from .sensor_guidance import TaskAcceptabilitySensor
 
-from ..tasks.system_monitoring import SetLightAction, SetSliderAction
+from ..tasks.system_monitoring import SetLightAction, SetSliderAction, ToggleLightAction
+from ..utils._element_index import SelectById
 from ..utils._const import (
     TASK_ID_SYSTEM_MONITORING,
     slider_id,
@@ -50,6 +50,11 @@ class SystemMonitoringTaskAcceptabilitySensor(TaskAcceptabilitySensor):
             f"{self.task_name}.slider-3": partial(self.is_slider_acceptable, 3),
             f"{self.task_name}.slider-4": partial(self.is_slider_acceptable, 4),
         }
+        # the number of increments in each slider is static, it is only sensed when the task is (re)loaded
+        self._sense_incs = True
+
+    def on_structure_changed(self) -> None:  # noqa
+        self._sense_incs = True
 
     def is_acceptable(self, task: str = None, **kwargs: dict[str, Any]) -> bool:  # noqa
         if not self._is_active:
@@ -110,25 +115,29 @@ class SystemMonitoringTaskAcceptabilitySensor(TaskAcceptabilitySensor):
         # light 2 should be off
         return self.beliefs[light_id(2)]["data-state"] == SetLightAction.OFF
 
-    def sense(self) -> list[Select]:
+    def watch(self) -> dict[type, Any]:  # noqa
+        return {
+            SetLightAction: lambda action: [light_id(action.target)],
+            ToggleLightAction: lambda action: [light_id(action.target)],
+            SetSliderAction: lambda action: [slider_id(action.target)],
+        }
+
+    def sense(self) -> list[SelectById]:
         """Generates the sense actions that are required for checking whether the system monitoring task is in an acceptable state.
 
         The actions will request the following data:
         - the state of each light element.
         - the state of each slider element.
-        - the number of increments in each slider element.
+        - the number of increments in each slider element, this is static and so is only requested when the task has been (re)loaded, see `on_structure_changed`.
 
         Returns:
-            list[Select]: list of sense actions to take.
+            list[SelectById]: list of sense actions to take.
         """
         # take these actions if this task is active
-        lights = [f"//*[@id='{light_id(i)}']" for i in (1, 2)]
-        sliders = [f"//*[@id='{slider_id(i)}']" for i in (1, 2, 3, 4)]
-        slider_incs = [f"//*[@id='{slider_incs_id(i)}']" for i in (1, 2, 3, 4)]
-
-        lights = [Select(xpath=xpath, attrs=["id", "data-state"]) for xpath in lights]
-        sliders = [Select(xpath=xpath, attrs=["id", "data-state"]) for xpath in sliders]
-        slider_incs = [
-            Select(xpath=xpath, attrs=["id", "incs"]) for xpath in slider_incs
-        ]
-        return [*lights, *sliders, *slider_incs]
+        lights = {light_id(i): ["id", "data-state"] for i in (1, 2)}
+        sliders = {slider_id(i): ["id", "data-state"] for i in (1, 2, 3, 4)}
+        if self._sense_incs:
+            self._sense_incs = False
+            slider_incs = {slider_incs_id(i): ["id", "incs"] for i in (1, 2, 3, 4)}
+            return [SelectById(elements={**lights, **sliders, **slider_incs})]
+        return [SelectById(elements={**lights, **sliders})]
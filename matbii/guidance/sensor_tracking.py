@@ -2,9 +2,10 @@
 
 from typing import Any
 from star_ray.event.observation_event import Observation
-from star_ray_xml import select, Select
 from .sensor_guidance import TaskAcceptabilitySensor
+from ..tasks.tracking import TargetMoveAction
 
+from ..utils._element_index import SelectById
 from ..utils._const import TASK_ID_TRACKING, tracking_box_id, tracking_target_id
 
 
@@ -90,7 +91,11 @@ class TrackingTaskAcceptabilitySensor(TaskAcceptabilitySensor):
                     f"Observation: {observation} doesn't contain the required `id` attribute."
                 )
 
-    def sense(self) -> list[Select]:
+    def watch(self) -> dict[type, Any]:  # noqa
+        target_id = TrackingTaskAcceptabilitySensor._TARGET_ID
+        return {TargetMoveAction: lambda _: [target_id]}
+
+    def sense(self) -> list[SelectById]:
         """Generates the sense actions that are required for checking whether the tracking task is in an acceptable state.
 
         The actions will request the following data:
@@ -98,17 +103,13 @@ class TrackingTaskAcceptabilitySensor(TaskAcceptabilitySensor):
         - the bounds of the central box of the tracking task.
 
         Returns:
-            list[Select]: list of sense actions to take.
+            list[SelectById]: list of sense actions to take.
         """
         return [
-            select(
-                xpath=f"//*[@id='{tracking_target_id()}']",
-                attrs=["id", "x", "y", "width", "height"],
-            ),
-            select(
-                xpath=f"//*[@id='{tracking_box_id()}']",
-                attrs=["id", "x", "y", "width", "height"],
-            ),
+            SelectById.new(
+                [tracking_target_id(), tracking_box_id()],
+                ["id", "x", "y", "width", "height"],
+            )
         ]
 
     @staticmethod
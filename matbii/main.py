@@ -4,11 +4,12 @@
 """
 
 from functools import partial
-from typing import Any
+from pathlib import Path
+from typing import Any, TYPE_CHECKING
 
 
 # imports for creating the environment
-from matbii.environment import MultiTaskEnvironment
+from matbii.environment import MultiTaskEnvironment, HeadlessMultiTaskEnvironment
 
 # imports for creating guidance agents
 from matbii.guidance import (
@@ -24,6 +25,7 @@ from matbii.agent import (
 )
 from matbii.avatar import (
     Avatar,
+    HeadlessAvatar,
     AvatarActuator,
     ExitActuator,
     AvatarTrackingActuator,
@@ -31,19 +33,35 @@ from matbii.avatar import (
     AvatarResourceManagementActuator,
 )
 from matbii.config import Configuration
+from matbii._startup import startup_phase, end_startup
 from matbii.utils import (
     TASK_PATHS,
     TASK_ID_TRACKING,
     TASK_ID_RESOURCE_MANAGEMENT,
     TASK_ID_SYSTEM_MONITORING,
+    ElementIndex,
+    BinaryEventLogger,
+    close_event_logger,
+    VirtualClock,
+    use_task_cache,
 )
 
+if TYPE_CHECKING:
+    from matbii.session_server import SessionServer
+
 
 def main(
     config: str | None = None,
+    session: "SessionServer | None" = None,
     **context: dict[str, Any],
 ):
-    """Run the `matbii` simulation."""
+    """Run the `matbii` simulation.
+
+    Args:
+        config (str | None, optional): path to the configuration file. Defaults to None.
+        session (SessionServer | None, optional): the session server that this simulation is a session of, the window and eye tracker of a previous session are reused if possible. Defaults to None.
+        context (dict[str, Any]): configuration overrides.
+    """
     # args from command line can be used in config
     # context = dict(
     #     experiment=dict(id=experiment) if experiment else dict(),
@@ -51,90 +69,157 @@ def main(
     #     **kwargs,
     # )
 
-    # load configuration from the config file
-    config = Configuration.from_file(config, context=context)
-    # initialise logging
-    config = Configuration.initialise_logging(config)
-
-    # Create the avatar:
-    # - required sensors are added by default
-    # - task related actuators are added when their corresponding task is enabled
-    avatar = Avatar(
-        [],
-        [AvatarActuator(), ExitActuator()],  # will log user events by default
-        window_config=config.window,
-    )
-
-    # if eyetracking is enabled, add a sensor to the avatar
-    eyetracking_sensor = config.eyetracking.new_eyetracking_sensor()
-    if eyetracking_sensor:
-        avatar.add_component(eyetracking_sensor)
-
-    agents = []  # will be given to the environment
-
-    # create the guidance agent
-    # - sensors will determine the acceptability of each task - if the task is enabled.
-    # - change actuators for different guidance to be shown (must inherit from GuidanceActuator)
-    guidance_agent = DefaultGuidanceAgent(
-        [
-            # add more if there are more tasks!
-            SystemMonitoringTaskAcceptabilitySensor(),
-            ResourceManagementTaskAcceptabilitySensor(),
-            TrackingTaskAcceptabilitySensor(),
-        ],
-        [
-            # used to log this agents beliefs for post experiment analysis
-            # LogActuator(path=Path(config.logging.path) / "guidance_logs.log"),
-            # shows arrow pointing at a task as guidance
-            config.guidance.arrow.to_actuator(),
-            # shows a box around a task as guidance
-            config.guidance.box.to_actuator(),
-        ],
-        break_ties=config.guidance.break_ties,
-        grace_period=config.guidance.grace_period,
-        grace_mode=config.guidance.grace_mode,
-        attention_mode=config.guidance.attention_mode,
-        counter_factual=config.guidance.counter_factual,
-    )
-    agents.append(guidance_agent)
-
-    env = MultiTaskEnvironment(
-        wait=0.01,  # this can be zero as long as it doesnt matter that the env scheduler hogs asyncio: TODO test this with IO devices (eyetracker particularly)
-        avatar=avatar,
-        agents=agents,
-        svg_size=(config.ui.width, config.ui.height),
-        logging_path=config.logging.path,
-        terminate_after=config.experiment.duration,
-    )
-
-    # NOTE: if you have more tasks to add, add them here!
-    env.add_task(
-        name=TASK_ID_TRACKING,
-        path=[config.experiment.path, TASK_PATHS[TASK_ID_TRACKING]],
-        agent_actuators=[TrackingActuator],
-        avatar_actuators=[
-            partial(
-                AvatarTrackingActuator,
-                # Negative values will invert the direction of movement
-                target_speed=-50.0,  # TODO a config option for this?
+    with startup_phase("load configuration"):
+        # load configuration from the config file
+        config = Configuration.from_file(config, context=context)
+        # initialise logging
+        config = Configuration.initialise_logging(config)
+
+    clock = None
+    event_loggers = []  # closed when the simulation ends
+    try:
+        if config.ui.headless:
+            # the simulation runs on a virtual clock, it must be installed before any agents are created
+            clock = VirtualClock()
+            clock.install()
+            # there is no UI (or eyetracking) in headless mode, user input may be simulated by a synthetic participant
+            avatar = config.participant.synthetic.new_synthetic_participant(
+                [AvatarActuator(), ExitActuator()]
+            )
+            if avatar is None:
+                avatar = HeadlessAvatar([], [AvatarActuator(), ExitActuator()])
+        else:
+            # Create the avatar:
+            # - required sensors are added by default
+            # - task related actuators are added when their corresponding task is enabled
+            # the window of a previous session is reused if possible
+            view = None
+            if session is not None:
+                view = session.get_view(config.window, config.ui.layered_rendering)
+            with startup_phase("open window"):
+                avatar = Avatar(
+                    [],
+                    [AvatarActuator(), ExitActuator()],  # will log user events by default
+                    window_config=config.window,
+                    layered=config.ui.layered_rendering,
+                    view=view,
+                )
+
+            # if eyetracking is enabled, add a sensor to the avatar
+            eyetracker = session.get_eyetracker(config.eyetracking) if session else None
+            eyetracking_sensor = config.eyetracking.new_eyetracking_sensor(eyetracker)
+            if eyetracking_sensor:
+                avatar.add_component(eyetracking_sensor)
+
+        agents = []  # will be given to the environment
+
+        # create the guidance agent
+        # - sensors will determine the acceptability of each task - if the task is enabled.
+        # - change actuators for different guidance to be shown (must inherit from GuidanceActuator)
+        guidance_agent = DefaultGuidanceAgent(
+            [
+                # add more if there are more tasks!
+                SystemMonitoringTaskAcceptabilitySensor(
+                    subscribe=config.guidance.subscribe
+                ),
+                ResourceManagementTaskAcceptabilitySensor(
+                    subscribe=config.guidance.subscribe
+                ),
+                TrackingTaskAcceptabilitySensor(subscribe=config.guidance.subscribe),
+            ],
+            [
+                # used to log this agents beliefs for post experiment analysis
+                # LogActuator(path=Path(config.logging.path) / "guidance_logs.log"),
+                # shows arrow pointing at a task as guidance
+                config.guidance.arrow.to_actuator(),
+                # shows a box around a task as guidance
+                config.guidance.box.to_actuator(),
+            ],
+            break_ties=config.guidance.break_ties,
+            grace_period=config.guidance.grace_period,
+            grace_mode=config.guidance.grace_mode,
+            attention_mode=config.guidance.attention_mode,
+            counter_factual=config.guidance.counter_factual,
+            reactive=config.guidance.reactive,
+        )
+        agents.append(guidance_agent)
+
+        if config.ui.headless:
+            env = HeadlessMultiTaskEnvironment(
+                clock=clock,
+                step=config.ui.headless_step,
+                avatar=avatar,
+                agents=agents,
+                svg_size=(config.ui.width, config.ui.height),
+                logging_path=config.logging.path,
+                terminate_after=config.experiment.duration,
+            )
+        else:
+            env = MultiTaskEnvironment(
+                wait=0.01,  # this can be zero as long as it doesnt matter that the env scheduler hogs asyncio: TODO test this with IO devices (eyetracker particularly)
+                avatar=avatar,
+                agents=agents,
+                svg_size=(config.ui.width, config.ui.height),
+                logging_path=config.logging.path,
+                terminate_after=config.experiment.duration,
+            )
+        if env.ambient._event_logger is not None:
+            event_loggers.append(env.ambient._event_logger)
+        # task actions find their elements via this index, it must be rebuilt when tasks are added/removed
+        ElementIndex.get_index(env.ambient.get_state()).subscribe(env.ambient)
+
+        # optionally log events to a binary event log (alongside the text event log)
+        if config.logging.binary:
+            text_log_path = Path(env.ambient._event_logger.path)
+            binary_logger = BinaryEventLogger(text_log_path.with_suffix(".msgpack"))
+            binary_logger.attach(env.ambient)
+            event_loggers.append(binary_logger)
+
+        with startup_phase("load tasks"):
+            # rendered task svgs and parsed schedules are cached between runs
+            if config.experiment.task_cache:
+                use_task_cache(env.ambient, config.experiment.task_cache)
+
+            # NOTE: if you have more tasks to add, add them here!
+            env.add_task(
+                name=TASK_ID_TRACKING,
+                path=[config.experiment.path, TASK_PATHS[TASK_ID_TRACKING]],
+                agent_actuators=[TrackingActuator],
+                avatar_actuators=[
+                    partial(
+                        AvatarTrackingActuator,
+                        # Negative values will invert the direction of movement
+                        target_speed=-50.0,  # TODO a config option for this?
+                    )
+                ],
+                enable=TASK_ID_TRACKING in config.experiment.enable_tasks,
+            )
+
+            env.add_task(
+                name=TASK_ID_SYSTEM_MONITORING,
+                path=[config.experiment.path, TASK_PATHS[TASK_ID_SYSTEM_MONITORING]],
+                agent_actuators=[SystemMonitoringActuator],
+                avatar_actuators=[AvatarSystemMonitoringActuator],
+                enable=TASK_ID_SYSTEM_MONITORING in config.experiment.enable_tasks,
             )
-        ],
-        enable=TASK_ID_TRACKING in config.experiment.enable_tasks,
-    )
-
-    env.add_task(
-        name=TASK_ID_SYSTEM_MONITORING,
-        path=[config.experiment.path, TASK_PATHS[TASK_ID_SYSTEM_MONITORING]],
-        agent_actuators=[SystemMonitoringActuator],
-        avatar_actuators=[AvatarSystemMonitoringActuator],
-        enable=TASK_ID_SYSTEM_MONITORING in config.experiment.enable_tasks,
-    )
-
-    env.add_task(
-        name=TASK_ID_RESOURCE_MANAGEMENT,
-        path=[config.experiment.path, TASK_PATHS[TASK_ID_RESOURCE_MANAGEMENT]],
-        agent_actuators=[ResourceManagementActuator],
-        avatar_actuators=[AvatarResourceManagementActuator],
-        enable=TASK_ID_RESOURCE_MANAGEMENT in config.experiment.enable_tasks,
-    )
-    env.run()
+
+            env.add_task(
+                name=TASK_ID_RESOURCE_MANAGEMENT,
+                path=[config.experiment.path, TASK_PATHS[TASK_ID_RESOURCE_MANAGEMENT]],
+                agent_actuators=[ResourceManagementActuator],
+                avatar_actuators=[AvatarResourceManagementActuator],
+                enable=TASK_ID_RESOURCE_MANAGEMENT in config.experiment.enable_tasks,
+            )
+
+        # startup has ended, this reports startup times if --profile-startup was given
+        end_startup()
+        if session is not None:
+            session.run(env, avatar)
+        else:
+            env.run()
+    finally:
+        for event_logger in event_loggers:
+            close_event_logger(event_logger)
+        # a session may fail after the clock was installed, the next session (see `SessionServer`) needs the real clock
+        if clock is not None:
+            clock.uninstall()
@@ -0,0 +1,182 @@
+"""Module defining `SessionServer`, which runs back-to-back participant sessions in a single (pre-warmed) process, see `python -m matbii -c <CONFIG_FILE> --session-server`.
+
+Running each session with a new `python -m matbii` process means that all packages are imported again, the window is opened again, tasks are loaded again and the eye tracker is connected again. A `SessionServer` keeps the process, the window (and its cached task bitmaps, see `matbii.avatar.LayeredSVGSurface`) and the eye tracker connection alive between sessions, each session creates a new environment (with its own event log) from the base configuration and the configuration overrides of the session.
+
+Sessions are requested by writing a json object (one per line) to stdin, the object contains configuration overrides in the same format as the configuration file, for example:
+```
+{"participant": {"id": "P02"}, "experiment": {"path": "./schedules/B"}}
+```
+Each session runs to completion (e.g. until `experiment.duration` has passed or the participant presses escape) before the next line is read. The server exits at the end of the input.
+"""
+
+import copy
+import json
+import sys
+import time
+from typing import Any, TextIO
+
+import pygame
+from deepmerge import always_merger
+from star_ray import Environment
+from star_ray_pygame import View, WindowConfiguration
+from star_ray_pygame.view import (
+    PYGAME_WINDOWRESIZE,
+    PYGAME_WINDOWMOVE,
+    PYGAME_SCREENSIZE,
+)
+from icua.extras.eyetracking import EyetrackerBase
+
+from .avatar.layered_surface import use_layered_surface
+from .config import EyetrackingConfiguration
+from .utils import LOGGER
+
+__all__ = ("SessionServer",)
+
+
+class SessionServer:
+    """Runs participant sessions one after the other in the same process, the resources that are expensive to create (the window and the eye tracker connection) are created in the first session and are reused by later sessions as long as their configuration does not change. Each session is run with `matbii.main.main`."""
+
+    def __init__(self, config: str | None = None, **context: dict[str, Any]):
+        """Constructor.
+
+        Args:
+            config (str | None, optional): path to the base configuration file of each session. Defaults to None.
+            context (dict[str, Any]): configuration overrides that apply to every session.
+        """
+        super().__init__()
+        self._config = config
+        self._context = context
+        # view (window) and the configuration that it was created with
+        self._view: View | None = None
+        self._view_key: tuple[WindowConfiguration, bool] | None = None
+        self._next_view_key: tuple[WindowConfiguration, bool] | None = None
+        # eye tracker and the configuration that it was created with
+        self._eyetracker: EyetrackerBase | None = None
+        self._eyetracker_key: tuple[str, str | None] | None = None
+        # time taken to start each session (from the request to the environment running)
+        self.startup_times: list[float] = list()
+        self._start = None
+
+    def serve(self, file: TextIO = sys.stdin) -> None:
+        """Run a session for each configuration (a json object, one per line) read from `file`, blank lines are ignored. Sessions with an invalid configuration are skipped. All resources are released at the end of the input.
+
+        Args:
+            file (TextIO, optional): the file to read configurations from. Defaults to sys.stdin.
+        """
+        LOGGER.info("Session server is ready, waiting for configuration...")
+        try:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    context = json.loads(line)
+                    if not isinstance(context, dict):
+                        raise ValueError(f"expected a json object, received: {line}")
+                    self.run_session(**context)
+                except Exception as e:
+                    # the next participant should not have to wait for the process to start again
+                    LOGGER.exception(f"Session failed: {e}")
+                LOGGER.info("Session server is ready, waiting for configuration...")
+        finally:
+            self.close()
+
+    def run_session(self, **context: dict[str, Any]) -> None:
+        """Run a single session, this call is blocking.
+
+        Args:
+            context (dict[str, Any]): configuration overrides of the session, these take precedence over the configuration overrides that were given to the server.
+        """
+        from .main import main
+
+        self._start = time.perf_counter()
+        context = always_merger.merge(copy.deepcopy(self._context), context)
+        main(self._config, session=self, **context)
+
+    def run(self, env: Environment, avatar: Any) -> None:
+        """Run the environment of a session, this is called by `matbii.main.main` once the environment is ready. The window of the avatar is kept for the next session.
+
+        Args:
+            env (Environment): the environment.
+            avatar (Any): the avatar of the session.
+        """
+        if self._start is not None:
+            self.startup_times.append(time.perf_counter() - self._start)
+            LOGGER.info(f"Session started in {self.startup_times[-1]:.3f}s")
+        view = getattr(avatar, "_view", None)
+        if isinstance(view, View) and view is not self._view:
+            self._view = view
+            self._view_key = self._next_view_key
+        try:
+            env.run()
+        finally:
+            if self._eyetracker is not None:
+                self._eyetracker.stop()
+
+    def get_view(
+        self, window_config: WindowConfiguration, layered: bool
+    ) -> View | None:
+        """Get the view (window) of the previous session if it can be reused, it is reset for a new avatar.
+
+        Args:
+            window_config (WindowConfiguration): the window configuration of the session.
+            layered (bool): whether the session renders with a `LayeredSVGSurface`.
+
+        Returns:
+            View | None: the view, or None if a new view should be created.
+        """
+        key = (window_config, layered)
+        self._next_view_key = key
+        if self._view is None or not self._view.is_open:
+            return None
+        if self._view_key != key:
+            self._view.close()  # the window configuration has changed
+            self._view = None
+            return None
+        _reset_view(self._view, layered)
+        return self._view
+
+    def get_eyetracker(
+        self, config: EyetrackingConfiguration
+    ) -> EyetrackerBase | None:
+        """Get the eye tracker of the previous session if it can be reused, otherwise a new eye tracker is created (and connected).
+
+        Args:
+            config (EyetrackingConfiguration): the eyetracking configuration of the session.
+
+        Returns:
+            EyetrackerBase | None: the eye tracker, or None if eyetracking is not enabled.
+        """
+        if not config.enable:
+            return None
+        key = (config.sdk, config.uri)
+        if self._eyetracker is None or self._eyetracker_key != key:
+            self._eyetracker = config.new_eyetracker()
+            self._eyetracker_key = key
+        return self._eyetracker
+
+    def close(self) -> None:
+        """Release the resources that are kept between sessions, this closes the window."""
+        if self._view is not None and self._view.is_open:
+            self._view.close()
+        self._view = None
+        if self._eyetracker is not None:
+            self._eyetracker.stop()
+        self._eyetracker = None
+
+
+def _reset_view(view: View, layered: bool) -> None:
+    # prepare the view of a previous session for a new avatar
+    # events from the previous session (e.g. pressing escape to end it) are dropped
+    pygame.event.clear()
+    # the initial window events are sent again for the new avatar (see `View.__init__`), they are converted to `star_ray` events by `View.get_nowait`
+    window_info = view.get_window_info()
+    screen_info = view.get_screen_info()
+    for event_type, data in [
+        (PYGAME_WINDOWRESIZE, dict(size=window_info["size"])),
+        (PYGAME_WINDOWMOVE, dict(position=window_info["position"])),
+        (PYGAME_SCREENSIZE, dict(size=screen_info["size"])),
+    ]:
+        pygame.event.post(pygame.event.Event(event_type, **data))
+    if layered:
+        # the cached layers are the task panels of the previous session
+        use_layered_surface(view).invalidate()
@@ -16,6 +16,7 @@ from .resource_management import (
     PumpFuelAction,
     TogglePumpAction,
     TogglePumpFailureAction,
+    FlowTickAction,
 )
 from .system_monitoring import (
     SystemMonitoringActuator,
@@ -37,6 +38,7 @@ TASK_EVENT_TYPES = (
     PumpFuelAction,
     TogglePumpAction,
     TogglePumpFailureAction,
+    FlowTickAction,
 )
 
 
@@ -50,6 +52,7 @@ __all__ = (
     "BurnFuelAction",
     "PumpFuelAction",
     "TogglePumpFailureAction",
+    "FlowTickAction",
     # tracking
     "AvatarTrackingActuator",
     "TrackingActuator",
@@ -9,6 +9,7 @@ from .resource_management import (
     PumpFuelAction,
     TogglePumpAction,
     TogglePumpFailureAction,
+    FlowTickAction,
 )
 
 __all__ = (
@@ -19,6 +20,7 @@ __all__ = (
     "BurnFuelAction",
     "PumpFuelAction",
     "TogglePumpFailureAction",
+    "FlowTickAction",
 )
 
 # define type for pump state in configuration files, the values an be "on", "off", "failure", see SetPumpAction.coerce_pump_state
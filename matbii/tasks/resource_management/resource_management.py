@@ -3,23 +3,29 @@
 This files contains:
     - avatar actuator: `AvatarResourceManagementActuator`
     - agent actuator: `ResourceManagementActuator`
-    - actions: [`SetPumpAction`, `TogglePumpAction`, `TogglePumpFailureAction`, `PumpFuelAction`, `BurnFuelAction`]
+    - actions: [`SetPumpAction`, `TogglePumpAction`, `TogglePumpFailureAction`, `PumpFuelAction`, `BurnFuelAction`, `FlowTickAction`]
 """
 
 import re
+import numpy as np
 from typing import ClassVar, Literal, Any
 from pydantic import field_validator
 from functools import partial
-from star_ray_xml import update, select, XMLState, Expr
+from star_ray_xml import XMLState
 from star_ray_xml.query import XMLUpdateQuery
 
 from icua.event import MouseButtonEvent
 from icua.agent import attempt, Actuator
 
+from ...utils._element_index import ElementIndex, get_literal, state_fill
+from ...utils._const import TASK_ID_RESOURCE_MANAGEMENT
+
 TANK_IDS = list("abcdef")
 TANK_MAIN_IDS = list("ab")
 TANK_INF_IDS = list("ef")
 PUMP_IDS = ["ab", "ba", "ca", "ec", "ea", "db", "fd", "fb"]
+# the order in which pumps are applied by `FlowTickAction` (this is the order of `pump_fuel` in the default schedule)
+PUMP_FLOW_ORDER = ["fd", "fb", "db", "ec", "ea", "ca", "ba", "ab"]
 ALL = "*"
 
 __all__ = (
@@ -30,6 +36,7 @@ __all__ = (
     "BurnFuelAction",
     "PumpFuelAction",
     "TogglePumpFailureAction",
+    "FlowTickAction",
 )
 
 
@@ -140,6 +147,23 @@ class ResourceManagementActuator(Actuator):
         """
         return PumpFuelAction(target=target, flow=flow)
 
+    @attempt
+    def flow_tick(
+        self,
+        flow: float | dict[str, float],
+        burn: float | dict[str, float],
+    ) -> "FlowTickAction":
+        """Burns fuel in the main tanks and then pumps fuel via every pump that is "on" in a single step. This is equivalent to (and much more efficient than) a `burn_fuel` for each main tank followed by a `pump_fuel` for each pump.
+
+        Args:
+            flow (float | dict[str, float]): amount of fuel to pump, either the same amount for every pump or a mapping pump -> amount (pumps are applied in the order given).
+            burn (float | dict[str, float]): amount of fuel to burn, either the same amount for both main tanks or a mapping tank -> amount.
+
+        Returns:
+            FlowTickAction: the action
+        """
+        return FlowTickAction(flow=flow, burn=burn)
+
     @attempt
     def toggle_pump_failure(
         self,
@@ -174,6 +198,8 @@ class ResourceManagementActuator(Actuator):
 class PumpAction(XMLUpdateQuery):
     """Base class for pump related actions."""
 
+    TASK_ID: ClassVar[str] = TASK_ID_RESOURCE_MANAGEMENT  # the task that this action modifies
+
     target: str
 
     OFF: ClassVar[int] = 0
@@ -271,14 +297,12 @@ class SetPumpAction(PumpAction):
         return SetPumpAction(target=target, state=PumpAction.FAILURE)
 
     def __execute__(self, state: XMLState):  # noqa
-        return state.update(
-            update(
-                xpath=f"//*[@id='pump-{self.target}-button']",
-                attrs={
-                    "data-state": str(self.state),
-                    "fill": Expr("{data-colors}[{state}]", state=self.state),
-                },
-            )
+        ElementIndex.get_index(state).update(
+            f"pump-{self.target}-button",
+            {
+                "data-state": str(self.state),
+                "fill": state_fill,
+            },
         )
 
 
@@ -302,17 +326,13 @@ class TogglePumpAction(PumpAction):
     def __execute__(self, xml_state: XMLState):  # noqa
         # check if pump is in a failure state
         pump_id = f"pump-{self.target}-button"
-        # 0 -> 1, 1 -> 0, 2 -> 2 (cannot toggle if the pump is in failure)
-        new_state = "(1-{data-state})%3"
-        xml_state.update(
-            update(
-                xpath=f"//*[@id='{pump_id}']",
-                attrs={
-                    "data-state": Expr(new_state),
-                    # GOTCHA! data-state will be updated first (from above) and used to update fill! the order matters here.
-                    "fill": Expr("{data-colors}[{data-state}]"),
-                },
-            )
+        ElementIndex.get_index(xml_state).update(
+            pump_id,
+            {
+                "data-state": _toggle_pump_state,
+                # GOTCHA! data-state will be updated first (from above) and used to update fill! the order matters here.
+                "fill": state_fill,
+            },
         )
 
 
@@ -333,17 +353,13 @@ class TogglePumpFailureAction(PumpAction):
 
     def __execute__(self, xml_state: XMLState):  # noqa
         pump_id = f"pump-{self.target}-button"
-        # 0 -> 2, 1 -> 2, 2 -> 0
-        new_state = "2 * (1 - {data-state} // 2)"
-        xml_state.update(
-            update(
-                xpath=f"//*[@id='{pump_id}']",
-                attrs={
-                    "data-state": Expr(new_state),
-                    # GOTCHA! data-state will be updated first (from above) and used to update fill! the order matters here.
-                    "fill": Expr("{data-colors}[{data-state}]"),
-                },
-            )
+        ElementIndex.get_index(xml_state).update(
+            pump_id,
+            {
+                "data-state": _toggle_pump_failure_state,
+                # GOTCHA! data-state will be updated first (from above) and used to update fill! the order matters here.
+                "fill": state_fill,
+            },
         )
 
 
@@ -351,7 +367,7 @@ class PumpFuelAction(PumpAction):
     """Action class that will pump fuel from one tank to another."""
 
     flow: float
-    XPATH_PUMP: ClassVar[str] = "//svg:rect[@id='pump-%s-button']"
+    ID_PUMP: ClassVar[str] = "pump-%s-button"
 
     def __execute__(self, xml_state: XMLState):  # noqa
         if self.is_pump_on(xml_state, self.target):
@@ -386,16 +402,15 @@ class PumpFuelAction(PumpAction):
         Returns:
             bool: whether the pump is on.
         """
-        xpath = PumpFuelAction.XPATH_PUMP % target
-        data_state = xml_state.select(select(xpath=xpath, attrs=["data-state"]))[0][
-            "data-state"
-        ]
-        return data_state == PumpAction.ON
+        pump = ElementIndex.get_index(xml_state).get(PumpFuelAction.ID_PUMP % target)
+        return pump.get("data-state", None) == PumpAction.ON
 
 
 class BurnFuelAction(XMLUpdateQuery):
     """Action class that will burn fuel in one of the main tanks (tank id = "a", "b" or "*" which indicates both tanks)."""
 
+    TASK_ID: ClassVar[str] = TASK_ID_RESOURCE_MANAGEMENT  # the task that this action modifies
+
     target: str
     burn: float
 
@@ -428,31 +443,128 @@ class BurnFuelAction(XMLUpdateQuery):
         return targets
 
 
+class FlowTickAction(XMLUpdateQuery):
+    """Action class that will burn fuel in the main tanks and then pump fuel via every pump that is "on", in a single step.
+
+    The result is the same as executing a `BurnFuelAction` for each tank in `burn` followed by a `PumpFuelAction` for each pump in `flow` (in order). All tank levels and pump states are read at once, transfers are computed together over the pump graph and only the tanks whose level changed are updated. If a pump would be limited by the level or capacity of a tank (i.e. the result depends on the order of the pumps) the transfers are computed sequentially in the order given by `flow`.
+    """
+
+    TASK_ID: ClassVar[str] = TASK_ID_RESOURCE_MANAGEMENT  # the task that this action modifies
+
+    flow: dict[str, float]
+    burn: dict[str, float]
+
+    @field_validator("flow", mode="before")
+    @classmethod
+    def _validate_flow(cls, value: float | dict[str, float]) -> dict[str, float]:
+        if isinstance(value, int | float):
+            value = {pump: value for pump in PUMP_FLOW_ORDER}
+        for pump in value:
+            if pump not in PUMP_IDS:
+                raise ValueError(f"Invalid pump {pump}, must be one of {PUMP_IDS}")
+        return value
+
+    @field_validator("burn", mode="before")
+    @classmethod
+    def _validate_burn(cls, value: float | dict[str, float]) -> dict[str, float]:
+        if isinstance(value, int | float):
+            value = {tank: value for tank in TANK_MAIN_IDS}
+        for tank in value:
+            if tank not in TANK_MAIN_IDS:
+                raise ValueError(f"Invalid tank {tank}, must be one of {TANK_MAIN_IDS}")
+        return value
+
+    def __execute__(self, xml_state: XMLState):  # noqa
+        index = ElementIndex.get_index(xml_state)
+        tanks = [_get_tank_data(xml_state, tank) for tank in TANK_IDS]
+        level = np.array([tank["data-level"] for tank in tanks], dtype=np.float64)
+        capacity = np.array([tank["data-capacity"] for tank in tanks], dtype=np.float64)
+        new_level = level.copy()
+
+        # burn fuel in the main tanks
+        if self.burn:
+            burn_tanks = [_TANK_INDEX[tank] for tank in self.burn]
+            burn = np.fromiter(self.burn.values(), dtype=np.float64)
+            new_level[burn_tanks] = np.maximum(new_level[burn_tanks] - burn, 0.0)
+
+        # pump fuel via the pumps that are on
+        pumps = [
+            pump
+            for pump in self.flow
+            if index.get(PumpFuelAction.ID_PUMP % pump).get("data-state", None)
+            == PumpAction.ON
+        ]
+        if pumps:
+            src = np.array([_TANK_INDEX[pump[0]] for pump in pumps])
+            dst = np.array([_TANK_INDEX[pump[1]] for pump in pumps])
+            flow = np.array([self.flow[pump] for pump in pumps], dtype=np.float64)
+            n = len(TANK_IDS)
+            # infinite tanks are never drained
+            outflow = np.where(_TANK_INF_MASK[src], 0.0, flow)
+            total_out = np.bincount(src, weights=outflow, minlength=n)
+            total_in = np.bincount(dst, weights=flow, minlength=n)
+            # no pump is limited by tank level/capacity at any point in the sequence, so the order does not matter
+            if (
+                np.all(new_level - total_out >= 0)
+                and np.all(new_level + total_in <= capacity)
+                and np.all(new_level[src] >= flow)
+            ):
+                new_level += total_in - total_out
+            else:
+                _flow_sequential(new_level, capacity, src, dst, flow)
+
+        # update only the tanks whose level has changed
+        for i in np.flatnonzero(new_level != level):
+            _update_tank_level(xml_state, TANK_IDS[i], tanks[i], float(new_level[i]))
+
+
+_TANK_INDEX = {tank: i for i, tank in enumerate(TANK_IDS)}
+_TANK_INF_MASK = np.array([tank in TANK_INF_IDS for tank in TANK_IDS])
+
+
+def _flow_sequential(
+    level: np.ndarray,
+    capacity: np.ndarray,
+    src: np.ndarray,
+    dst: np.ndarray,
+    flow: np.ndarray,
+):
+    # pumps fuel in order, updates `level` in place (see `PumpFuelAction`)
+    for i, j, f in zip(src.tolist(), dst.tolist(), flow.tolist()):
+        if level[i] <= 0:
+            continue  # there is no fuel to transfer
+        remain = capacity[j] - level[j]
+        if remain <= 0:
+            continue  # the tank is full
+        f = min(level[i], remain, f)
+        level[j] += f
+        if not _TANK_INF_MASK[i]:
+            level[i] -= f
+
+
 def _update_tank_level(
     xml_state: XMLState, tank: str, tank_data: dict[str, Any], new_level: float
 ):
     # updates the level of a tank
     new_height = tank_data["height"] * (new_level / tank_data["data-capacity"])
     new_y = tank_data["height"] - new_height
-    xml_state.update(
-        update(
-            xpath=f"//*[@id='tank-{tank}-fuel']",
-            attrs={"y": new_y, "height": new_height},
-        )
-    )
-    xml_state.update(
-        update(
-            xpath=f"//*[@id='tank-{tank}']",
-            attrs={"data-level": new_level},
-        )
-    )
+    index = ElementIndex.get_index(xml_state)
+    index.update(f"tank-{tank}-fuel", {"y": new_y, "height": new_height})
+    index.update(f"tank-{tank}", {"data-level": new_level})
 
 
 def _get_tank_data(xml_state: XMLState, tank: str) -> dict[str, Any]:
     # getter for tank data
-    return xml_state.select(
-        select(
-            xpath=f"//*[@id='tank-{tank}']",
-            attrs=["data-level", "data-capacity", "height"],
-        )
-    )[0]
+    return ElementIndex.get_index(xml_state).select(
+        f"tank-{tank}", ["data-level", "data-capacity", "height"]
+    )
+
+
+def _toggle_pump_state(element: Any) -> int:
+    # 0 -> 1, 1 -> 0, 2 -> 2 (cannot toggle if the pump is in failure)
+    return (1 - get_literal(element, "data-state")) % 3
+
+
+def _toggle_pump_failure_state(element: Any) -> int:
+    # 0 -> 2, 1 -> 2, 2 -> 0
+    return 2 * (1 - get_literal(element, "data-state") // 2)
@@ -8,6 +8,7 @@ from .system_monitoring import (
     ToggleLightAction,
     PerturbSliderAction,
     ResetSliderAction,
+    SliderGeometry,
 )
 
 
@@ -19,4 +20,5 @@ __all__ = (
     "SetSliderAction",
     "PerturbSliderAction",
     "ResetSliderAction",
+    "SliderGeometry",
 )
@@ -4,24 +4,24 @@ This files contains:
     - avatar actuator: `AvatarSystemMonitoringActuator`
     - agent actuator: `SystemMonitoringActuator`
     - actions: [`TargetMoveAction`, `PerturbSliderAction`, `ResetSliderAction`, `SetSliderAction`, `SetLightAction`, `ToggleLightAction`]
+    - slider geometry cache: `SliderGeometry`
 """
 
 import random
 import re
 from typing import Any, ClassVar, Union
 from functools import partial
+from weakref import WeakKeyDictionary
 from pydantic import Field, field_validator
 
 
 from icua.agent import agent_actuator, attempt, Actuator
 from icua.event import XMLUpdateQuery, MouseButtonEvent
 
-from star_ray_xml import (
-    XMLState,
-    Expr,
-    update,
-    select,
-)
+from star_ray_xml import XMLState, _XMLState
+
+from ...utils._element_index import ElementIndex, get_literal, state_fill
+from ...utils._const import slider_incs_id, TASK_ID_SYSTEM_MONITORING
 
 # these are constants that reflect the task svg TODO move to _const?
 VALID_LIGHT_IDS = [1, 2]
@@ -36,6 +36,7 @@ __all__ = (
     "SetSliderAction",
     "SetLightAction",
     "ToggleLightAction",
+    "SliderGeometry",
 )
 
 
@@ -209,6 +210,8 @@ def ResetSliderAction(target: int) -> "SetSliderAction":
 class SetSliderAction(XMLUpdateQuery):
     """Action class that will update a sliders's state. The state of a slider is the integer index of one of its increments."""
 
+    TASK_ID: ClassVar[str] = TASK_ID_SYSTEM_MONITORING  # the task that this action modifies
+
     # slider to target
     target: int
     # state to set, or offset from current state, or None if should reset the state.
@@ -236,51 +239,94 @@ class SetSliderAction(XMLUpdateQuery):
         return increments // 2
 
     def __execute__(self, xml_state: XMLState) -> Any:  # noqa
-        # get min and max values for the number of increments
-        inc_target = f"slider-{self.target}-incs"
-        but_target = f"slider-{self.target}-button"
-        response = xml_state.select(
-            select(
-                xpath=f"//*[@id='{inc_target}']/svg:line",
-                attrs=["y1", "data-state"],
-            )
-        )
-        states = {x["data-state"]: x["y1"] for x in response}
-        # TODO check that these are all the same?
-        inc_size = states[2] - states[1]
-        min_state, max_state = (min(states.keys()), max(states.keys()) - 1)
+        geometry = SliderGeometry.get(xml_state, self.target)
         state = self.state
         if state is None:
             self.relative = False
-            state = SetSliderAction.acceptable_state(max_state + 1)
+            state = SetSliderAction.acceptable_state(geometry.max_state + 1)
 
         # we select the parent of the button node because it contains the state and position to update
-        xpath_parent = f"//*[@id='{but_target}']/parent::node()"
+        index = ElementIndex.get_index(xml_state)
+        parent = index.get(f"slider-{self.target}-button").get_parent()
         if self.relative:
             # update the state relative to the current state
-            response = xml_state.select(
-                select(
-                    xpath=xpath_parent,
-                    attrs=["data-state"],
-                )
-            )
-            assert len(response) == 1
-            state = response[0]["data-state"] + self.state
+            state = parent.get("data-state") + self.state
 
         # new state should not overflow
-        state = min(max(min_state, state), max_state)
-        new_y = states[state] - inc_size
-        return xml_state.update(
-            update(
-                xpath=xpath_parent,
-                attrs={"data-state": state, "y": new_y},
-            )
+        state = min(max(geometry.min_state, state), geometry.max_state)
+        new_y = geometry.states[state] - geometry.inc_size
+        _XMLState.update_element_attributes(parent, {"data-state": state, "y": new_y})
+
+
+class SliderGeometry:
+    """The (static) geometry of a slider in the system monitoring task: the position of each increment, the increment size and the range of valid states.
+
+    The geometry of a slider does not change after the task has been loaded, it is computed once (from the `slider-N-incs` element) and cached per state. The cached geometry is reused until the increments element is replaced (e.g. when the system monitoring svg is replaced), this is detected via the state's `ElementIndex`.
+
+    Use `SliderGeometry.get` to get the geometry of a slider.
+    """
+
+    # state -> slider -> (increments element, geometry)
+    _CACHE: WeakKeyDictionary = WeakKeyDictionary()
+
+    def __init__(self, states: dict[int, float]):
+        """Constructor.
+
+        Args:
+            states (dict[int, float]): increment state -> y position of the increment.
+        """
+        self.states = states
+        # TODO check that these are all the same?
+        self.inc_size = states[2] - states[1]
+        self.min_state = min(states.keys())
+        self.max_state = max(states.keys()) - 1
+
+    @staticmethod
+    def get(xml_state: XMLState, target: int) -> "SliderGeometry":
+        """Get the geometry of the `target` slider in the given state, it will be computed if it is not already cached.
+
+        Args:
+            xml_state (XMLState): the state.
+            target (int): the integer `id` of the target slider (1, 2, 3 or 4).
+
+        Returns:
+            SliderGeometry: the geometry of the slider.
+        """
+        incs = ElementIndex.get_index(xml_state).get(slider_incs_id(target))
+        cache = SliderGeometry._CACHE.get(xml_state, None)
+        if cache is None:
+            cache = dict()
+            SliderGeometry._CACHE[xml_state] = cache
+        element, geometry = cache.get(target, (None, None))
+        if element is not incs._base:
+            geometry = SliderGeometry.from_element(incs)
+            cache[target] = (incs._base, geometry)
+        return geometry
+
+    @staticmethod
+    def from_element(incs: Any) -> "SliderGeometry":
+        """Compute the geometry of a slider from its increments (`slider-N-incs`) element.
+
+        Args:
+            incs (Any): the increments element.
+
+        Returns:
+            SliderGeometry: the geometry of the slider.
+        """
+        return SliderGeometry(
+            {
+                child.get("data-state"): child.get("y1")
+                for child in incs.get_children()
+                if child.is_element and child.tag == "line"
+            }
         )
 
 
 class SetLightAction(XMLUpdateQuery):
     """Action class that will update a light's state (on=1 or off=0)."""
 
+    TASK_ID: ClassVar[str] = TASK_ID_SYSTEM_MONITORING  # the task that this action modifies
+
     target: int  # the target light
     state: int  # the new state of the light
 
@@ -328,20 +374,20 @@ class SetLightAction(XMLUpdateQuery):
             raise ValueError(f"Invalid state `{value}` must be one of ['on', 'off']")
 
     def __execute__(self, xml_state: XMLState):  # noqa
-        xml_state.update(
-            update(
-                xpath=f"//*[@id='light-{self.target}-button']",
-                attrs={
-                    "data-state": str(self.state),
-                    "fill": Expr("{data-colors}[{state}]", state=self.state),
-                },
-            )
+        ElementIndex.get_index(xml_state).update(
+            f"light-{self.target}-button",
+            {
+                "data-state": str(self.state),
+                "fill": state_fill,
+            },
         )
 
 
 class ToggleLightAction(XMLUpdateQuery):
     """Action class that will toggle a light's state from on->off and off->on."""
 
+    TASK_ID: ClassVar[str] = TASK_ID_SYSTEM_MONITORING  # the task that this action modifies
+
     target: int
 
     @field_validator("target", mode="before")
@@ -352,13 +398,16 @@ class ToggleLightAction(XMLUpdateQuery):
         return value
 
     def __execute__(self, xml_state: XMLState):  # noqa
-        xml_state.update(
-            update(
-                xpath=f"//*[@id='light-{self.target}-button']",
-                attrs={
-                    "data-state": Expr("1-{data-state}"),
-                    # GOTCHA! data-state will be updated first (above) and used to update fill! the dict order matters here.
-                    "fill": Expr("{data-colors}[{data-state}]"),
-                },
-            )
+        ElementIndex.get_index(xml_state).update(
+            f"light-{self.target}-button",
+            {
+                "data-state": _toggle_light_state,
+                # GOTCHA! data-state will be updated first (above) and used to update fill! the dict order matters here.
+                "fill": state_fill,
+            },
         )
+
+
+def _toggle_light_state(element: Any) -> int:
+    # on -> off, off -> on
+    return 1 - get_literal(element, "data-state")
@@ -9,15 +9,20 @@ This files contains:
 import math
 import random
 import time
-from typing import Any
+from typing import Any, ClassVar
 from pydantic import field_validator
 
-from star_ray_xml import XMLState, Expr, update, select
+from star_ray_xml import XMLState
 from icua.event import KeyEvent, XMLUpdateQuery
 from icua.utils import LOGGER
 from icua.agent import Actuator, attempt
 
-from ...utils._const import DEFAULT_KEY_BINDING  # TODO support other key bindings?
+from ...utils._const import (
+    DEFAULT_KEY_BINDING,  # TODO support other key bindings?
+    TASK_ID_TRACKING,
+    tracking_target_id,
+)
+from ...utils._element_index import ElementIndex, get_literal
 
 __all__ = ("AvatarTrackingActuator", "TrackingActuator", "TargetMoveAction")
 
@@ -136,6 +141,8 @@ class TrackingActuator(Actuator):
 class TargetMoveAction(XMLUpdateQuery):
     """Action class that will update the tracking target position."""
 
+    TASK_ID: ClassVar[str] = TASK_ID_TRACKING  # the task that this action modifies
+
     direction: tuple[float, float]
     speed: float
 
@@ -167,21 +174,18 @@ class TargetMoveAction(XMLUpdateQuery):
         dx = self.direction[0] * self.speed
         dy = self.direction[1] * self.speed
         # get properties of the tracking task
-        properties = state.select(
-            select(
-                xpath="//svg:svg/svg:svg[@id='tracking']",
-                attrs=["width", "height"],
-            )
-        )[0]
+        index = ElementIndex.get_index(state)
+        properties = index.select(TASK_ID_TRACKING, ["width", "height"])
         # task bounds should limit the new position
         x1, y1 = (0.0, 0.0)
         x2, y2 = x1 + properties["width"], y1 + properties["height"]
 
-        new_x = Expr("max(min({x} + {dx}, {x2} - {width}), {x1})", dx=dx, x1=x1, x2=x2)
-        new_y = Expr("max(min({y} + {dy}, {y2} - {height}), {y1})", dy=dy, y1=x1, y2=y2)
-        return state.update(
-            update(
-                xpath="//svg:svg/svg:svg/svg:svg[@id='tracking_target']",
-                attrs=dict(x=new_x, y=new_y),
-            )
-        )
+        def new_x(element):
+            x, width = get_literal(element, "x"), get_literal(element, "width")
+            return max(min(x + dx, x2 - width), x1)
+
+        def new_y(element):
+            y, height = get_literal(element, "y"), get_literal(element, "height")
+            return max(min(y + dy, y2 - height), y1)
+
+        return index.update(tracking_target_id(), dict(x=new_x, y=new_y))
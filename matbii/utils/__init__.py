@@ -6,6 +6,15 @@ from ._const import (
     TASK_ID_RESOURCE_MANAGEMENT,
     TASK_ID_SYSTEM_MONITORING,
 )
+from ._element_index import ElementIndex, SelectById
+from ._clock import VirtualClock
+from ._event_log import (
+    BinaryEventLogger,
+    close_event_logger,
+    iter_binary_event_log,
+    iter_text_event_log,
+)
+from ._task_cache import CachedTaskLoader, use_task_cache
 
 from icua.utils import LOGGER
 import importlib
@@ -13,6 +22,15 @@ import importlib
 __all__ = (
     "LOGGER",
     "get_class_from_fqn",
+    "ElementIndex",
+    "SelectById",
+    "VirtualClock",
+    "BinaryEventLogger",
+    "close_event_logger",
+    "iter_binary_event_log",
+    "iter_text_event_log",
+    "CachedTaskLoader",
+    "use_task_cache",
     "TASK_PATHS",
     "TASK_ID_TRACKING",
     "TASK_ID_RESOURCE_MANAGEMENT",
@@ -0,0 +1,88 @@
+"""Module defining `VirtualClock`, a simulated clock that is used to run `matbii` faster than real-time (see `matbii.environment.HeadlessMultiTaskEnvironment`).
+
+The simulation (schedules, task actuators, guidance agents and event logging) reads the current time via `time.time()`. While a `VirtualClock` is installed, `time.time()` will return the virtual time, which only changes when the clock is explicitly advanced.
+"""
+
+import time
+
+__all__ = ("VirtualClock",)
+
+_REAL_TIME = time.time
+
+
+class VirtualClock:
+    """A simulated clock that replaces `time.time` while it is installed, time only passes when `VirtualClock.advance` is called.
+
+    Example:
+    ```python
+    with VirtualClock() as clock:
+        ...  # time.time() == clock.time()
+        clock.advance(0.01)
+    ```
+    """
+
+    def __init__(self, start: float | None = None):
+        """Constructor.
+
+        Args:
+            start (float | None, optional): the initial (unix) time of the clock. Defaults to None, which will use the current (real) time so that timestamps remain plausible.
+        """
+        self._start = _REAL_TIME() if start is None else start
+        self._time = self._start
+        self._installed = False
+
+    def time(self) -> float:
+        """The current (virtual) time.
+
+        Returns:
+            float: current time in seconds since the unix epoch.
+        """
+        return self._time
+
+    @property
+    def elapsed(self) -> float:
+        """The (virtual) time that has passed since the clock started.
+
+        Returns:
+            float: elapsed time in seconds.
+        """
+        return self._time - self._start
+
+    def advance(self, dt: float) -> None:
+        """Advance the clock.
+
+        Args:
+            dt (float): time to advance by (in seconds).
+
+        Raises:
+            ValueError: if `dt` is negative, time cannot go backwards.
+        """
+        if dt < 0:
+            raise ValueError(f"Cannot advance a clock by a negative time: {dt}")
+        self._time += dt
+
+    def install(self) -> None:
+        """Install this clock, `time.time` will return the virtual time until `uninstall` is called.
+
+        Raises:
+            RuntimeError: if another clock is already installed.
+        """
+        if self._installed:
+            return
+        if time.time is not _REAL_TIME:
+            raise RuntimeError("Another virtual clock is already installed.")
+        time.time = self.time
+        self._installed = True
+
+    def uninstall(self) -> None:
+        """Uninstall this clock, `time.time` will return the real time."""
+        if self._installed:
+            time.time = _REAL_TIME
+            self._installed = False
+
+    def __enter__(self) -> "VirtualClock":  # noqa
+        self.install()
+        return self
+
+    def __exit__(self, *args) -> None:  # noqa
+        self.uninstall()
@@ -0,0 +1,245 @@
+"""Module defining `ElementIndex`, a cache of `id` -> element handles for an `XMLState`.
+
+Task actions are executed many times per second and typically target a single element by its `id`. Resolving an element with an xpath query (e.g. `//*[@id='tank-a']`) requires a scan of the entire document each time. The `ElementIndex` resolves these elements once and reuses the handles until the structure of the state changes (`Insert`, `Delete` or `Replace`).
+
+The module also defines `SelectById`, a read query that selects attributes from many elements (by `id`) in a single action using the `ElementIndex`, it is used by sensors in place of one `Select` per element.
+
+Updates made via the `ElementIndex` may compute new attribute values with a python callable (an "updater") rather than an `Expr`. An `Expr` is formatted and parsed each time it is evaluated, an updater is just called with the element, see `ElementIndex.update`, `get_literal` and `state_fill`.
+"""
+
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from star_ray.pubsub import Subscriber, Subscribe
+from star_ray_xml import (
+    XMLState,
+    _XMLState,
+    Insert,
+    Delete,
+    Replace,
+    XPathElementsNotFound,
+    XMLQuery,
+)
+from star_ray_xml._element import _Element
+
+__all__ = ("ElementIndex", "SelectById", "Updater", "get_literal", "state_fill")
+
+# queries that may change the structure of the xml state, the index must be rebuilt if one of these is executed.
+STRUCTURAL_QUERY_TYPES = (Insert, Delete, Replace)
+
+# computes the new value of an attribute from the element that is being updated
+Updater = Callable[[_Element], Any]
+
+
+@lru_cache(maxsize=4096)
+def _literal_eval(value: str | None) -> Any:
+    return _Element.literal_eval(value)
+
+
+def get_literal(element: _Element, attr: str) -> Any:
+    """Get the value of an attribute as a python literal, this is equivalent to `element.get(attr)`. Parsed values are cached by their string value so that attributes which rarely change (e.g. `data-colors`) are not parsed on every read, the result should therefore not be modified.
+
+    Args:
+        element (_Element): the element.
+        attr (str): the attribute.
+
+    Returns:
+        Any: the value of the attribute, or None if the element has no such attribute.
+    """
+    return _literal_eval(element._base.get(attr))
+
+
+def state_fill(element: _Element) -> str:
+    """Updater for the `fill` of an element that is coloured according to its state, this is equivalent to `Expr("{data-colors}[{data-state}]")`.
+
+    Args:
+        element (_Element): the element.
+
+    Returns:
+        str: the colour of the element's current state.
+    """
+    return get_literal(element, "data-colors")[get_literal(element, "data-state")]
+
+
+class ElementIndex(Subscriber):
+    """Cache of element handles (`id` -> element) for a given `XMLState`.
+
+    The index is built lazily on first use and is invalidated when the structure of the state changes. Invalidation happens either explicitly (see `ElementIndex.invalidate`), via a subscription to `Insert`, `Delete` and `Replace` events (see `ElementIndex.subscribe`), or implicitly when a cached element is found to no longer be part of the state. The implicit check means that the index is always safe to use, even if it has not been subscribed to structural changes (e.g. when the state is a copy held by an agent or is being used to replay a log file).
+
+    Use `ElementIndex.get_index` to get the (unique) index of a state.
+    """
+
+    _INDEXES: WeakKeyDictionary = WeakKeyDictionary()
+
+    def __init__(self, state: XMLState):
+        """Constructor.
+
+        Args:
+            state (XMLState): the state to index.
+        """
+        super().__init__()
+        self._root = state.get_root()
+        self._index: dict[str, _Element] | None = None
+
+    @staticmethod
+    def get_index(state: XMLState) -> "ElementIndex":
+        """Get the `ElementIndex` of the given state, it will be created if it does not already exist.
+
+        Args:
+            state (XMLState): the state.
+
+        Returns:
+            ElementIndex: the index of the state.
+        """
+        index = ElementIndex._INDEXES.get(state, None)
+        if index is None:
+            index = ElementIndex(state)
+            ElementIndex._INDEXES[state] = index
+        return index
+
+    def subscribe(self, ambient: Any) -> None:
+        """Subscribe this index to structural changes (`Insert`, `Delete` and `Replace`) in the given ambient. The ambient should be the one that holds the indexed state.
+
+        Args:
+            ambient (Any): the ambient (e.g. `MultiTaskAmbient`) which will publish structural changes.
+        """
+        ambient.__subscribe__(
+            Subscribe(topic=list(STRUCTURAL_QUERY_TYPES), subscriber=self)
+        )
+
+    def __notify__(self, message: Any) -> None:  # noqa
+        if isinstance(message, STRUCTURAL_QUERY_TYPES):
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Invalidate the index, it will be rebuilt the next time it is used."""
+        self._index = None
+
+    def get(self, element_id: str) -> _Element:
+        """Get the element with the given `id`.
+
+        Args:
+            element_id (str): `id` of the element.
+
+        Raises:
+            XPathElementsNotFound: if no element with the given `id` exists in the state.
+
+        Returns:
+            _Element: the element.
+        """
+        if self._index is None:
+            self._build()
+        element = self._index.get(element_id, None)
+        if element is None or not self._is_valid(element, element_id):
+            # the structure may have changed without the index being notified
+            self._build()
+            element = self._index.get(element_id, None)
+            if element is None:
+                raise XPathElementsNotFound(
+                    "No element with id `{id}` was found.", id=element_id
+                )
+        return element
+
+    def select(self, element_id: str, attrs: list[str]) -> dict[str, Any]:
+        """Select attributes from the element with the given `id`, this is equivalent to `select(xpath=f"//*[@id='{element_id}']", attrs=attrs)`.
+
+        Args:
+            element_id (str): `id` of the element.
+            attrs (list[str]): attributes to select.
+
+        Returns:
+            dict[str, Any]: attribute values.
+        """
+        return dict(_XMLState._iter_element_attributes(self.get(element_id), attrs))
+
+    def update(self, element_id: str, attrs: dict[str, Any | Updater]) -> None:
+        """Update attributes of the element with the given `id`, this is equivalent to `update(xpath=f"//*[@id='{element_id}']", attrs=attrs)`. Values may be `Expr` or an `Updater`, a callable that is given the element and returns the new value. Attributes are updated in order, an updater will see the new values of any attributes that precede it.
+
+        Args:
+            element_id (str): `id` of the element.
+            attrs (dict[str, Any | Updater]): attributes to update.
+        """
+        element = self.get(element_id)
+        if not any(callable(value) for value in attrs.values()):
+            return _XMLState.update_element_attributes(element, attrs)
+        for attr, value in attrs.items():
+            if callable(value):
+                value = value(element)
+            _XMLState.update_element_attributes(element, {attr: value})
+
+    def _is_valid(self, element: _Element, element_id: str) -> bool:
+        base = element._base
+        if base.get("id", None) != element_id:
+            return False
+        # the element must still be attached to the root of the state
+        root = self._root._base
+        while base is not None and base is not root:
+            base = base.getparent()
+        return base is root
+
+    def _build(self) -> None:
+        index = dict()
+        for base in self._root._base.iter():
+            element_id = base.get("id", None) if isinstance(base.tag, str) else None
+            if element_id is not None:
+                index.setdefault(element_id, _Element(base))
+        self._index = index
+
+
+class SelectById(XMLQuery):
+    """Query to select attributes from a number of elements by their `id`.
+
+    This is equivalent to taking a `Select(xpath=f"//*[@id='{id}']", attrs=attrs)` for each element, but elements are resolved using the state's `ElementIndex` (which is built in a single pass of the document) rather than an xpath evaluation per element, and the result is a single observation. The result (observation `values`) is a list with an entry for each element (`id` -> attributes), each entry includes the `id` of the element.
+    """
+
+    elements: dict[str, list[str]]  # id -> attributes to select
+
+    @staticmethod
+    def new(ids: Iterable[str], attrs: list[str]) -> "SelectById":
+        """Factory method for `SelectById` that will select the same attributes from each element.
+
+        Args:
+            ids (Iterable[str]): `id`s of the elements to select.
+            attrs (list[str]): attributes to select.
+
+        Returns:
+            SelectById: the select query.
+        """
+        return SelectById(elements={_id: attrs for _id in ids})
+
+    def restrict(self, ids: Iterable[str]) -> "SelectById | None":
+        """Create a new query that only selects from those elements of this query that have one of the given `id`s.
+
+        Args:
+            ids (Iterable[str]): `id`s of the elements to keep.
+
+        Returns:
+            SelectById | None: the new query, or None if no elements were kept.
+        """
+        elements = {_id: self.elements[_id] for _id in ids if _id in self.elements}
+        return SelectById(elements=elements) if elements else None
+
+    @property
+    def is_read(self):  # noqa
+        return True
+
+    @property
+    def is_write(self):  # noqa
+        return False
+
+    @property
+    def is_write_tree(self):  # noqa
+        return False
+
+    @property
+    def is_write_element(self):  # noqa
+        return False
+
+    def __execute__(self, state: XMLState) -> list[dict[str, Any]]:  # noqa
+        index = ElementIndex.get_index(state)
+        return [
+            {"id": _id, **index.select(_id, attrs)}
+            for _id, attrs in self.elements.items()
+        ]
@@ -0,0 +1,263 @@
+"""Module defining a compact binary event log format, see `BinaryEventLogger`.
+
+The binary event log contains the same events as the text event log written by `icua.utils.EventLogger`. Each record is a length-prefixed msgpack array: `[timestamp, class_name, data]`, where `timestamp` is the (unix) logging timestamp in seconds, `class_name` is the name of the event class and `data` is the (json compatible) event data. Integers that do not fit in 64 bits (e.g. event ids) are stored as a msgpack extension type (code `1`, signed little endian bytes). The file begins with `BINARY_LOG_HEADER`.
+
+Format: `BINARY_LOG_HEADER (<record length : uint32 little endian> <record : msgpack>)*`
+"""
+
+import atexit
+import logging
+import os
+import struct
+import time
+import json
+from collections.abc import Container, Iterator
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from pydantic import BaseModel
+from star_ray.pubsub import Subscriber
+from icua.utils import LOGGER
+
+__all__ = (
+    "BinaryEventLogger",
+    "close_event_logger",
+    "BINARY_LOG_HEADER",
+    "BINARY_LOG_SUFFIX",
+    "iter_binary_event_log",
+    "iter_text_event_log",
+)
+
+BINARY_LOG_HEADER = b"MATBII-EVENTS\x00\x01"  # magic + format version
+BINARY_LOG_SUFFIX = ".msgpack"
+TEXT_LOG_TIMESTAMP_FORMAT = "%Y-%m-%d-%H-%M-%S-%f"
+
+_LENGTH = struct.Struct("<I")
+_EXT_BIGINT = 1
+_INT_MIN, _INT_MAX = -(2**63), 2**64 - 1
+
+
+class BinaryEventLogger(Subscriber):
+    """Event logger that writes events to a binary event log file (see module documentation for the format). It has the same interface as `icua.utils.EventLogger` and is typically used alongside it (see `BinaryEventLogger.attach`)."""
+
+    def __init__(self, path: str | Path):
+        """Constructor.
+
+        Args:
+            path (str | Path): path of the binary event log file, it will be overwritten if it already exists.
+        """
+        super().__init__()
+        msgpack = _import_msgpack()  # fail before the log file is created
+        path = Path(path).expanduser().resolve()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path.as_posix()
+        self._file = open(self.path, "wb")
+        self._file.write(BINARY_LOG_HEADER)
+        self._packer = msgpack.Packer()
+        atexit.register(self.close)
+
+    def log(self, event: BaseModel):
+        """Log an event.
+
+        Args:
+            event (BaseModel): the event to log.
+        """
+        self.write(time.time(), type(event).__name__, event.model_dump(mode="json"))
+
+    def write(self, timestamp: float, class_name: str, data: dict[str, Any]):
+        """Write a raw event record to the log file.
+
+        Args:
+            timestamp (float): (unix) logging timestamp in seconds.
+            class_name (str): the name of the event class.
+            data (dict[str, Any]): json compatible event data.
+        """
+        # event ids are typically too large for msgpack ints
+        for key in ("id", "source"):
+            value = data.get(key, None)
+            if isinstance(value, int) and not _INT_MIN <= value <= _INT_MAX:
+                data[key] = _encode_bigint(value)
+        try:
+            record = self._packer.pack([timestamp, class_name, data])
+        except OverflowError:
+            record = self._packer.pack([timestamp, class_name, _encode(data)])
+        self._file.write(_LENGTH.pack(len(record)))
+        self._file.write(record)
+
+    def __notify__(self, event: BaseModel):  # noqa
+        self.log(event)
+
+    def close(self):
+        """Flush and close the log file."""
+        if not self._file.closed:
+            self._file.close()
+            atexit.unregister(self.close)
+
+    def attach(self, ambient: Any):
+        """Attach this logger to an ambient (e.g. `MultiTaskAmbient`), all events that are logged by the ambient's event logger will also be logged by this logger. Events that were logged before this logger was attached (e.g. during construction of the ambient) are copied from the ambient's text event log.
+
+        Args:
+            ambient (Any): the ambient.
+        """
+        text_logger = ambient._event_logger
+        if text_logger is not None:
+            for handler in text_logger.logger.handlers:
+                handler.flush()
+            for record in iter_text_event_log(text_logger.path):
+                self.write(*record)
+            ambient._event_logger = _EventLoggers([text_logger, self])
+        else:
+            ambient._event_logger = self
+
+
+class _EventLoggers:
+    # logs events to multiple event loggers
+
+    def __init__(self, loggers: list[Any]):
+        self.loggers = loggers
+
+    def log(self, event: BaseModel):
+        for logger in self.loggers:
+            logger.log(event)
+
+
+def close_event_logger(event_logger: Any) -> None:
+    """Close an event logger (e.g. `icua.utils.EventLogger` or `BinaryEventLogger`), events that are logged after it is closed are not written to its log file. This should be called when a simulation ends if others will be run in the same process (see `matbii.session_server.SessionServer`).
+
+    Args:
+        event_logger (Any): the event logger.
+    """
+    if isinstance(event_logger, BinaryEventLogger):
+        event_logger.close()
+        return
+    # `EventLogger` adds a file handler to a logger that is named after its log file, other event loggers with the same name (e.g. with a log file created in the same second) would otherwise also write to this file
+    logger = getattr(event_logger, "logger", None)
+    if isinstance(logger, logging.Logger):
+        path = os.path.abspath(event_logger.path)
+        for handler in list(logger.handlers):
+            if getattr(handler, "baseFilename", None) == path:
+                logger.removeHandler(handler)
+                handler.close()
+
+
+def _import_msgpack() -> ModuleType:
+    # msgpack is an optional dependency, it is only needed for binary event logs
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ImportError(
+            "Binary event logs require `msgpack`, install it with: `pip install matbii[binary]`."
+        ) from e
+    return msgpack
+
+
+def _encode_bigint(value: int) -> Any:
+    n = (value.bit_length() + 8) // 8
+    data = value.to_bytes(n, "little", signed=True)
+    return _import_msgpack().ExtType(_EXT_BIGINT, data)
+
+
+def _encode(value: Any) -> Any:
+    # encodes all integers that are too large for msgpack
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    elif isinstance(value, list | tuple):
+        return [_encode(v) for v in value]
+    elif isinstance(value, int) and not _INT_MIN <= value <= _INT_MAX:
+        return _encode_bigint(value)
+    return value
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_BIGINT:
+        return int.from_bytes(data, "little", signed=True)
+    return _import_msgpack().ExtType(code, data)
+
+
+def iter_binary_event_log(
+    path: str | Path, class_names: Container[str] | None = None
+) -> Iterator[tuple[float, str, Any]]:
+    """Iterate over the raw records of a binary event log file. Records are read from the file one at a time.
+
+    Args:
+        path (str | Path): path of the binary event log file.
+        class_names (Container[str] | None, optional): names of the event classes to include, the data of other records is skipped without being decoded. Defaults to None, which includes all records.
+
+    Raises:
+        ValueError: if the file is not a binary event log file.
+
+    Yields:
+        tuple[float, str, Any]: (timestamp, class_name, data)
+    """
+    msgpack = _import_msgpack()
+    with open(path, "rb") as file:
+        if file.read(len(BINARY_LOG_HEADER)) != BINARY_LOG_HEADER:
+            raise ValueError(f"Not a binary event log file: {Path(path).as_posix()}")
+        unpacker = msgpack.Unpacker(ext_hook=_ext_hook)
+        i = len(BINARY_LOG_HEADER)
+        while prefix := file.read(_LENGTH.size):
+            record = None
+            if len(prefix) == _LENGTH.size:
+                (length,) = _LENGTH.unpack(prefix)
+                record = file.read(length)
+            if record is None or len(record) != length:
+                # the log file is truncated (e.g. the process was killed while writing)
+                LOGGER.warning(
+                    f"Truncated record at byte {i} in binary event log: {path}"
+                )
+                break
+            i += _LENGTH.size + length
+            unpacker.feed(record)
+            unpacker.read_array_header()
+            timestamp, class_name = unpacker.unpack(), unpacker.unpack()
+            if class_names is None or class_name in class_names:
+                yield timestamp, class_name, unpacker.unpack()
+            else:
+                unpacker.skip()
+
+
+def iter_text_event_log(
+    path: str | Path, class_names: Container[str] | None = None
+) -> Iterator[tuple[float, str, Any]]:
+    """Iterate over the raw records of a text event log file (as written by `icua.utils.EventLogger`). Event data is decoded from json but is not validated.
+
+    Args:
+        path (str | Path): path of the text event log file.
+        class_names (Container[str] | None, optional): names of the event classes to include, other lines are skipped without being decoded. Defaults to None, which includes all records.
+
+    Raises:
+        ValueError: if a line in the file is malformed.
+
+    Yields:
+        tuple[float, str, Any]: (timestamp, class_name, data)
+    """
+    for timestamp, class_name, data in _iter_text_event_log(path, class_names):
+        yield timestamp, class_name, json.loads(data)
+
+
+def _iter_text_event_log(
+    path: str | Path, class_names: Container[str] | None = None
+) -> Iterator[tuple[float, str, str]]:
+    # same as `iter_text_event_log` but the event data is not decoded
+    with open(path) as file:
+        for line in file:
+            i = line.find(" ")
+            j = line.find(" ", i + 1) if i >= 0 else -1
+            if j < 0:
+                raise ValueError(f"Malformed line: {line}")
+            class_name = line[i + 1 : j]
+            if class_names is not None and class_name not in class_names:
+                continue
+            yield _parse_text_timestamp(line[:i]), class_name, line[j + 1 :]
+
+
+def _parse_text_timestamp(timestamp: str) -> float:
+    # equivalent to `datetime.strptime(timestamp, TEXT_LOG_TIMESTAMP_FORMAT).timestamp()` but much faster
+    try:
+        *parts, microseconds = timestamp.split("-")
+        microseconds = int(microseconds.ljust(6, "0"))
+        return datetime(*map(int, parts), microseconds).timestamp()
+    except (ValueError, TypeError):
+        return datetime.strptime(timestamp, TEXT_LOG_TIMESTAMP_FORMAT).timestamp()
@@ -0,0 +1,262 @@
+"""Module that defines a persistent cache for loading tasks, see `CachedTaskLoader`.
+
+Loading a task (see `icua.utils.TaskLoader`) validates the task configuration (`<TASK>.json`) against its schema (`<TASK>.schema.json`), compiles and renders the svg template (`<TASK>.svg.jinja`) and parses (and validates) the schedule (`<TASK>.sch`). This is repeated each time `matbii` is launched, but the result only depends on the content of these files, on the actuators that the schedule uses and on the versions of the packages that are involved. The rendered svg and the parsed schedule are cached in a directory (one cache file per task), the cache file is keyed by a hash of all of these, if any of them change the task is loaded as usual and the cache file is rebuilt.
+
+Cache files contain two pickled objects: the cache key and the cached task data. The cached data is produced by (and contains objects of) `icua`, `star_ray` and `pyfuncschedule`, so their versions are part of the key and upgrading any of them rebuilds the cache, if the version of one of these packages cannot be determined tasks are not cached. Cache files should only be loaded if they were created locally, as with any pickle file.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from collections.abc import Callable
+from importlib.metadata import version, PackageNotFoundError
+from pathlib import Path
+from typing import Any
+
+from lxml.etree import canonicalize
+from jinja2 import Template
+from star_ray import Actuator, Agent
+from icua.utils import LOGGER, Task, TaskLoader, AvatarFactory, ScheduledAgentFactory
+
+__all__ = ("CachedTaskLoader", "use_task_cache", "TASK_CACHE_SUFFIX")
+
+TASK_CACHE_SUFFIX = ".cache"
+# increment this if the format of the cache (or of the cached data) changes
+TASK_CACHE_VERSION = 2
+# packages that produce the cached data, the cache is rebuilt if any of their versions change
+_TASK_CACHE_PACKAGES = ("matbii", "icua", "star_ray", "pyfuncschedule")
+# the configuration files of a task that are used when loading it (see `icua.utils.TaskLoader`)
+_TASK_FILE_SUFFIXES = (".svg", ".svg.jinja", ".json", ".schema.json", ".sch")
+
+
+def use_task_cache(ambient: Any, path: str | Path) -> "CachedTaskLoader":
+    """Replace the task loader of the given ambient (see `icua.environment.MultiTaskAmbient`) with a `CachedTaskLoader`. This must be done before any tasks are added to the ambient.
+
+    Args:
+        ambient (MultiTaskAmbient): the ambient.
+        path (str | Path): path of the directory in which to cache tasks.
+
+    Raises:
+        ValueError: if tasks have already been added to the ambient.
+
+    Returns:
+        CachedTaskLoader: the new task loader.
+    """
+    # `MultiTaskAmbient` has no public api for its task loader, it is created in its constructor and is used by `add_task`
+    if ambient._tasks:
+        raise ValueError(
+            f"The task cache must be used before any tasks are added, tasks: {list(ambient._tasks)} have already been added."
+        )
+    if not isinstance(getattr(ambient, "_task_loader", None), TaskLoader):
+        raise TypeError(
+            f"The task cache cannot be used with ambient of type: {type(ambient)}, it does not have a task loader."
+        )
+    loader = CachedTaskLoader(path)
+    ambient._task_loader = loader
+    return loader
+
+
+class CachedTaskLoader(TaskLoader):
+    """A `TaskLoader` that caches loaded tasks in a directory so that they can be loaded quickly the next time. The svg of a task is cached for each context that it is rendered with (the context that is given when enabling the task), the svg template is only compiled (and its configuration validated) when the task is rendered with a new context. The parsed schedule is cached when the task is loaded, the schedule is not parsed or validated again when the task is loaded from the cache."""
+
+    def __init__(self, path: str | Path):
+        """Constructor.
+
+        Args:
+            path (str | Path): path of the directory in which to cache tasks, it will be created if it does not exist.
+        """
+        super().__init__()
+        self._cache_path = Path(path).expanduser()
+        self._task_paths: dict[str, list[str]] = dict()
+
+    def register_task(self, name: str, path: str | list[str]) -> None:  # noqa: D102
+        super().register_task(name, path)
+        paths = path if isinstance(path, list | tuple) else [path]
+        self._task_paths[name] = [
+            Path(p).expanduser().resolve().as_posix() for p in paths
+        ]
+
+    def load(
+        self,
+        task_name: str,
+        avatar_actuators: list[Actuator],
+        agent_actuators: list[Actuator],
+    ) -> Task:
+        """Load a task, using the cache if it is up to date. The task is loaded as usual (and is not cached) if the cache cannot be validated (see the module documentation).
+
+        Args:
+            task_name (str): name of the task, the task must have been registered (see `register_task`).
+            avatar_actuators (list[Actuator]): actuators that are added to the avatar when the task is enabled.
+            agent_actuators (list[Actuator]): actuators used by the schedule of the task.
+
+        Returns:
+            Task: the task.
+        """
+        key = self._cache_key(task_name, agent_actuators)
+        if key is None:
+            return super().load(task_name, avatar_actuators, agent_actuators)
+        cache_file = self.get_cache_file(task_name)
+        data = _load_cache(cache_file, key)
+        if data is None:
+            schedule = self.get_schedule(task_name, agent_actuators)
+            parse_result = None if schedule is None else schedule._parse_result
+            data = dict(schedule=parse_result, svg=dict())
+            _save_cache(cache_file, key, data)
+        else:
+            LOGGER.debug(f"Loaded task: `{task_name}` from cache: {cache_file.name}")
+        agent_factory = None
+        if data["schedule"] is not None:
+            agent_factory = _CachedScheduledAgentFactory(
+                data["schedule"], agent_actuators, self.get_schedule_functions()
+            )
+        return _CachedTask(
+            task_name,
+            lambda: self.get_task_template(task_name),
+            AvatarFactory(avatar_actuators),
+            agent_factory,
+            save=lambda: _save_cache(cache_file, key, data),
+            svg=data["svg"],
+        )
+
+    def get_cache_file(self, task_name: str) -> Path:
+        """Get the path of the cache file for the given task, this depends on the name of the task and the path(s) that it was registered with.
+
+        Args:
+            task_name (str): name of the task.
+
+        Returns:
+            Path: path of the cache file.
+        """
+        paths = "\n".join(self._task_paths[task_name]).encode("utf-8")
+        digest = hashlib.sha256(paths).hexdigest()[:16]
+        return self._cache_path / f"{task_name}-{digest}{TASK_CACHE_SUFFIX}"
+
+    def get_task_files(self, task_name: str) -> dict[str, Path]:
+        """Get the configuration files of the given task that may be used when loading it, these are found in the same way as templates are found by `TaskLoader` (files at earlier paths take precedence over files with the same name at later paths).
+
+        Args:
+            task_name (str): name of the task, the task must have been registered (see `register_task`).
+
+        Returns:
+            dict[str, Path]: the files, keyed by their path relative to the task path(s).
+        """
+        files = dict()
+        for path in self._task_paths[task_name]:
+            for file in sorted(Path(path).rglob(f"{task_name}*")):
+                name = file.relative_to(path).as_posix()
+                if file.is_file() and "".join(file.suffixes) in _TASK_FILE_SUFFIXES:
+                    files.setdefault(name, file)
+        return files
+
+    def _cache_key(
+        self, task_name: str, agent_actuators: list[type[Actuator]]
+    ) -> tuple[Any, ...] | None:
+        versions = tuple(_package_version(p) for p in _TASK_CACHE_PACKAGES)
+        if None in versions:
+            return None  # the cache may be stale after an upgrade
+        digest = hashlib.sha256()
+        for name, file in sorted(self.get_task_files(task_name).items()):
+            source = file.read_bytes()
+            digest.update(f"{name}\n{len(source)}\n".encode())
+            digest.update(source)
+        actuators = sorted(
+            f"{actuator.__module__}.{actuator.__qualname__}"
+            for actuator in set(agent_actuators)
+        )
+        functions = [fun.__name__ for fun in self.get_schedule_functions()]
+        return (
+            TASK_CACHE_VERSION,
+            versions,
+            tuple(actuators),
+            tuple(functions),
+            digest.hexdigest(),
+        )
+
+
+class _CachedTask(Task):
+    # a task that renders its svg template only for contexts that are not in the cache
+
+    def __init__(
+        self,
+        task_name: str,
+        get_template: Callable[[], Template],
+        avatar_factory: Callable[[Agent], Agent],
+        agent_factory: Callable[[], Agent] | None,
+        save: Callable[[], None],
+        svg: dict[str, str],
+    ):
+        super().__init__(task_name, None, avatar_factory, agent_factory)
+        self._get_template = get_template
+        self._template: Template | None = None
+        self._save = save
+        self._svg = svg
+
+    def get_xml(self, context: dict[str, Any] | None = None) -> str:  # noqa: D102
+        if context is None:
+            context = dict()
+        try:
+            key = json.dumps(context, sort_keys=True)
+        except TypeError:
+            key = None  # the context cannot be used as a key, it is not cached
+        source = self._svg.get(key, None)
+        if source is None:
+            if self._template is None:
+                self._template = self._get_template()
+            source = canonicalize(self._template.render(context))
+            if key is not None:
+                self._svg[key] = source
+                self._save()
+        return source
+
+
+class _CachedScheduledAgentFactory(ScheduledAgentFactory):
+    # a schedule factory that uses a schedule that was parsed (and validated) previously
+
+    def __init__(
+        self,
+        parse_result: list[Any],
+        actuator_types: list[type[Actuator]],
+        funcs: list[Callable],
+    ):
+        self._cached_parse_result = parse_result
+        super().__init__(None, actuator_types, funcs)
+
+    def parse_schedule(self):  # noqa: D102
+        self._parse_result = self._cached_parse_result
+
+
+def _package_version(package: str) -> str | None:
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return None
+
+
+def _load_cache(cache_file: Path, key: tuple[Any, ...]) -> dict[str, Any] | None:
+    if not cache_file.exists():
+        return None
+    try:
+        with open(cache_file, "rb") as file:
+            if pickle.load(file) != key:
+                return None  # the cache is out of date
+            return pickle.load(file)
+    except Exception as e:
+        # the cache is corrupt or was written by an incompatible version
+        LOGGER.warning(f"Failed to load cache: {cache_file.as_posix()}: {e}")
+        return None
+
+
+def _save_cache(cache_file: Path, key: tuple[Any, ...], data: dict[str, Any]) -> None:
+    # the cache file is replaced atomically, other simulations may be loading it
+    temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_file, "wb") as file:
+            pickle.dump(key, file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+    except Exception as e:
+        # caching is optional, a failure should not prevent loading the task (e.g. if the directory is read-only)
+        temp_file.unlink(missing_ok=True)
+        LOGGER.warning(f"Failed to write cache: {cache_file.as_posix()}: {e}")
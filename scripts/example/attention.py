@@ -2,8 +2,9 @@
 
 import argparse
 from pathlib import Path
-from icua.extras.analysis import (
-    EventLogParser,
+from icua.event import MouseMotionEvent, RenderEvent
+from matbii.extras.analysis import (
+    TextEventLogParser,
     get_mouse_motion_events,
     get_attention_intervals,
 )
@@ -22,13 +23,13 @@ parser.add_argument(
 args = parser.parse_args()
 
 # this parser will be used to parse event log files
-parser = EventLogParser()
+parser = TextEventLogParser()
 # gather all the event types present in matbii and ensure they are loaded properly before parsing
 parser.discover_event_classes("matbii")
 # locate the log file in an experiment directory (if it is known you might skip this step)
 log_file_path = parser.get_event_log_file(args.path)
-# this parses the log file and produces a list of events (in order of the file)
-events = list(parser.parse(log_file_path))
+# this parses the log file lazily (in order of the file), only the events that are needed are parsed
+events = parser.parse(log_file_path, types=(MouseMotionEvent, RenderEvent))
 
 # Attention via mouse motion
 df = get_mouse_motion_events(parser, events)
@@ -2,8 +2,8 @@
 
 import argparse
 from pathlib import Path
-from icua.extras.analysis import EventLogParser
 from icua.event import MouseButtonEvent, RenderEvent
+from matbii.extras.analysis import TextEventLogParser
 
 # load configuration file
 parser = argparse.ArgumentParser()
@@ -18,13 +18,14 @@ parser.add_argument(
 args = parser.parse_args()
 
 # this parser will be used to parse event log files
-parser = EventLogParser()
+parser = TextEventLogParser()
 # gather all the event types present in matbii and ensure they are loaded properly before parsing
 parser.discover_event_classes("matbii")
 # locate the log file in an experiment directory (if it is known you might skip this step)
 log_file_path = parser.get_event_log_file(args.path)
 # this parses the log file and produces a list of events (in order of the file)
-events = list(parser.parse(log_file_path))
+# only the event types that are given are parsed, lines for other events are skipped (this is much faster for large log files)
+events = list(parser.parse(log_file_path, types=(MouseButtonEvent, RenderEvent)))
 # filter events of interest, you can use any event type here, but we are interested in mouse button events
 mouse_button_events = parser.filter_events(events, MouseButtonEvent)
 # convert the events from a list to a dataframe, note that `timestamp_log` is used as the column name for the logging timestamp
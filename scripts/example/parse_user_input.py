@@ -1,13 +1,21 @@
 """Example script to extract events from a log file in a convenient format (pandas dataframe)."""
 
-import icua.extras.analysis as analysis
+from icua.event import MouseButtonEvent, MouseMotionEvent, KeyEvent, RenderEvent
+import matbii.extras.analysis as analysis
 
 DEFAULT_PATH = "C:/Users/brjw/Documents/repos/dicelab/matbii/scripts/example/logs/test-mouse/event_log_2024-11-01-10-38-22.log"
 
 # set up the parser
-parser = analysis.EventLogParser()
+parser = analysis.TextEventLogParser()
 parser.discover_event_classes("matbii")
-events = list(parser.parse(DEFAULT_PATH, relative_start=True))
+# only user input events (and render events, for the frame number) are parsed
+events = list(
+    parser.parse(
+        DEFAULT_PATH,
+        relative_start=True,
+        types=(MouseButtonEvent, MouseMotionEvent, KeyEvent, RenderEvent),
+    )
+)
 
 # get mouse button events
 mouse_button_df = analysis.get_mouse_button_events(parser, events)
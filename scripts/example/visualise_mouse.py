@@ -3,8 +3,10 @@
 import argparse
 import json
 from pathlib import Path
-from icua.extras.analysis import (
-    EventLogParser,
+from icua.event import MouseMotionEvent, RenderEvent
+from star_ray_xml import Insert
+from matbii.extras.analysis import (
+    TextEventLogParser,
     get_mouse_motion_events,
     get_svg_as_image,
 )
@@ -25,13 +27,16 @@ parser.add_argument(
 args = parser.parse_args()
 
 # this parser will be used to parse event log files
-parser = EventLogParser()
+parser = TextEventLogParser()
 # gather all the event types present in matbii and ensure they are loaded properly before parsing
 parser.discover_event_classes("matbii")
 # locate the log file in an experiment directory (if it is known you might skip this step)
 log_file_path = parser.get_event_log_file(args.path)
 # this parses the log file and produces a list of events (in order of the file)
-events = list(parser.parse(log_file_path))
+# only the event types that are given are parsed, lines for other events are skipped
+events = list(
+    parser.parse(log_file_path, types=(MouseMotionEvent, RenderEvent, Insert))
+)
 
 mouse_motion_df = get_mouse_motion_events(parser, events)
 
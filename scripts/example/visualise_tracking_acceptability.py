@@ -2,10 +2,11 @@
 
 import argparse
 from pathlib import Path
-from icua.extras.analysis import (
+from matbii.extras.analysis import (
     EventLogParser,
     get_acceptable_intervals,
     merge_intervals,
+    isin_intervals,
 )
 from icua.event import KeyEvent
 from matbii.tasks.tracking import TargetMoveAction
@@ -47,27 +48,11 @@ def resolve_tracking_dataframe(df: pd.DataFrame):
     )
 
 
-def is_in_intervals(x: np.ndarray, intervals: np.ndarray) -> np.ndarray:
-    """Computes a boolean array determining whether each timestamp in `x` is in an interval in `intervals`.
-
-    Args:
-        x (np.ndarray): timestamps of shape (n,)
-        intervals (np.ndarray): intervals of shape (n, 2) where each interval is (start, end)
-
-    Returns:
-        np.ndarray: resulting indicator array
-    """
-    start_in_interval = intervals[:, 0][:, np.newaxis] <= x
-    end_in_interval = intervals[:, 1][:, np.newaxis] >= x
-    in_interval = start_in_interval & end_in_interval
-    return np.any(in_interval, axis=0)
-
-
 df_tracking = resolve_tracking_dataframe(dfs[TargetMoveAction])
 
 # Compute the task acceptability
 intervals = dict(get_acceptable_intervals(events))["tracking"]
-df_tracking["is_acceptable"] = is_in_intervals(
+df_tracking["is_acceptable"] = isin_intervals(
     df_tracking["timestamp"].to_numpy(), intervals
 )
 # this shift is always needed because acceptability events are triggered AFTER the state has changed, the
@@ -90,7 +75,7 @@ for group, df_key in df_keyboard.groupby(by="key"):
 
 # these are the times at which ANY key was pressed (the user is presumed to be interacting with the tracking tasks)
 keyboard_intervals = merge_intervals(*keyboard_intervals)
-df_tracking["is_key_pressed"] = is_in_intervals(
+df_tracking["is_key_pressed"] = isin_intervals(
     df_tracking["timestamp"].to_numpy(), keyboard_intervals
 )
 
@@ -30,12 +30,14 @@ from matbii.tasks import (
     SetPumpAction,
     BurnFuelAction,
     PumpFuelAction,
+    FlowTickAction,
     TogglePumpFailureAction,
     TargetMoveAction,
     SetLightAction,
     ToggleLightAction,
     SetSliderAction,
 )
+from matbii.avatar.layered_surface import get_dirty_layers, use_layered_surface
 
 
 CLASS_MAP = {
@@ -49,6 +51,7 @@ CLASS_MAP = {
         TogglePumpFailureAction,
         BurnFuelAction,
         PumpFuelAction,
+        FlowTickAction,
         TargetMoveAction,
         SetLightAction,
         ToggleLightAction,
@@ -80,25 +83,24 @@ def parse_timestamp_to_ms(timestamp_str: str) -> float:  # noqa
 
 
 def parse_line(line, whitelist_classes=None):
-    """Parse a line of the event log file - {TIMESTAMP} {EVENT}."""
+    """Parse a line of the event log file - {TIMESTAMP} {EVENT}. Lines for classes that are not in `whitelist_classes` are skipped (None is returned) before they are validated."""
     parts = line.split(" ", 2)
     if len(parts) != 3:
         raise ValueError(f"Malformed line: {line}")
     timestamp_str, class_name, data_str = parts
-    timestamp = parse_timestamp_to_ms(timestamp_str)
     cls = CLASS_MAP.get(class_name, None)
+    if whitelist_classes and cls not in whitelist_classes:
+        return None
     if cls is None:
         raise ValueError(f"Missing class: {class_name}")
-    if whitelist_classes:
-        if cls not in whitelist_classes:
-            return None
+    timestamp = parse_timestamp_to_ms(timestamp_str)
     return timestamp, cls.model_validate_json(data_str)
 
 
 def parse_events(file_path, whitelist=None):
-    """Parse all events in a event log file."""
+    """Parse all events in a event log file, events are parsed lazily (one line at a time)."""
     with open(file_path) as file:
-        for line in file.readlines():
+        for line in file:
             result = parse_line(line, whitelist_classes=whitelist)
             if result:
                 yield result
@@ -106,7 +108,9 @@ def parse_events(file_path, whitelist=None):
 
 async def async_parse_events(file_path):
     """Parse all events in an event log file and yield them at the time they were logged (reconstructing the running of an experiment). NOTE: this wont be completely accurate because the timestamps are not perfectly recorded. TODO discuss the limitations of this."""
-    gen = iter(list(parse_events(file_path)))
+    # only events that modify the state are needed to reconstruct the run
+    whitelist = {cls for cls in CLASS_MAP.values() if issubclass(cls, XMLQuery)}
+    gen = parse_events(file_path, whitelist=whitelist)
 
     t0, event = next(gen)
     for t, event in gen:
@@ -127,6 +131,8 @@ async def main(file_path):
     )
     state = XMLState(xml=SVG, namespaces=NAMESPACES)
     view = View(window_config)
+    # only the task panels that are modified by an event are re-rasterised
+    surface = use_layered_surface(view)
 
     async def _render_task():
         try:
@@ -150,6 +156,7 @@ async def main(file_path):
         try:
             async for event in async_parse_events(file_path):
                 if isinstance(event, XMLQuery):
+                    surface.invalidate(get_dirty_layers(event, state))
                     event.__execute__(state)
                 else:
                     pass
@@ -4,13 +4,12 @@ import argparse
 from pathlib import Path
 import typing
 from matbii.utils import LOGGER
-from pprint import pprint
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 
+from matbii.extras.analysis import parse_event_log
 from icua.extras.analysis import (
-    EventLogParser,
     plot_timestamps,
     plot_intervals,
     get_guidance_intervals,
@@ -40,6 +39,11 @@ parser.add_argument(
     help="Path to trial directory, typically: .../<experiment.id>/<participant.id>/",
     default="./",
 )
+parser.add_argument(
+    "--invalidate-cache",
+    action="store_true",
+    help="Parse the event log file again, ignoring any cached events.",
+)
 
 args = parser.parse_args()
 
@@ -58,15 +62,16 @@ if not path.exists():
 # config = Configuration.from_file(files["configuration.json"], context=config_context)
 event_log_file = next(
     filter(
-        lambda f: f.name.startswith("event_log") or f.suffix == ".log", path.iterdir()
+        # the suffix is checked to avoid matching the cache file (event_log.log.cache)
+        lambda f: f.suffix in (".log", ".msgpack"),
+        path.iterdir(),
     )
 )
 
-parser = EventLogParser()
-parser.discover_event_classes("matbii")
-
-pprint(parser._event_cls_map.keys())
-events = list(parser.parse(event_log_file))
+# parsed events are cached next to the event log file
+parser, events = parse_event_log(
+    event_log_file, invalidate_cache=args.invalidate_cache
+)
 
 
 def summarise():
@@ -0,0 +1,102 @@
+"""Test trial discovery and staleness checks used by the `batch_summary` script."""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from matbii.extras.scripts import (
+    _discover_trials,
+    _is_summary_up_to_date,
+    _write_table,
+    _read_table,
+    _SUMMARY_TABLES,
+)
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+LOG_PATH = Path(__file__).parent / "test_parsing" / "system_monitoring.log"
+
+
+class TestBatchSummary(unittest.TestCase):  # noqa
+    def setUp(self):  # noqa
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        for trial in ["A/p1", "A/p2", "B/p1"]:
+            path = self.root / trial
+            path.mkdir(parents=True)
+            shutil.copy(LOG_PATH, path / "event_log.log")
+            (path / "configuration.json").write_text("{}")
+        # not a trial (no log file)
+        (self.root / "C").mkdir()
+        (self.root / "C" / "configuration.json").write_text("{}")
+
+    def tearDown(self):  # noqa
+        self._tmp.cleanup()
+
+    def test_discover_trials(self):
+        """Test that every trial under the root is found."""
+        trials = _discover_trials(self.root)
+        paths = [log.parent.relative_to(self.root).as_posix() for log, _ in trials]
+        self.assertListEqual(paths, ["A/p1", "A/p2", "B/p1"])
+        for log_file, config_file in trials:
+            self.assertEqual(log_file.name, "event_log.log")
+            self.assertEqual(config_file.name, "configuration.json")
+
+    def test_is_summary_up_to_date(self):
+        """Test that a summary is only up to date if it is complete (in the requested format) and newer than the log files."""
+        log_file, config_file = _discover_trials(self.root)[0]
+        output_dir = log_file.parent / "summary"
+        output_dir.mkdir()
+        for name in _SUMMARY_TABLES:
+            (output_dir / f"{name}.csv").write_text("")
+        self.assertFalse(_is_summary_up_to_date(log_file, config_file, output_dir))
+        (output_dir / "summary.png").write_text("")
+        self.assertTrue(_is_summary_up_to_date(log_file, config_file, output_dir))
+        for format in ["parquet", "feather"]:
+            self.assertFalse(
+                _is_summary_up_to_date(log_file, config_file, output_dir, format)
+            )
+        (output_dir / "tracking.csv").unlink()
+        self.assertFalse(_is_summary_up_to_date(log_file, config_file, output_dir))
+        (output_dir / "tracking.csv").write_text("")
+        # the log file was modified after the summary was written
+        t = time.time() + 10
+        os.utime(log_file, (t, t))
+        self.assertFalse(_is_summary_up_to_date(log_file, config_file, output_dir))
+
+    def test_summary_formats(self):
+        """Test that summary files are read back in whichever format they were written."""
+        df = pd.DataFrame({"t1": [0.0, 1.0], "t2": [0.5, 2.0], "task": ["a", "b"]})
+        formats = ["csv", "parquet", "feather"] if HAS_PYARROW else ["csv"]
+        for format in formats:
+            output_dir = self.root / format
+            output_dir.mkdir()
+            path = _write_table(df, output_dir, "intervals", format=format)
+            self.assertEqual(path.suffix, f".{format}")
+            result = _read_table(output_dir, "intervals")
+            if format != "csv":
+                self.assertEqual(result["task"].dtype, "category")
+            self.assertListEqual(result["task"].astype(str).tolist(), ["a", "b"])
+            self.assertListEqual(result["t2"].tolist(), [0.5, 2.0])
+        with self.assertRaises(FileNotFoundError):
+            _read_table(self.root, "intervals")
+        if HAS_PYARROW:
+            # the requested format is preferred over (stale) files in other formats
+            output_dir = self.root / "csv"
+            _write_table(df.iloc[:1], output_dir, "intervals", format="feather")
+            self.assertEqual(len(_read_table(output_dir, "intervals", "feather")), 1)
+            self.assertEqual(len(_read_table(output_dir, "intervals", "csv")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
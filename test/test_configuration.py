@@ -16,3 +16,19 @@ def test_get_class_from_fqn():
     cls = get_class_from_fqn(fqn)
     if cls != ArrowGuidanceActuator:
         raise ValueError(f"Failed to find class by fully qualified name: {fqn}.")
+
+
+def test_headless_configuration():
+    """Tests that headless mode requires a positive experiment duration."""
+    config = Configuration(
+        ui=dict(headless=True),
+        experiment=dict(duration=10),
+        guidance=dict(enable=False),
+    )
+    config.validate_from_context()
+    config.experiment.duration = -1
+    try:
+        config.validate_from_context()
+    except ValueError:
+        return
+    raise ValueError("Headless configuration without a duration should be invalid.")
@@ -0,0 +1,85 @@
+"""Test the `ElementIndex` used by task actions to find elements by `id`."""
+
+import unittest
+
+from star_ray_xml import XMLState, Insert, Delete, Expr, select, XPathElementsNotFound
+from star_ray_pygame import SVGAmbient
+
+from matbii.utils import ElementIndex, SelectById
+from matbii.utils._element_index import get_literal
+
+SVG = """<svg:svg id="task" xmlns:svg="http://www.w3.org/2000/svg"><svg:rect id="rect-1" x="1" y="2"/></svg:svg>"""
+
+
+def new_state() -> XMLState:
+    """Create a new xml state that contains a simple task."""
+    state = SVGAmbient([]).get_state()
+    state.insert(Insert(xpath="/svg:svg", element=SVG, index=-1))
+    return state
+
+
+class TestElementIndex(unittest.TestCase):
+    """Test `ElementIndex` lookup and invalidation."""
+
+    def test_select(self):  # noqa
+        state = new_state()
+        index = ElementIndex.get_index(state)
+        self.assertIs(index, ElementIndex.get_index(state))
+        expected = state.select(select(xpath="//*[@id='rect-1']", attrs=["x", "y"]))
+        self.assertEqual(index.select("rect-1", ["x", "y"]), expected[0])
+
+    def test_update(self):  # noqa
+        state = new_state()
+        ElementIndex.get_index(state).update("rect-1", {"x": 10})
+        result = state.select(select(xpath="//*[@id='rect-1']", attrs=["x"]))
+        self.assertEqual(result[0]["x"], 10)
+
+    def test_update_with_updater(self):  # noqa
+        state, expr_state = new_state(), new_state()
+        ElementIndex.get_index(expr_state).update(
+            "rect-1", {"x": Expr("{x} + {y}"), "y": Expr("{x} * 2")}
+        )
+        ElementIndex.get_index(state).update(
+            "rect-1",
+            {
+                "x": lambda e: get_literal(e, "x") + get_literal(e, "y"),
+                # updaters see the new value of preceding attributes
+                "y": lambda e: get_literal(e, "x") * 2,
+            },
+        )
+        query = select(xpath="//*[@id='rect-1']", attrs=["x", "y"])
+        result = state.select(query)
+        self.assertEqual(result, expr_state.select(query))
+        self.assertEqual(result[0], {"x": 3, "y": 6})
+
+    def test_structural_change(self):  # noqa
+        state = new_state()
+        index = ElementIndex.get_index(state)
+        index.get("rect-1")
+        # the index has not been notified of these changes, they must be detected.
+        state.delete(Delete(xpath="//*[@id='task']"))
+        with self.assertRaises(XPathElementsNotFound):
+            index.get("rect-1")
+        state.insert(Insert(xpath="/svg:svg", element=SVG, index=-1))
+        index.update("rect-1", {"x": 10})
+        result = state.select(select(xpath="//*[@id='rect-1']", attrs=["x"]))
+        self.assertEqual(result[0]["x"], 10)
+
+    def test_notify(self):  # noqa
+        state = new_state()
+        index = ElementIndex.get_index(state)
+        index.get("rect-1")
+        index.__notify__(Delete(xpath="//*[@id='task']"))
+        self.assertIsNone(index._index)
+
+    def test_select_by_id(self):  # noqa
+        state = new_state()
+        query = SelectById(elements={"task": ["id"], "rect-1": ["x", "y"]})
+        self.assertEqual(
+            query.__execute__(state),
+            [{"id": "task"}, {"id": "rect-1", "x": 1, "y": 2}],
+        )
+        self.assertEqual(query.restrict(["rect-1"]).elements, {"rect-1": ["x", "y"]})
+        self.assertIsNone(query.restrict(["rect-2"]))
+        with self.assertRaises(XPathElementsNotFound):
+            SelectById.new(["rect-2"], ["x"]).__execute__(state)
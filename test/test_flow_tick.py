@@ -0,0 +1,84 @@
+"""Test that `FlowTickAction` is equivalent to sequential `BurnFuelAction` and `PumpFuelAction`."""
+
+import random
+import unittest
+
+from lxml.etree import canonicalize
+from star_ray_xml import XMLState, Insert
+from star_ray_pygame import SVGAmbient
+from icua.utils import TaskLoader
+
+from matbii.utils import TASK_PATHS, TASK_ID_RESOURCE_MANAGEMENT
+from matbii.tasks.resource_management.resource_management import (
+    TANK_IDS,
+    TANK_MAIN_IDS,
+    PUMP_IDS,
+    PUMP_FLOW_ORDER,
+    SetPumpAction,
+    PumpFuelAction,
+    BurnFuelAction,
+    FlowTickAction,
+    _get_tank_data,
+    _update_tank_level,
+)
+
+
+def randomise(states: list[XMLState], rng: random.Random):
+    """Set the same random tank levels and pump states in each of the given states."""
+    levels, pumps = {}, {}
+    for tank in TANK_IDS:
+        capacity = _get_tank_data(states[0], tank)["data-capacity"]
+        # levels are often empty or full so that flow is limited
+        levels[tank] = rng.choice([0, capacity, rng.uniform(0, capacity)])
+    for pump in PUMP_IDS:
+        pumps[pump] = rng.choice([0, 1, 1, 2])
+    for state in states:
+        for tank, level in levels.items():
+            _update_tank_level(state, tank, _get_tank_data(state, tank), level)
+        for pump, pump_state in pumps.items():
+            SetPumpAction(target=pump, state=pump_state).__execute__(state)
+
+
+class TestFlowTickAction(unittest.TestCase):
+    """Test `FlowTickAction` against sequential `BurnFuelAction` and `PumpFuelAction`."""
+
+    @classmethod
+    def setUpClass(cls):  # noqa
+        loader = TaskLoader()
+        loader.register_task(
+            TASK_ID_RESOURCE_MANAGEMENT, TASK_PATHS[TASK_ID_RESOURCE_MANAGEMENT]
+        )
+        template = loader.get_task_template(TASK_ID_RESOURCE_MANAGEMENT)
+        cls.svg = canonicalize(template.render({}))
+
+    def new_state(self) -> XMLState:
+        """Create a new xml state that contains the resource management task."""
+        state = SVGAmbient([]).get_state()
+        state.insert(Insert(xpath="/svg:svg", element=self.svg, index=-1))
+        return state
+
+    def test_equivalence(self):  # noqa
+        rng = random.Random(0)
+        sequential, fused = self.new_state(), self.new_state()
+        for _ in range(50):
+            randomise([sequential, fused], rng)
+            flow, burn = rng.uniform(1, 200), rng.uniform(1, 200)
+            for _ in range(10):
+                for tank in TANK_MAIN_IDS:
+                    BurnFuelAction(target=tank, burn=burn).__execute__(sequential)
+                for pump in PUMP_FLOW_ORDER:
+                    PumpFuelAction(target=pump, flow=flow).__execute__(sequential)
+                FlowTickAction(flow=flow, burn=burn).__execute__(fused)
+                for tank in TANK_IDS:
+                    expected = _get_tank_data(sequential, tank)["data-level"]
+                    actual = _get_tank_data(fused, tank)["data-level"]
+                    self.assertAlmostEqual(expected, actual, places=6)
+
+    def test_validation(self):  # noqa
+        action = FlowTickAction(flow=20, burn=10)
+        self.assertEqual(list(action.flow.keys()), PUMP_FLOW_ORDER)
+        self.assertEqual(list(action.burn.keys()), TANK_MAIN_IDS)
+        with self.assertRaises(ValueError):
+            FlowTickAction(flow={"xy": 20}, burn=10)
+        with self.assertRaises(ValueError):
+            FlowTickAction(flow=20, burn={"c": 10})
@@ -0,0 +1,247 @@
+"""Test the user input tracking of `matbii.guidance.GuidanceAgent`."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from star_ray.agent import AgentRouted
+from star_ray.environment.ambient import _Ambient
+from star_ray_xml import Insert, Delete
+from icua.event import EyeMotionEvent
+from icua.environment import MultiTaskAmbient
+
+from matbii.avatar import HeadlessAvatar, AvatarActuator
+from matbii.guidance import (
+    DefaultGuidanceAgent,
+    SystemMonitoringTaskAcceptabilitySensor,
+    ResourceManagementTaskAcceptabilitySensor,
+    TrackingTaskAcceptabilitySensor,
+)
+from matbii.tasks import (
+    SystemMonitoringActuator,
+    ResourceManagementActuator,
+    TrackingActuator,
+    ToggleLightAction,
+    SetSliderAction,
+    BurnFuelAction,
+    TargetMoveAction,
+)
+from matbii.tasks.system_monitoring import SliderGeometry
+from matbii.utils import (
+    TASK_PATHS,
+    TASK_ID_SYSTEM_MONITORING,
+    TASK_ID_RESOURCE_MANAGEMENT,
+    TASK_ID_TRACKING,
+)
+from matbii.utils._const import slider_incs_id
+
+
+def eye_event(timestamp: float, target: list[str], fixated: bool = True):  # noqa
+    return EyeMotionEvent(
+        timestamp=timestamp,
+        position=(0.0, 0.0),
+        position_raw=(0, 0),
+        position_screen=None,
+        fixated=fixated,
+        in_window=True,
+        target=target,
+    )
+
+
+class TestGuidanceAgent(unittest.TestCase):  # noqa
+    def setUp(self):  # noqa
+        self.agent = DefaultGuidanceAgent(
+            [
+                SystemMonitoringTaskAcceptabilitySensor(),
+                TrackingTaskAcceptabilitySensor(),
+            ],
+            [],
+            attention_mode="fixation",
+        )
+
+    def cycle(self, t: float):  # noqa
+        self.agent._cycle_times.appendleft(t)
+
+    def test_fixation_target(self):
+        """Test that `fixation_target` is the task of the latest recent fixation."""
+        self.cycle(0.0)
+        self.assertIsNone(self.agent.fixation_target)
+        self.agent.on_user_input(eye_event(0.01, ["root", "tracking"]))
+        self.agent.on_user_input(eye_event(0.02, ["root", "system_monitoring"]))
+        # saccades are ignored
+        self.agent.on_user_input(eye_event(0.03, ["root", "tracking"], fixated=False))
+        self.cycle(0.1)
+        self.assertEqual(self.agent.fixation_target, "system_monitoring")
+        self.assertAlmostEqual(self.agent.time_since_fixation("tracking"), 0.09)
+        self.assertAlmostEqual(self.agent.time_since_fixation(), 0.08)
+        # fixation on something that is not a task
+        self.agent.on_user_input(eye_event(0.11, ["root"]))
+        self.cycle(0.2)
+        self.assertIsNone(self.agent.fixation_target)
+        self.assertAlmostEqual(self.agent.time_since_fixation(), 0.18)
+
+    def test_fixation_target_expires(self):
+        """Test that fixations older than the last few cycles are ignored."""
+        self.cycle(0.0)
+        self.agent.on_user_input(eye_event(0.01, ["root", "tracking"]))
+        for i in range(1, 4):
+            self.cycle(i * 0.1)
+            self.assertEqual(self.agent.fixation_target, "tracking")
+        self.cycle(0.4)
+        self.assertIsNone(self.agent.fixation_target)
+
+    def test_reactive(self):
+        """Test that reactive guidance makes the same decisions as polling, with fewer evaluations."""
+
+        def run(reactive: bool):
+            agent = DefaultGuidanceAgent(
+                [TrackingTaskAcceptabilitySensor()],
+                [],
+                attention_mode="mouse",
+                grace_mode="failure",
+                grace_period=1.0,
+                reactive=reactive,
+            )
+            evaluations = 0
+            _decide = agent._decide
+
+            def _counted_decide():
+                nonlocal evaluations
+                evaluations += 1
+                _decide()
+
+            agent._decide = _counted_decide
+            agent.beliefs["tracking"]["is_active"] = True
+            guidance = []
+            for i in range(40):
+                agent._cycle_times.appendleft(i * 0.1)
+                if i == 0:
+                    agent.beliefs["tracking"]["is_acceptable"] = False
+                    agent.on_unacceptable("tracking")
+                elif i == 20:
+                    agent.beliefs["tracking"]["is_acceptable"] = True
+                    agent.on_acceptable("tracking")
+                agent.decide()
+                guidance.append(agent.guidance_on_tasks)
+            return guidance, evaluations
+
+        guidance, evaluations = run(False)
+        reactive_guidance, reactive_evaluations = run(True)
+        self.assertEqual(guidance, reactive_guidance)
+        self.assertEqual(guidance[10], set())
+        self.assertEqual(guidance[11], {"tracking"})
+        self.assertEqual(guidance[20], set())
+        self.assertEqual(evaluations, 40)
+        self.assertLess(reactive_evaluations, 10)
+
+    def test_grace_period_deadline(self):
+        """Test that the grace period deadline is measured from the start of the failure, and is `-inf` if the task has never failed."""
+        agent = DefaultGuidanceAgent(
+            [TrackingTaskAcceptabilitySensor()],
+            [],
+            attention_mode="mouse",
+            grace_mode="failure",
+            grace_period=1.0,
+        )
+        agent._cycle_times.appendleft(2.0)
+        self.assertEqual(agent.grace_period_deadline("tracking"), float("-inf"))
+        agent.on_unacceptable("tracking")
+        agent._cycle_times.appendleft(2.5)
+        self.assertAlmostEqual(agent.grace_period_deadline("tracking"), 3.0)
+
+
+class TestTaskAcceptabilitySensor(unittest.TestCase):  # noqa
+    def test_subscribe(self):
+        """Test that sensors in subscription mode have the same beliefs as sensors that sense every cycle."""
+
+        def new_sensors(subscribe: bool):
+            return [
+                SystemMonitoringTaskAcceptabilitySensor(subscribe=subscribe),
+                ResourceManagementTaskAcceptabilitySensor(subscribe=subscribe),
+                TrackingTaskAcceptabilitySensor(subscribe=subscribe),
+            ]
+
+        sensors, subscribe_sensors = new_sensors(False), new_sensors(True)
+        agents = [AgentRouted(sensors, []), AgentRouted(subscribe_sensors, [])]
+        with tempfile.TemporaryDirectory() as path:
+            ambient = MultiTaskAmbient(
+                avatar=HeadlessAvatar([], [AvatarActuator()]),
+                agents=agents,
+                logging_path=Path(path, "event_log.log").as_posix(),
+            )
+            actuators = {
+                TASK_ID_SYSTEM_MONITORING: SystemMonitoringActuator,
+                TASK_ID_RESOURCE_MANAGEMENT: ResourceManagementActuator,
+                TASK_ID_TRACKING: TrackingActuator,
+            }
+            for task, actuator in actuators.items():
+                ambient.add_task(
+                    task, [TASK_PATHS[task]], agent_actuators=[actuator], enable=True
+                )
+            ambient = _Ambient.new(ambient)
+
+            def sense():
+                for sensor in sensors + subscribe_sensors:
+                    sensor.__query__(ambient)
+                    list(sensor.iter_observations())
+                for sensor, subscribe_sensor in zip(sensors, subscribe_sensors):
+                    self.assertEqual(sensor.beliefs, subscribe_sensor.beliefs)
+                    self.assertEqual(
+                        sensor.is_acceptable(), subscribe_sensor.is_acceptable()
+                    )
+
+            sense()
+            actions = [
+                ToggleLightAction(target=1),
+                SetSliderAction(target=2, state=1, relative=True),
+                TargetMoveAction(direction=(1, 0), speed=50),
+                BurnFuelAction(target="*", burn=500),
+            ]
+            for action in actions:
+                ambient.__update__([action])
+                sense()
+            self.assertFalse(subscribe_sensors[0].is_acceptable())
+            self.assertFalse(subscribe_sensors[1].is_acceptable())
+            self.assertFalse(subscribe_sensors[2].is_acceptable())
+
+    def test_slider_geometry(self):
+        """Test that slider geometry is cached until the system monitoring task is replaced, and that it is only sensed when the task is (re)loaded."""
+        sensor = SystemMonitoringTaskAcceptabilitySensor()
+        with tempfile.TemporaryDirectory() as path:
+            inner = MultiTaskAmbient(
+                avatar=HeadlessAvatar([], [AvatarActuator()]),
+                agents=[AgentRouted([sensor], [])],
+                logging_path=Path(path, "event_log.log").as_posix(),
+            )
+            task = TASK_ID_SYSTEM_MONITORING
+            inner.add_task(
+                task,
+                [TASK_PATHS[task]],
+                agent_actuators=[SystemMonitoringActuator],
+                enable=True,
+            )
+            ambient = _Ambient.new(inner)
+            state = inner.get_state()
+
+            def sense():
+                sensor.__query__(ambient)
+                list(sensor.iter_observations())
+
+            geometry = SliderGeometry.get(state, 1)
+            self.assertIs(geometry, SliderGeometry.get(state, 1))
+            sense()
+            incs = sensor.beliefs[slider_incs_id(1)]["incs"]
+            # the number of increments is not sensed again
+            sensor.beliefs[slider_incs_id(1)]["incs"] = -1
+            ambient.__update__([SetSliderAction(target=1, state=None)])
+            sense()
+            self.assertEqual(sensor.beliefs[slider_incs_id(1)]["incs"], -1)
+            self.assertIs(geometry, SliderGeometry.get(state, 1))
+            # replace the task
+            xml = inner._tasks[task].get_xml(None)
+            ambient.__update__([Delete(xpath=f"//*[@id='{task}']")])
+            ambient.__update__([Insert(xpath="/svg:svg", element=xml, index=-1)])
+            self.assertIsNot(geometry, SliderGeometry.get(state, 1))
+            sense()
+            self.assertEqual(sensor.beliefs[slider_incs_id(1)]["incs"], incs)
+            self.assertTrue(sensor.is_slider_acceptable(1))
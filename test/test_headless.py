@@ -0,0 +1,87 @@
+"""Test running `matbii` in headless mode (without a UI, on a virtual clock)."""
+
+import json
+import random
+import time
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from matbii.main import main
+from matbii.utils import VirtualClock
+from matbii.utils._clock import _REAL_TIME
+from matbii.extras.analysis import parse_event_log, get_task_events
+from icua.event import EyeMotionEvent, MouseButtonEvent, MouseMotionEvent
+
+
+class TestHeadless(unittest.TestCase):  # noqa
+    def test_virtual_clock(self):
+        """Test that `time.time` follows the virtual clock only while it is installed."""
+        with VirtualClock(start=100.0) as clock:
+            self.assertEqual(time.time(), 100.0)
+            clock.advance(0.5)
+            self.assertEqual(time.time(), 100.5)
+            self.assertEqual(clock.elapsed, 0.5)
+            with self.assertRaises(ValueError):
+                clock.advance(-1)
+        self.assertGreater(time.time(), 100.5)
+
+    def run_headless(self, path: str, duration: float, **config) -> tuple:
+        """Run a headless simulation and parse the resulting event log."""
+        config = {
+            "experiment": {"duration": duration},
+            "logging": {"path": path, "level": "WARNING"},
+            "ui": {"headless": True},
+            "guidance": {"attention_mode": "mouse", "arrow": {"mode": "mouse"}},
+            **config,
+        }
+        config_file = Path(path, "config.json")
+        config_file.write_text(json.dumps(config))
+        start = time.time()
+        main(config_file.as_posix())
+        self.assertIs(time.time, _REAL_TIME)  # the clock was uninstalled
+        self.assertLess(time.time() - start, 60)  # much faster than real-time
+        (log_file,) = Path(path).glob("*/event_log_*.log")
+        return parse_event_log(log_file, cache=False)
+
+    def test_headless_simulation(self):
+        """Test that a headless simulation terminates after its (virtual) duration and produces a usable event log."""
+        with tempfile.TemporaryDirectory() as path:
+            parser, events = self.run_headless(path, 2)
+            timestamps = [t for t, _ in events]
+            self.assertAlmostEqual(timestamps[-1], 2.0, delta=0.05)
+            self.assertEqual(timestamps, sorted(timestamps))
+            dfs = get_task_events(parser, events)
+            for df in dfs.values():
+                self.assertGreater(len(df), 0)
+                self.assertGreater(df["frame"].max(), 0)
+                self.assertFalse(df["user"].any())
+
+    def test_synthetic_participant(self):
+        """Test that a synthetic participant generates user input that is attributed to the avatar."""
+        random.seed(0)  # task schedules use the global random number generator
+        with tempfile.TemporaryDirectory() as path:
+            synthetic = {"enable": True, "seed": 0, "eyetracking_rate": 60}
+            parser, events = self.run_headless(
+                path,
+                3,
+                participant={"synthetic": synthetic},
+                guidance={"attention_mode": "fixation", "arrow": {"mode": "mouse"}},
+            )
+            user_events = [
+                event
+                for _, event in events
+                if isinstance(event, EyeMotionEvent | MouseMotionEvent | MouseButtonEvent)
+            ]
+            self.assertEqual(len({event.source for event in user_events}), 1)
+            counts = Counter(type(event) for event in user_events)
+            self.assertAlmostEqual(counts[EyeMotionEvent], 3 * 60, delta=5)
+            # the participant moves to and clicks on the failing lights
+            self.assertGreater(counts[MouseMotionEvent], 0)
+            self.assertGreater(counts[MouseButtonEvent], 0)
+            dfs = get_task_events(parser, events)
+            self.assertTrue(dfs["system_monitoring"]["user"].any())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+"""Test the dirty layer tracking used by `matbii.avatar.LayeredSVGSurface`."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pygame
+from lxml import etree as ET
+from star_ray_xml import Insert, Delete, Update, Select
+from icua.event import DrawArrowAction, ShowElementAction
+from icua.environment import MultiTaskAmbient
+
+from matbii.avatar import HeadlessAvatar, LayeredSVGSurface, get_dirty_layers
+from matbii.avatar.layered_surface import STATIC_ATTRIBUTE
+from matbii.tasks import (
+    SystemMonitoringActuator,
+    ResourceManagementActuator,
+    TrackingActuator,
+    TargetMoveAction,
+    ToggleLightAction,
+    SetSliderAction,
+    TogglePumpAction,
+    FlowTickAction,
+)
+from matbii.utils import (
+    TASK_PATHS,
+    TASK_ID_SYSTEM_MONITORING,
+    TASK_ID_RESOURCE_MANAGEMENT,
+    TASK_ID_TRACKING,
+)
+from matbii.utils._const import tracking_target_id
+
+try:
+    import cairocffi  # noqa: F401
+
+    HAS_CAIRO = True
+except (ImportError, OSError):  # OSError if the cairo library is missing
+    HAS_CAIRO = False
+
+SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"><g id="a"/><g id="b"/></svg>"""
+RECT = """<svg:rect xmlns:svg="http://www.w3.org/2000/svg" id="rect" x="0" y="0" width="10" height="10"/>"""
+
+
+class TestDirtyLayers(unittest.TestCase):  # noqa
+    def setUp(self):  # noqa
+        self._tempdir = tempfile.TemporaryDirectory()
+        ambient = MultiTaskAmbient(
+            avatar=HeadlessAvatar(),
+            agents=[],
+            logging_path=Path(self._tempdir.name, "event_log.log").as_posix(),
+        )
+        actuators = {
+            TASK_ID_SYSTEM_MONITORING: SystemMonitoringActuator,
+            TASK_ID_RESOURCE_MANAGEMENT: ResourceManagementActuator,
+            TASK_ID_TRACKING: TrackingActuator,
+        }
+        for task, actuator in actuators.items():
+            ambient.add_task(
+                task, [TASK_PATHS[task]], agent_actuators=[actuator], enable=True
+            )
+        self.state = ambient.get_state()
+
+    def tearDown(self):  # noqa
+        self._tempdir.cleanup()
+
+    def dirty(self, query):
+        """Get the ids of the dirty layers and then execute the query."""
+        layers = get_dirty_layers(query, self.state)
+        query.__execute__(self.state)
+        return None if layers is None else {layer.get("id") for layer in layers}
+
+    def test_task_actions(self):
+        """Test that task actions dirty only the panel of their task."""
+        actions = [
+            (TargetMoveAction(direction=(1, 0), speed=5), TASK_ID_TRACKING),
+            (ToggleLightAction(target=1), TASK_ID_SYSTEM_MONITORING),
+            (SetSliderAction(target=2, state=1), TASK_ID_SYSTEM_MONITORING),
+            (TogglePumpAction(target="ab"), TASK_ID_RESOURCE_MANAGEMENT),
+            (FlowTickAction(flow={"ab": 10.0}, burn={}), TASK_ID_RESOURCE_MANAGEMENT),
+        ]
+        for action, task in actions:
+            self.assertEqual(self.dirty(action), {task})
+
+    def test_xpath_queries(self):
+        """Test that the layers of generic xml queries are resolved from their xpath."""
+        target = f"//*[@id='{tracking_target_id()}']"
+        self.assertEqual(self.dirty(Select(xpath=target, attrs=["x"])), set())
+        self.assertEqual(
+            self.dirty(ShowElementAction(xpath=target)), {TASK_ID_TRACKING}
+        )
+        xpath = f"/svg:svg/svg:svg[@id='{TASK_ID_TRACKING}']/*"
+        self.assertEqual(
+            self.dirty(Update(xpath=xpath, attrs={"opacity": 1})), {TASK_ID_TRACKING}
+        )
+        # inserted elements are new layers, modifying the root dirties everything
+        insert = Insert(xpath="/svg:svg", element=RECT, index=-1)
+        self.assertEqual(self.dirty(insert), set())
+        self.assertEqual(self.dirty(Update(xpath="/svg:svg", attrs={"x": 0})), None)
+        self.assertEqual(self.dirty(Delete(xpath="//*[@id='rect']")), {"rect"})
+
+    def test_guidance_arrow(self):
+        """Test that updating the guidance arrow only dirties the arrow."""
+        arrow = dict(id="guidance_arrow", x=10, y=10, point_to=TASK_ID_TRACKING)
+        # the arrow is inserted the first time it is drawn
+        draw = DrawArrowAction(xpath="/svg:svg", data=arrow)
+        self.assertEqual(self.dirty(draw), set())
+        arrow["x"] = 20
+        draw = DrawArrowAction(xpath="/svg:svg", data=arrow)
+        self.assertEqual(self.dirty(draw), {"guidance_arrow"})
+
+    def test_static_parts(self):
+        """Test that the static parts of the tasks are not changed by task actions, so their cached bitmaps are reused."""
+        surface = LayeredSVGSurface((100, 100))
+        surface.update(self.state.get_root()._base)
+
+        def static_sources():
+            return {
+                layer.get("id"): [
+                    surface._to_svg(layer, [child])
+                    for child in layer
+                    if child.get(STATIC_ATTRIBUTE) == "true"
+                ]
+                for layer in self.state.get_root()._base
+            }
+
+        sources = static_sources()
+        self.assertTrue(sources[TASK_ID_TRACKING])
+        self.assertTrue(sources[TASK_ID_RESOURCE_MANAGEMENT])
+        self.dirty(TargetMoveAction(direction=(1, 0), speed=5))
+        self.dirty(FlowTickAction(flow={"ab": 10.0}, burn={"a": 5.0}))
+        self.assertEqual(sources, static_sources())
+
+    @unittest.skipUnless(HAS_CAIRO, "requires the cairo library")
+    def test_render(self):
+        """Test that rendering with cached layers (and cached static parts) gives the same pixels as rasterising the entire svg."""
+        from star_ray_pygame.cairosurface import CairoSVGSurface
+
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.display.init()
+        self.addCleanup(pygame.display.quit)
+        size = (400, 300)
+        window = pygame.display.set_mode(size)
+        surface = LayeredSVGSurface(size)
+
+        def render():
+            root = self.state.get_root()._base
+            surface.update(root)
+            surface.render(window)
+            expected = CairoSVGSurface(size)
+            expected.update(root)
+            expected.render(window)
+            actual = pygame.surfarray.array3d(surface._surface).astype(int)
+            expected = pygame.surfarray.array3d(expected._surface).astype(int)
+            # layers are composited separately, this may differ by rounding
+            self.assertLessEqual(np.abs(actual - expected).max(), 3)
+
+        render()
+        static = dict(surface._static)
+        self.assertTrue(static)
+        for action in [
+            TargetMoveAction(direction=(1, 0), speed=5),
+            FlowTickAction(flow={"ab": 10.0}, burn={"a": 5.0}),
+            ToggleLightAction(target=1),
+        ]:
+            surface.invalidate(get_dirty_layers(action, self.state))
+            action.__execute__(self.state)
+            render()
+        # the static parts were rasterised once and reused
+        self.assertEqual(surface._static.keys(), static.keys())
+        for key, part in static.items():
+            self.assertIs(surface._static[key], part)
+
+
+class TestLayeredSVGSurface(unittest.TestCase):  # noqa
+    def test_invalidate(self):
+        """Test that cached layers are dropped when invalidated or when the root svg changes."""
+        surface = LayeredSVGSurface((100, 100))
+        root = ET.fromstring(SVG)
+        surface.update(root)
+        a, b = list(root)
+        surface._layers = {a: "a", b: "b"}
+        surface.invalidate([a])
+        self.assertEqual(surface._layers, {b: "b"})
+        surface.update(root)
+        self.assertEqual(surface._layers, {b: "b"})
+        root.set("width", "20")
+        surface.update(root)
+        self.assertEqual(surface._layers, {})
@@ -0,0 +1,124 @@
+"""Test binary event log writing, conversion and parsing."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import matbii.extras.analysis as analysis
+from matbii.utils import BinaryEventLogger, iter_binary_event_log
+from matbii.tasks import TargetMoveAction
+from icua.event import (
+    EyeMotionEvent,
+    MouseMotionEvent,
+    MouseButtonEvent,
+    KeyEvent,
+    RenderEvent,
+)
+
+try:
+    import msgpack  # noqa: F401
+
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+
+@unittest.skipUnless(HAS_MSGPACK, "binary event logs require msgpack")
+class TestBinaryEventLog(unittest.TestCase):
+    """Test that binary event logs contain the same events as text event logs."""
+
+    def setUp(self):
+        """Create a temporary directory for binary log files."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self._tmp.cleanup()
+
+    def test_convert(self):  # noqa
+        path = Path(__file__).parent / "tracking.log"
+        output = analysis.convert_event_log(path, self.tmp / "event_log.msgpack")
+        self.assertLess(output.stat().st_size, path.stat().st_size)
+
+        text_parser = analysis.EventLogParser()
+        text_parser.discover_event_classes("matbii")
+        binary_parser = analysis.BinaryEventLogParser()
+        binary_parser.discover_event_classes("matbii")
+        text_events = list(text_parser.parse(path))
+        binary_events = list(binary_parser.parse(output))
+        self.assertEqual(len(text_events), len(binary_events))
+        # the first event timestamp is not normalised by `EventLogParser`
+        for (t1, e1), (t2, e2) in zip(text_events[1:], binary_events[1:]):
+            self.assertEqual(t1, t2)
+            self.assertEqual(e1, e2)
+
+        text_df = analysis.get_tracking_task_events(text_parser, text_events)
+        binary_df = analysis.get_tracking_task_events(binary_parser, binary_events)
+        self.assertTrue(text_df.equals(binary_df))
+
+    def test_parse_types(self):
+        """Test that parsing only the given event types gives the same events as filtering all parsed events."""
+        path = Path(__file__).parent / "tracking.log"
+        output = analysis.convert_event_log(path, self.tmp / "event_log.msgpack")
+        for log in (path, output):
+            parser = analysis.get_event_log_parser(log)
+            events = list(parser.parse(log))
+            types = analysis.TASK_EVENT_TYPES
+            expected = parser.filter_events(events, types)
+            self.assertLess(len(expected), len(events))
+            self.assertEqual(list(parser.parse(log, types=types)), expected)
+            # the task events are consumed lazily
+            df = analysis.get_tracking_task_events(
+                parser, parser.parse(log, types=types)
+            )
+            expected_df = analysis.get_tracking_task_events(parser, events)
+            self.assertTrue(df.equals(expected_df))
+
+    def test_parse_dataframes(self):
+        """Test that decoding records straight into dataframes gives the same dataframes as converting the parsed events."""
+        path = Path(__file__).parent / "user_input.log"
+        output = analysis.convert_event_log(path, self.tmp / "event_log.msgpack")
+        parser = analysis.BinaryEventLogParser()
+        parser.discover_event_classes("matbii")
+        cases = {
+            EyeMotionEvent: ["timestamp", "position", "fixated", "target"],
+            MouseMotionEvent: ["timestamp", "position", "target"],
+            MouseButtonEvent: None,
+            KeyEvent: ["timestamp", "key", "status"],
+        }
+        for event_type, include in cases.items():
+            for include_frame in (True, False):
+                events = parser.parse(output, types=(event_type, RenderEvent))
+                expected = parser.as_dataframes(
+                    list(events), include=include, include_frame=include_frame
+                )[event_type]
+                df = parser.parse_dataframes(
+                    output, event_type, include=include, include_frame=include_frame
+                )[event_type]
+                if event_type is EyeMotionEvent:
+                    # samples without a position fail validation and are not parsed
+                    valid = df["position"].map(lambda p: None not in p)
+                    self.assertLess(valid.sum(), len(df))
+                    df = df[valid].reset_index(drop=True)
+                self.assertTrue(df.equals(expected), event_type.__name__)
+
+    def test_log(self):  # noqa
+        logger = BinaryEventLogger(self.tmp / "event_log.msgpack")
+        event = TargetMoveAction(direction=(1, 0), speed=1)
+        logger.log(event)
+        logger.close()
+        records = list(iter_binary_event_log(logger.path))
+        self.assertEqual(len(records), 1)
+        _, class_name, data = records[0]
+        self.assertEqual(class_name, TargetMoveAction.__name__)
+        self.assertEqual(TargetMoveAction.model_validate(data), event)
+
+    def test_truncated(self):  # noqa
+        logger = BinaryEventLogger(self.tmp / "event_log.msgpack")
+        for _ in range(3):
+            logger.log(TargetMoveAction(direction=(1, 0), speed=1))
+        logger.close()
+        data = Path(logger.path).read_bytes()
+        Path(logger.path).write_bytes(data[:-5])
+        self.assertEqual(len(list(iter_binary_event_log(logger.path))), 2)
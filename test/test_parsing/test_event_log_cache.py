@@ -0,0 +1,64 @@
+"""Test caching of parsed event log files."""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import matbii.extras.analysis as analysis
+from matbii.extras.analysis.event_log_cache import get_event_log_cache_file
+
+
+class TestEventLogCache(unittest.TestCase):
+    """Test that cached events are the same as parsed events and that the cache is invalidated."""
+
+    def setUp(self):
+        """Copy a log file to a temporary directory."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "event_log.log"
+        shutil.copy(Path(__file__).parent / "tracking.log", self.path)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self._tmp.cleanup()
+
+    def assertEventsEqual(self, events1, events2):  # noqa
+        self.assertEqual(len(events1), len(events2))
+        for (t1, e1), (t2, e2) in zip(events1, events2):
+            self.assertEqual(t1, t2)
+            self.assertEqual(e1, e2)
+
+    def test_cache(self):  # noqa
+        cache_file = get_event_log_cache_file(self.path)
+        _, events = analysis.parse_event_log(self.path, cache=False)
+        self.assertFalse(cache_file.exists())
+        _, events1 = analysis.parse_event_log(self.path)
+        self.assertTrue(cache_file.exists())
+        self.assertEventsEqual(events, events1)
+        # load from the cache
+        parser, events2 = analysis.parse_event_log(self.path)
+        self.assertEventsEqual(events, events2)
+        # the parser can be used as if the events had been parsed
+        self.assertEventsEqual(list(parser.parse(self.path)), events)
+        # the log file has changed, the cache should not be used
+        with open(self.path) as f:
+            lines = f.readlines()
+        with open(self.path, "w") as f:
+            f.writelines(lines[: len(lines) // 2])
+        _, events3 = analysis.parse_event_log(self.path)
+        self.assertLess(len(events3), len(events))
+
+    def test_invalidate_cache(self):  # noqa
+        cache_file = get_event_log_cache_file(self.path)
+        analysis.parse_event_log(self.path)
+        cache_file.write_bytes(b"corrupt")
+        # a corrupt cache is ignored and rebuilt
+        _, events = analysis.parse_event_log(self.path)
+        self.assertGreater(len(events), 0)
+        self.assertNotEqual(cache_file.read_bytes(), b"corrupt")
+        analysis.parse_event_log(self.path, cache=False, invalidate_cache=True)
+        self.assertFalse(cache_file.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
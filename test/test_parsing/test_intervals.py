@@ -0,0 +1,65 @@
+"""Test the interval functions in `matbii.extras.analysis.intervals`."""
+
+import unittest
+
+import numpy as np
+
+import matbii.extras.analysis as analysis
+
+
+def brute_force_isin(timestamps: np.ndarray, intervals: np.ndarray) -> np.ndarray:
+    """Interval membership computed with an (n, m) boolean matrix."""
+    intervals = np.asarray(intervals).reshape(-1, 2)
+    inside = (intervals[:, :1] <= timestamps) & (timestamps < intervals[:, 1:])
+    return inside.any(axis=0)
+
+
+class TestIntervals(unittest.TestCase):  # noqa
+    def setUp(self):  # noqa
+        rng = np.random.default_rng(0)
+
+        def intervals(n):
+            start = rng.integers(0, 100, n).astype(float)
+            return np.stack([start, start + rng.integers(0, 10, n)], axis=1)
+
+        self.cases = [
+            (intervals(rng.integers(0, 10)), intervals(10)) for _ in range(50)
+        ]
+        self.cases.append((np.empty((0, 2)), intervals(5)))
+        self.timestamps = np.arange(-2, 115, 0.25)
+
+    def test_isin_intervals(self):
+        """Test that membership is start inclusive, end exclusive and handles overlapping intervals."""
+        intervals = np.array([[5.0, 8.0], [0.0, 1.0], [6.0, 10.0], [12.0, 12.0]])
+        timestamps = np.array([-1.0, 0.0, 0.5, 1.0, 5.0, 9.0, 10.0, 12.0])
+        expected = [False, True, True, False, True, True, False, False]
+        self.assertListEqual(
+            analysis.isin_intervals(timestamps, intervals).tolist(), expected
+        )
+        for a, _ in self.cases:
+            np.testing.assert_array_equal(
+                analysis.isin_intervals(self.timestamps, a),
+                brute_force_isin(self.timestamps, a),
+            )
+
+    def test_merge_and_intersect_intervals(self):
+        """Test that merged/intersected intervals are disjoint, sorted and contain the union/intersection of the intervals."""
+        t = self.timestamps
+        for a, b in self.cases:
+            in_a, in_b = brute_force_isin(t, a), brute_force_isin(t, b)
+            union = analysis.merge_intervals(a, b)
+            intersection = analysis.intersect_intervals(a, b)
+            for intervals in (union, intersection):
+                self.assertTrue((np.diff(intervals.ravel()) >= 0).all())
+            np.testing.assert_array_equal(brute_force_isin(t, union), in_a | in_b)
+            np.testing.assert_array_equal(
+                brute_force_isin(t, intersection), in_a & in_b
+            )
+            duration = (intersection[:, 1] - intersection[:, 0]).sum()
+            self.assertEqual(analysis.overlap_duration(a, b), duration)
+
+    def test_overlap_duration(self):  # noqa
+        a = np.array([[0.0, 2.0], [4.0, 6.0]])
+        b = np.array([[1.0, 5.0], [5.5, 7.0]])
+        self.assertEqual(analysis.overlap_duration(a, b), 2.5)
+        self.assertEqual(analysis.overlap_duration(a, np.empty((0, 2))), 0.0)
@@ -16,7 +16,60 @@ def get_events(path: str | Path):
 
 
 class TestTasks(unittest.TestCase):  # noqa
-    pass
+    def test_get_task_events(self):
+        """Test that the combined task extractor produces the same dataframes as the individual extractors."""
+        for log in ["system_monitoring.log", "tracking.log"]:
+            path = (Path(__file__).parent / log).as_posix()
+            parser, events = get_events(path)
+            dfs = analysis.get_task_events(parser, events)
+            expected = {
+                "system_monitoring": analysis.get_system_monitoring_task_events(
+                    parser, events
+                ),
+                "tracking": analysis.get_tracking_task_events(parser, events),
+                "resource_management": analysis.get_resource_management_task_events(
+                    parser, events
+                ),
+            }
+            self.assertEqual(dfs.keys(), expected.keys())
+            for task, df in expected.items():
+                self.assertTrue(df.equals(dfs[task]), f"{task} ({log})")
+                self.assertListEqual(list(df.columns), list(dfs[task].columns))
+
+    def test_get_task_events_from_path(self):
+        """Test that task events extracted from the event log file (which only parses the task events) are the same as those extracted from all parsed events."""
+        path = (Path(__file__).parent / "system_monitoring.log").as_posix()
+        parser, events = get_events(path)
+        for streaming_parser in (parser, analysis.get_event_log_parser(path)):
+            df = analysis.get_system_monitoring_task_events(streaming_parser, path)
+            expected = analysis.get_system_monitoring_task_events(parser, events)
+            self.assertTrue(df.equals(expected))
+
+    def test_written_ids(self):
+        """Test that task events only modify the elements given by `_written_ids`, this is required for incremental sensing."""
+        from star_ray_pygame import SVGAmbient
+        from matbii.extras.analysis.get_task import _written_ids, sense
+        from matbii.guidance import SystemMonitoringTaskAcceptabilitySensor
+
+        path = (Path(__file__).parent / "system_monitoring.log").as_posix()
+        parser, events = get_events(path)
+        state = SVGAmbient([]).get_state()
+        sense_actions = SystemMonitoringTaskAcceptabilitySensor().sense()
+        checked = 0
+        for _, event in events:
+            if not hasattr(event, "__execute__"):
+                continue
+            before = sense(state, sense_actions)
+            event.__execute__(state)
+            written_ids = _written_ids(event)
+            if before is None or written_ids is None:
+                continue
+            after = sense(state, sense_actions)
+            changed = {id for id in after if after[id] != before[id]}
+            self.assertLessEqual(changed, written_ids)
+            checked += 1
+        self.assertGreater(checked, 0, "No task events found.")
+
     # def test_resource_management_events(self):
     #     """Test resource management events."""
     #     path = (Path(__file__).parent / "resource_management.log").as_posix()
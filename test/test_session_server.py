@@ -0,0 +1,142 @@
+"""Test running back-to-back sessions with `matbii.session_server.SessionServer`."""
+
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pygame
+from star_ray_pygame import View, WindowConfiguration
+from star_ray_pygame.view import (
+    PYGAME_WINDOWRESIZE,
+    PYGAME_WINDOWMOVE,
+    PYGAME_SCREENSIZE,
+)
+
+from matbii.avatar import LayeredSVGSurface
+from matbii.session_server import SessionServer
+from matbii.utils import iter_binary_event_log, iter_text_event_log
+
+try:
+    import msgpack  # noqa: F401
+
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+REAL_TIME = time.time
+
+
+class TestSessionServer(unittest.TestCase):  # noqa
+    def test_sessions(self):
+        """Test that each session gets its own event log, that invalid sessions are skipped and that a session starts quickly."""
+        with tempfile.TemporaryDirectory() as path:
+            config = {
+                "experiment": {"id": "experiment", "duration": 1, "task_cache": path},
+                "logging": {"path": path, "level": "WARNING"},
+                "ui": {"headless": True},
+                "guidance": {"attention_mode": "mouse", "arrow": {"mode": "mouse"}},
+            }
+            config_file = Path(path, "config.json")
+            config_file.write_text(json.dumps(config))
+            sessions = [
+                {"participant": {"id": "P01"}},
+                {"participant": {"id": "P01"}},  # the logging path already exists
+                "not a session",
+                {"participant": {"id": "P02"}, "experiment": {"duration": 2}},
+            ]
+            lines = "\n".join(json.dumps(session) for session in sessions)
+            server = SessionServer(config_file.as_posix())
+            server.serve(io.StringIO(lines + "\n\n"))
+            for participant in ["P01", "P02"]:
+                (log,) = Path(path, "experiment", participant).glob("event_log_*.log")
+                # each log holds only the events of its own session (which enables three tasks)
+                events = [line.split()[1] for line in log.read_text().splitlines()]
+                self.assertEqual(events.count("EnableTask"), 3)
+            self.assertEqual(len(server.startup_times), 2)
+            self.assertLess(server.startup_times[-1], 1.0)
+
+    def test_failed_session(self):
+        """Test that a session that fails while loading its tasks does not prevent later sessions from running."""
+        with tempfile.TemporaryDirectory() as path:
+            schedules = Path(path, "schedules")
+            schedules.mkdir()
+            Path(schedules, "tracking.sch").write_text("not a schedule @ [\n")
+            config = {
+                "experiment": {"id": "experiment", "duration": 1},
+                "logging": {"path": path, "level": "WARNING"},
+                "ui": {"headless": True},
+                "guidance": {"attention_mode": "mouse", "arrow": {"mode": "mouse"}},
+            }
+            config_file = Path(path, "config.json")
+            config_file.write_text(json.dumps(config))
+            sessions = [
+                {"participant": {"id": "P01"}, "experiment": {"path": str(schedules)}},
+                {"participant": {"id": "P02"}},
+            ]
+            lines = "\n".join(json.dumps(session) for session in sessions)
+            server = SessionServer(config_file.as_posix())
+            server.serve(io.StringIO(lines + "\n"))
+            self.assertIs(time.time, REAL_TIME)
+            (log,) = Path(path, "experiment", "P02").glob("event_log_*.log")
+            self.assertGreater(log.stat().st_size, 0)
+
+    @unittest.skipUnless(HAS_MSGPACK, "binary event logs require msgpack")
+    def test_binary_log(self):
+        """Test that the binary event log of a session is complete when the session ends (before the server exits)."""
+        with tempfile.TemporaryDirectory() as path:
+            config = {
+                "experiment": {"id": "experiment", "duration": 1},
+                "logging": {"path": path, "level": "WARNING", "binary": True},
+                "ui": {"headless": True},
+                "guidance": {"attention_mode": "mouse", "arrow": {"mode": "mouse"}},
+            }
+            config_file = Path(path, "config.json")
+            config_file.write_text(json.dumps(config))
+            server = SessionServer(config_file.as_posix())
+            server.run_session(participant={"id": "P01"})
+            (log,) = Path(path, "experiment", "P01").glob("event_log_*.log")
+            binary_log = log.with_suffix(".msgpack")
+            self.assertEqual(
+                len(list(iter_binary_event_log(binary_log))),
+                len(list(iter_text_event_log(log))),
+            )
+            server.close()
+
+    def test_reuse_view(self):
+        """Test that the view of a previous session is reused (with its initial window events sent again) if the window configuration has not changed."""
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.display.init()
+        self.addCleanup(pygame.display.quit)
+        # the window itself is stubbed, there may be no display
+        view = mock.create_autospec(View, instance=True)
+        view.is_open = True
+        view.get_window_info.return_value = dict(
+            title="matbii", position=(10, 20), size=(800, 600)
+        )
+        view.get_screen_info.return_value = dict(monitor=0, size=(1920, 1080))
+        view._surface = LayeredSVGSurface((800, 600))
+        view._surface._layers = {"layer": None}
+        server = SessionServer()
+        window_config = WindowConfiguration(title="matbii", width=800, height=600)
+        self.assertIsNone(server.get_view(window_config, True))
+        server._view, server._view_key = view, server._next_view_key
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE))
+        self.assertIs(server.get_view(window_config, True), view)
+        events = [(e.type, e.dict) for e in pygame.event.get()]
+        self.assertEqual(
+            events,
+            [
+                (PYGAME_WINDOWRESIZE, dict(size=(800, 600))),
+                (PYGAME_WINDOWMOVE, dict(position=(10, 20))),
+                (PYGAME_SCREENSIZE, dict(size=(1920, 1080))),
+            ],
+        )
+        self.assertEqual(view._surface._layers, {})
+        # the window is closed if the configuration changes
+        self.assertIsNone(server.get_view(window_config, False))
+        view.close.assert_called_once()
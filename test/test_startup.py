@@ -0,0 +1,79 @@
+"""Test that `python -m matbii` imports heavy packages lazily and test the startup profiler `matbii._startup.StartupProfiler`."""
+
+import io
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import matbii
+from matbii._startup import StartupProfiler
+
+# the root directory of the repository (or installation)
+ROOT = Path(matbii.__file__).resolve().parents[1]
+# heavy packages that should only be imported when they are needed
+HEAVY_PACKAGES = ["star_ray", "icua", "pygame", "pandas", "matplotlib"]
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    """Run python in a new process (a cold start)."""
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def imported_heavy_packages(code: str) -> list[str]:
+    """Run `code` in a new process and get the heavy packages that it imported."""
+    code += f"\nimport sys; print(*[p for p in {HEAVY_PACKAGES} if p in sys.modules])"
+    # the packages are printed last, after any output of `code`
+    return run_python("-c", code).stdout.splitlines()[-1].split()
+
+
+class TestStartup(unittest.TestCase):  # noqa
+    def test_lazy_imports(self):
+        """Test that the entry point does not import heavy packages until they are needed."""
+        code = "import matbii, matbii.__main__"
+        self.assertEqual(imported_heavy_packages(code), [])
+        stdout = run_python("-m", "matbii", "--help").stdout
+        self.assertIn("--profile-startup", stdout)
+
+    def test_help(self):
+        """Test that `python -m matbii --help` does not import heavy packages, and that the simulation does."""
+        code = (
+            "import runpy, sys\n"
+            "sys.argv = ['matbii', '--help']\n"
+            "try:\n"
+            "    runpy.run_module('matbii', run_name='__main__')\n"
+            "except SystemExit:\n"
+            "    pass"
+        )
+        self.assertEqual(imported_heavy_packages(code), [])
+        self.assertIn("star_ray", imported_heavy_packages("import matbii.main"))
+
+    def test_profiler(self):
+        """Test that the profiler records the import time of modules and the time of each phase."""
+        with tempfile.TemporaryDirectory() as path:
+            Path(path, "_startup_a.py").write_text("import _startup_b")
+            Path(path, "_startup_b.py").write_text("import time; time.sleep(0.05)")
+            sys.path.insert(0, path)
+            profiler = StartupProfiler().install()
+            try:
+                with profiler.phase("import"):
+                    import _startup_a  # noqa: F401
+            finally:
+                profiler.uninstall()
+                sys.path.remove(path)
+                sys.modules.pop("_startup_a", None)
+                sys.modules.pop("_startup_b", None)
+        a_cumulative, a_self = profiler.imports["_startup_a"]
+        b_cumulative, b_self = profiler.imports["_startup_b"]
+        self.assertGreaterEqual(b_self, 0.05)
+        self.assertLess(a_self, b_self)
+        self.assertAlmostEqual(a_cumulative, a_self + b_cumulative, places=6)
+        ((name, duration),) = profiler.phases
+        self.assertEqual(name, "import")
+        self.assertGreaterEqual(duration, a_cumulative)
+        file = io.StringIO()
+        profiler.report(file=file)
+        self.assertIn("_startup_a", file.getvalue())
@@ -0,0 +1,92 @@
+"""Test the persistent task cache `matbii.utils.CachedTaskLoader`."""
+
+import json
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from icua.utils import TaskLoader, ScheduledAgentFactory
+
+from matbii.tasks import TrackingActuator
+from matbii.utils import TASK_PATHS, TASK_ID_TRACKING, CachedTaskLoader
+
+
+class TestTaskCache(unittest.TestCase):  # noqa
+    def setUp(self):  # noqa
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.cache_path = Path(self._tempdir.name, "cache")
+        # task configuration files here override the default configuration files
+        self.experiment_path = Path(self._tempdir.name, "experiment")
+        self.experiment_path.mkdir()
+
+    def tearDown(self):  # noqa
+        self._tempdir.cleanup()
+
+    def load(self, loader: TaskLoader, context: dict | None = None):
+        """Load the tracking task and render its svg."""
+        paths = [self.experiment_path.as_posix(), TASK_PATHS[TASK_ID_TRACKING]]
+        loader.register_task(TASK_ID_TRACKING, paths)
+        task = loader.load(TASK_ID_TRACKING, [], [TrackingActuator])
+        return task, task.get_xml(context)
+
+    def test_cached_task(self):
+        """Test that a task loaded from the cache is the same as a task loaded as usual, without rendering its template or parsing its schedule."""
+        _, expected = self.load(TaskLoader())
+        _, svg = self.load(CachedTaskLoader(self.cache_path))
+        self.assertEqual(svg, expected)
+        self.assertEqual(len(list(self.cache_path.iterdir())), 1)
+        with (
+            mock.patch.object(TaskLoader, "get_task_template") as get_template,
+            mock.patch.object(ScheduledAgentFactory, "parse_schedule") as parse,
+        ):
+            task, svg = self.load(CachedTaskLoader(self.cache_path))
+            get_template.assert_not_called()
+            parse.assert_not_called()
+        self.assertEqual(svg, expected)
+        agent = task.get_agent()
+        (actuator,) = agent.actuators
+        self.assertIsInstance(actuator, TrackingActuator)
+        self.assertGreater(len(agent._next_items), 0)
+
+    def test_invalidate(self):
+        """Test that the cache is rebuilt when a configuration file changes and that the svg is cached for each context."""
+        _, default = self.load(CachedTaskLoader(self.cache_path))
+        config = Path(self.experiment_path, f"{TASK_ID_TRACKING}.json")
+        config.write_text(json.dumps({"target_radius": 10}))
+        _, svg = self.load(CachedTaskLoader(self.cache_path))
+        self.assertNotEqual(svg, default)
+        self.assertEqual(svg, self.load(TaskLoader())[1])
+        # a different context is rendered (and validated) as usual
+        context = {"target_radius": 30}
+        _, expected = self.load(TaskLoader(), context)
+        _, svg = self.load(CachedTaskLoader(self.cache_path), context)
+        self.assertEqual(svg, expected)
+        with mock.patch.object(TaskLoader, "get_task_template") as get_template:
+            _, svg = self.load(CachedTaskLoader(self.cache_path), context)
+            get_template.assert_not_called()
+        self.assertEqual(svg, expected)
+
+    def test_package_versions(self):
+        """Test that the cache is rebuilt when a package that produces the cached data is upgraded and that tasks are not cached if a version is unknown."""
+        versions = dict()
+        package_version = mock.patch(
+            "matbii.utils._task_cache._package_version",
+            side_effect=lambda package: versions.get(package, "1.0"),
+        )
+        with package_version:
+            _, expected = self.load(CachedTaskLoader(self.cache_path))
+            (cache_file,) = self.cache_path.iterdir()
+            with open(cache_file, "rb") as file:
+                key = pickle.load(file)
+            versions["icua"] = "2.0"
+            _, svg = self.load(CachedTaskLoader(self.cache_path))
+            self.assertEqual(svg, expected)
+            with open(cache_file, "rb") as file:
+                self.assertNotEqual(pickle.load(file), key)
+            cache_file.unlink()
+            versions["icua"] = None
+            _, svg = self.load(CachedTaskLoader(self.cache_path))
+            self.assertEqual(svg, expected)
+            self.assertEqual(list(self.cache_path.iterdir()), [])